@@ -1,53 +1,29 @@
 import os
-import re
-import csv
+import sys
 import ftplib
 import requests
 import logging
 from tkinter import Tk, Button, Label, messagebox, Listbox, Scrollbar, END, Entry, StringVar, Frame, Toplevel
 from datetime import datetime
 
+# The helix_* modules live in the checkout root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helix_schema import SENSOR_BATCH_SCHEMA
+from helix_sensor import SensorBatchValidator
+
 # === CONFIGURATION ===
 VALID_DIR = "valid_files"
 ERROR_LOG_DIR = "error_logs"
 ERROR_LOG_FILE = os.path.join(ERROR_LOG_DIR, "error_log.txt")
-EXPECTED_HEADERS = ["batch_id", "timestamp"] + [f"reading{i}" for i in range(1, 11)]
+EXPECTED_HEADERS = SENSOR_BATCH_SCHEMA.header
 
 
 class FileValidator:
     @staticmethod
     def validate(file_content):
-        try:
-            reader = csv.reader(file_content.splitlines())
-            headers = next(reader, None)
-
-            if headers != EXPECTED_HEADERS:
-                return False, f"Incorrect or missing headers: {headers}"
-
-            batch_ids = set()
-            for row_num, row in enumerate(reader, start=2):
-                if len(row) != 12:
-                    return False, f"Row {row_num} has missing columns"
-
-                batch_id = row[0]
-                if batch_id in batch_ids:
-                    return False, f"Duplicate batch_id {batch_id} on row {row_num}"
-                batch_ids.add(batch_id)
-
-                for i, reading in enumerate(row[2:], start=1):
-                    try:
-                        value = float(reading)
-                        if value > 9.9:
-                            return False, f"Value exceeds 9.9 in reading{i} on row {row_num}: {value}"
-                        if not re.match(r"^\d+(\.\d{1,3})?$", reading):
-                            return False, f"Invalid decimal format in reading{i} on row {row_num}: {reading}"
-                    except ValueError:
-                        return False, f"Non-numeric reading{i} on row {row_num}: {reading}"
-
-        except Exception as e:
-            return False, f"Malformed file error: {str(e)}"
-
-        return True, "Valid"
+        # Streaming, block-checked validation; stops at the first invalid row
+        result = SensorBatchValidator().validate_text(file_content)
+        return result.is_valid, result.message
 
 
 class Logger:
@@ -0,0 +1,15 @@
+"""
+fake_ftp.py - FTP stand-ins shared by the test modules
+
+Kept out of the test_*.py files so a test module can import them outside its
+HAS_HELIX guard: a broken helper fails the tests instead of skipping them.
+"""
+
+from unittest.mock import Mock
+
+
+def mock_ftp(files):
+    """FTP stand-in whose retrbinary serves bytes from a dict"""
+    ftp = Mock()
+    ftp.retrbinary.side_effect = lambda cmd, callback: callback(files[cmd[len("RETR "):]])
+    return ftp
@@ -0,0 +1,125 @@
+"""
+helix_archive.py - compressed archive storage for validated clinical data files
+
+Valid files can be stored gzip- or lzma-compressed. Compression is a single
+streaming pass from the downloaded file into the archive (written to a .part
+file and renamed into place), run on a small background worker pool so the
+next file can be downloaded and validated meanwhile. open_archive() reads
+plain and compressed archives alike.
+"""
+
+import gzip
+import lzma
+import os
+import shutil
+import threading
+from pathlib import Path
+
+ARCHIVE_SUFFIXES = {"gzip": ".gz", "lzma": ".xz"}
+COMPRESSION_MODES = ["none"] + list(ARCHIVE_SUFFIXES)
+DEFAULT_COMPRESSION_LEVEL = 6
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def normalize_compression(method):
+    """Map None/'none'/'' to None and reject unknown methods"""
+    if method in (None, "", "none"):
+        return None
+    if method not in ARCHIVE_SUFFIXES:
+        raise ValueError(f"Unknown archive compression '{method}' (expected one of {COMPRESSION_MODES})")
+    return method
+
+
+def archive_suffix(method):
+    """Extra filename suffix for an archive compression method ('' when uncompressed)"""
+    method = normalize_compression(method)
+    return ARCHIVE_SUFFIXES[method] if method else ""
+
+
+def compression_of(path):
+    """Return the compression method implied by a path's suffix, or None"""
+    suffix = Path(path).suffix.lower()
+    for method, ext in ARCHIVE_SUFFIXES.items():
+        if suffix == ext:
+            return method
+    return None
+
+
+def strip_archive_suffix(name):
+    """CLINICALDATA..._20250101.CSV.gz -> CLINICALDATA..._20250101.CSV"""
+    name = Path(name).name
+    if compression_of(name):
+        return name[:-len(Path(name).suffix)]
+    return name
+
+
+def open_archive(path, mode='rb', **kwargs):
+    """Open a plain, .gz or .xz archive file transparently"""
+    method = compression_of(path)
+    if method == "gzip":
+        return gzip.open(path, mode, **kwargs)
+    if method == "lzma":
+        return lzma.open(path, mode, **kwargs)
+    return open(path, mode, **kwargs)
+
+
+def _open_compressed_writer(path, method, level):
+    if method == "gzip":
+        return gzip.open(path, 'wb', compresslevel=level)
+    return lzma.open(path, 'wb', preset=level)
+
+
+def compress_file(src, dst, method, level=DEFAULT_COMPRESSION_LEVEL, remove_source=True):
+    """Compress src into dst in one streaming pass.
+
+    dst is written as dst.part and renamed on success, so readers never see a
+    partial archive. Returns (original_bytes, stored_bytes).
+    """
+    method = normalize_compression(method)
+    src, dst = Path(src), Path(dst)
+    if method is None:
+        shutil.move(str(src), str(dst))
+        size = dst.stat().st_size
+        return size, size
+    if not 0 <= int(level) <= 9:
+        raise ValueError(f"Compression level must be between 0 and 9, got {level}")
+
+    part = dst.with_name(dst.name + ".part")
+    try:
+        with open(src, 'rb') as fin, _open_compressed_writer(part, method, int(level)) as fout:
+            shutil.copyfileobj(fin, fout, COPY_CHUNK_SIZE)
+        os.replace(part, dst)
+    except BaseException:
+        if part.exists():
+            part.unlink()
+        raise
+    original = src.stat().st_size
+    if remove_source:
+        src.unlink()
+    return original, dst.stat().st_size
+
+
+class ArchiveWorkerPool:
+    """Background pool that compresses validated files into the archive"""
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+        # Batch workers submit concurrently: without it two could each create an executor
+        self._lock = threading.Lock()
+
+    def submit(self, src, dst, method, level=DEFAULT_COMPRESSION_LEVEL):
+        """Queue a compression job and return its Future"""
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="helix-archive")
+            return self._executor.submit(compress_file, src, dst, method, level)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Wait outside the lock so a running job can never block a submit behind it
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,317 @@
+"""
+helix_batch.py - batch processing of many remote files
+
+BatchWorkerPool keeps a fixed number of worker threads alive for the life of
+the GUI. Each worker opens its own FTP connection on first use and reuses it
+for every file it handles, reconnecting only after a transfer error.
+
+BatchProgress is the shared, thread-safe record of where each file is in the
+pipeline. Workers update it; the GUI reads changed rows and the throughput
+figures on its own timer. BatchDashboard turns successive snapshots of it into
+the live rates shown on the dashboard panel.
+"""
+
+import ftplib
+import queue
+import threading
+import time
+
+from helix_cancel import OperationCancelled
+
+DEFAULT_BATCH_WORKERS = 3
+ACTIVE_STATES = ("queued", "downloading", "validating", "archiving")
+FINAL_STATES = ("archived", "rejected", "skipped", "valid", "invalid", "failed", "cancelled")
+
+
+class BatchProgress:
+    """Per-file pipeline state plus overall throughput"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}
+        self._changed = {}
+        self.started = None
+        self.bytes_done = 0
+        self.rows_done = 0
+
+        self.error_counts = {}
+
+    def update(self, filename, state, detail="", result=None):
+        """Move filename to state; a finished ValidationResult's error counts are recorded with it"""
+        with self._lock:
+            entry = self._files.setdefault(filename, {"state": state, "detail": "", "bytes": 0, "since": 0.0,
+                                                      "rows": 0, "errors": 0, "error_counts": {}, "stages": {}})
+            if state == "queued" and self.started is None:
+                self.started = time.monotonic()
+            if entry["state"] != state or not entry["since"]:
+                entry["since"] = time.monotonic()
+            entry["state"] = state
+            entry["detail"] = detail
+            if result is not None:
+                entry["errors"] = result.error_total
+                # A file can report more than one result (a result, then the archiving outcome,
+                # or a re-run): its latest counts replace the ones it added before
+                for category, count in entry["error_counts"].items():
+                    remaining = self.error_counts[category] - count
+                    if remaining:
+                        self.error_counts[category] = remaining
+                    else:
+                        del self.error_counts[category]
+                entry["error_counts"] = {category: count for category, count in result.error_counts.items() if count}
+                for category, count in entry["error_counts"].items():
+                    self.error_counts[category] = self.error_counts.get(category, 0) + count
+            self._changed[filename] = None
+
+    def add_bytes(self, filename, count):
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is not None:
+                entry["bytes"] += count
+                self._changed[filename] = None
+            self.bytes_done += count
+
+    def add_rows(self, filename, count):
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is not None:
+                entry["rows"] += count
+            self.rows_done += count
+
+    def add_stages(self, filename, stages):
+        """Add {stage: seconds} (see helix_timing) to filename's per-stage times"""
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is not None:
+                for name, seconds in stages.items():
+                    entry["stages"][name] = entry["stages"].get(name, 0.0) + seconds
+
+    def state(self, filename):
+        with self._lock:
+            entry = self._files.get(filename)
+            return entry["state"] if entry else None
+
+    def entry(self, filename):
+        """Copy of filename's state, detail, bytes, rows, errors, error_counts and stages, or None"""
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is None:
+                return None
+            entry = dict(entry, error_counts=dict(entry["error_counts"]), stages=dict(entry["stages"]))
+            del entry["since"]
+            return entry
+
+    def is_active(self, filename):
+        return self.state(filename) in ACTIVE_STATES
+
+    def take_changes(self):
+        """(filename, state, detail, bytes) for rows updated since the last call"""
+        with self._lock:
+            names = list(self._changed)
+            self._changed = {}
+            return [(name, self._files[name]["state"], self._files[name]["detail"], self._files[name]["bytes"])
+                    for name in names]
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for entry in self._files.values():
+                counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+            return counts
+
+    def throughput(self, now=None):
+        """(files done, files total, files/s, bytes/s) since the first file was queued"""
+        with self._lock:
+            total = len(self._files)
+            done = sum(1 for entry in self._files.values() if entry["state"] in FINAL_STATES)
+            if self.started is None:
+                return done, total, 0.0, 0.0
+            elapsed = max((now if now is not None else time.monotonic()) - self.started, 1e-6)
+            return done, total, done / elapsed, self.bytes_done / elapsed
+
+    def snapshot(self, now=None):
+        """Consistent copy of the batch totals, active transfers and error counts"""
+        with self._lock:
+            counts = {}
+            transfers = []
+            for name, entry in self._files.items():
+                counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+                if entry["state"] == "downloading":
+                    transfers.append((name, entry["bytes"], entry["since"]))
+            return {
+                "time": now if now is not None else time.monotonic(),
+                "started": self.started,
+                "total": len(self._files),
+                "done": sum(counts.get(state, 0) for state in FINAL_STATES),
+                "counts": counts,
+                "transfers": transfers,
+                "bytes": self.bytes_done,
+                "rows": self.rows_done,
+                "error_counts": dict(self.error_counts),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._files.clear()
+            self._changed = {}
+            self.started = None
+            self.bytes_done = 0
+            self.rows_done = 0
+            self.error_counts = {}
+
+
+class BatchDashboard:
+    """Live rates for the dashboard, computed between two BatchProgress snapshots.
+
+    sample() is called on a fixed timer. Per-transfer and row rates cover the
+    interval since the previous sample; the ETA uses the batch's average
+    files/s so it does not swing with each file boundary.
+    """
+
+    def __init__(self, progress):
+        self.progress = progress
+        self._previous = None
+        self.transfer_rates = []
+        self.rows_rate = 0.0
+        self.queue_depths = {state: 0 for state in ACTIVE_STATES}
+        self.remaining = 0
+        self.eta = None
+        self.error_counts = []
+
+    def sample(self, now=None):
+        snap = self.progress.snapshot(now)
+        previous = self._previous
+        if previous is not None and previous["started"] != snap["started"]:
+            previous = None  # progress was reset for a new batch
+        interval = snap["time"] - previous["time"] if previous else 0.0
+
+        previous_bytes = {name: size for name, size, _ in previous["transfers"]} if previous else {}
+        self.transfer_rates = []
+        for name, size, since in snap["transfers"]:
+            if name in previous_bytes and interval > 0:
+                rate = (size - previous_bytes[name]) / interval
+            else:
+                rate = size / max(snap["time"] - since, 1e-6)
+            self.transfer_rates.append((name, rate))
+
+        self.rows_rate = (snap["rows"] - previous["rows"]) / interval if interval > 0 else 0.0
+        self.queue_depths = {state: snap["counts"].get(state, 0) for state in ACTIVE_STATES}
+        self.remaining = snap["total"] - snap["done"]
+        self.eta = None
+        if snap["started"] is not None and snap["done"] and self.remaining:
+            files_rate = snap["done"] / max(snap["time"] - snap["started"], 1e-6)
+            self.eta = self.remaining / files_rate
+        self.error_counts = sorted(snap["error_counts"].items(), key=lambda item: (-item[1], item[0]))
+        self._previous = snap
+        return self
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class BatchWorkerPool:
+    """Fixed-size pool of long-lived workers, each holding one FTP connection.
+
+    connect() must return an object with a connected `ftp` attribute and a
+    disconnect() method (a connected ClinicalDataProcessor), or raise. Jobs are
+    callables taking the worker's ftp object; on_error, if given, is called
+    with the exception when the job or the connection fails. A job submitted
+    with a CancellationToken is checked before it connects or starts, so a
+    cancelled batch drains its queue without touching the server.
+    """
+
+    def __init__(self, connect, max_workers=DEFAULT_BATCH_WORKERS):
+        self.connect = connect
+        self.max_workers = max(1, int(max_workers))
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+
+    def submit(self, job, on_error=None, cancel=None):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            self._pending += 1
+            self._idle.clear()
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"helix-batch-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._jobs.put((job, on_error, cancel))
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def wait(self, timeout=None):
+        """Block until every submitted job has finished"""
+        return self._idle.wait(timeout)
+
+    def _worker(self):
+        session = None
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            job, on_error, cancel = item
+            started = False
+            try:
+                if cancel is not None:
+                    cancel.check()
+                if session is None:
+                    session = self.connect()
+                    with self._lock:
+                        self._sessions.append(session)
+                started = True
+                job(session.ftp)
+            except Exception as e:
+                # A job cancelled mid-run may have abandoned a transfer; don't reuse its connection
+                if isinstance(e, ftplib.all_errors) or (started and isinstance(e, OperationCancelled)):
+                    self._close_session(session)
+                    session = None
+                if on_error is not None:
+                    try:
+                        on_error(e)
+                    except Exception:
+                        pass
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._idle.set()
+        self._close_session(session)
+
+    def _close_session(self, session):
+        if session is None:
+            return
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        try:
+            session.disconnect()
+        except Exception:
+            pass
+
+    def shutdown(self, wait=False):
+        """Stop the workers after the queued jobs and close their connections"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
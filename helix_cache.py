@@ -0,0 +1,242 @@
+"""
+helix_cache.py - reuse of downloads and validation work between runs
+
+Validating a file and then processing it, or validating it again, used to
+download and parse it from scratch each time over the slow partner link.
+
+DownloadCache keeps downloaded files on disk under the download directory,
+stored once per content hash (objects/<sha256>) and indexed in SQLite by
+remote name, size and modification time. A repeat operation on a file the
+server still reports with the same size and mtime is served locally, by a
+hard link (or copy) of the stored object whose size and SHA-256 are checked
+first, so a damaged object is dropped and downloaded again. Objects are added atomically - the
+file is linked or copied to a temporary name, renamed into place and only
+then indexed - and the least recently used are evicted to stay within a byte
+budget. SQLite's locking and whole-file renames make one cache safe to share
+between the GUI and headless workers, threads and processes alike; files
+served from it are separate links, so eviction never removes them. A served
+file shares its inode with the object, so it is never written in place, and
+move_unshared() gives files that are kept (archived or rejected) their own
+copy.
+
+ValidationCache keeps complete ValidationResults in memory, keyed by the
+SHA-256 of the file content and the validator version (which includes the
+schema), least recently used evicted first, so identical content is never
+parsed twice.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+RESULT_CACHE_SIZE = 64
+DOWNLOAD_CACHE_DIRNAME = ".download_cache"
+DEFAULT_DOWNLOAD_CACHE_BYTES = 1 << 30
+HASH_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    sha256    TEXT PRIMARY KEY,
+    byte_size INTEGER NOT NULL,
+    last_used TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS remote_files (
+    name      TEXT NOT NULL,
+    byte_size INTEGER NOT NULL,
+    mtime     TEXT NOT NULL,
+    sha256    TEXT NOT NULL,
+    PRIMARY KEY (name, byte_size, mtime)
+);
+CREATE INDEX IF NOT EXISTS idx_objects_last_used ON objects(last_used);
+"""
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # No hard links across devices or on some filesystems
+        shutil.copyfile(src, dst)
+
+
+def move_unshared(src, dst):
+    """shutil.move src to dst, copying instead when src is hard-linked elsewhere
+    (a download cache object), so that dst is never the same inode as the object"""
+    src, dst = Path(src), Path(dst)
+    if os.stat(src).st_nlink <= 1:
+        shutil.move(str(src), str(dst))
+        return
+    partial = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.part")
+    try:
+        shutil.copyfile(src, partial)
+        os.replace(partial, dst)
+    finally:
+        partial.unlink(missing_ok=True)
+    src.unlink()
+
+
+def _now():
+    # Microseconds, so the LRU order holds within a second
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+class DownloadCache:
+    """Downloaded files by remote (name, size, mtime), stored once per SHA-256 within max_bytes"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_DOWNLOAD_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / "objects"
+        self.max_bytes = max_bytes
+        self._ready = False
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _connect(self):
+        if not self._ready:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.directory / "index.sqlite"), timeout=30)
+        if not self._ready:
+            conn.executescript(_SCHEMA)
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def _identifies(remote):
+        """A remote (size, mtime) identifies a version of a file only when the server reported both"""
+        return remote is not None and None not in remote
+
+    def fetch(self, name, remote, dest):
+        """Place the cached copy of name's remote (size, mtime) version at dest.
+
+        Returns its SHA-256, or None when the cache does not hold that version
+        or its stored object no longer has the recorded size and hash.
+        """
+        if not self.enabled or not self._identifies(remote):
+            return None
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT o.sha256, o.byte_size FROM remote_files r JOIN objects o ON o.sha256 = r.sha256"
+                               " WHERE r.name = ? AND r.byte_size = ? AND r.mtime = ?",
+                               (name, remote[0], remote[1])).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE objects SET last_used = ? WHERE sha256 = ?", (_now(), row[0]))
+        sha256, size = row
+        dest = Path(dest)
+        dest.unlink(missing_ok=True)
+        try:
+            _link_or_copy(self.objects_dir / sha256, dest)
+        except FileNotFoundError:
+            # Evicted by another worker since the lookup
+            return None
+        if os.path.getsize(dest) != size or _file_sha256(dest) != sha256:
+            # Truncated or modified on disk since it was stored
+            dest.unlink()
+            self._drop(sha256)
+            return None
+        return sha256
+
+    def _drop(self, sha256):
+        """Forget an object and delete its file"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM remote_files WHERE sha256 = ?", (sha256,))
+            conn.execute("DELETE FROM objects WHERE sha256 = ?", (sha256,))
+        (self.objects_dir / sha256).unlink(missing_ok=True)
+
+    def store(self, name, remote, path, sha256=None):
+        """Add the file at path, which stays in place, as name's remote (size, mtime) version.
+
+        Skipped when the server did not report both, when path's size differs
+        from the reported one (the file changed during the transfer) or when it
+        exceeds the whole budget. Returns True when stored.
+        """
+        if not self.enabled or not self._identifies(remote):
+            return False
+        size = os.path.getsize(path)
+        if size != remote[0] or size > self.max_bytes:
+            return False
+        sha256 = sha256 or _file_sha256(path)
+        evicted = []
+        with closing(self._connect()) as conn, conn:
+            target = self.objects_dir / sha256
+            if not target.exists():
+                partial = self.objects_dir / f".{uuid.uuid4().hex}.part"
+                _link_or_copy(path, partial)
+                os.replace(partial, target)
+            conn.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?)", (sha256, size, _now()))
+            conn.execute("INSERT OR REPLACE INTO remote_files VALUES (?, ?, ?, ?)",
+                         (name, remote[0], remote[1], sha256))
+            total = conn.execute("SELECT COALESCE(SUM(byte_size), 0) FROM objects").fetchone()[0]
+            for old, old_size in conn.execute("SELECT sha256, byte_size FROM objects ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                if old == sha256:
+                    continue
+                conn.execute("DELETE FROM remote_files WHERE sha256 = ?", (old,))
+                conn.execute("DELETE FROM objects WHERE sha256 = ?", (old,))
+                evicted.append(old)
+                total -= old_size
+        for old in evicted:
+            (self.objects_dir / old).unlink(missing_ok=True)
+        return True
+
+    def size(self):
+        """Bytes held by the cache"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COALESCE(SUM(byte_size), 0) FROM objects").fetchone()[0]
+
+
+class ValidationCache:
+    """LRU of complete ValidationResults by (content SHA-256, version)"""
+
+    def __init__(self, version, max_results=RESULT_CACHE_SIZE):
+        self.version = version
+        self.max_results = max_results
+        self._results = OrderedDict()  # (sha256, version) -> (result, report_name)
+        self._lock = threading.Lock()
+
+    def get(self, sha256, report_name=None):
+        """The cached result for content with this hash, or None.
+
+        A result with an error report is only reused under the report name it was written for.
+        """
+        with self._lock:
+            key = (sha256, self.version)
+            cached = self._results.get(key)
+            if cached is None:
+                return None
+            result, cached_name = cached
+            if result.report_path is not None and cached_name != report_name:
+                return None
+            self._results.move_to_end(key)
+            return result
+
+    def put(self, result, report_name=None):
+        """Cache result if it is complete; returns True when cached"""
+        if not result.complete or result.sha256 is None:
+            return False
+        with self._lock:
+            key = (result.sha256, self.version)
+            self._results[key] = (result, report_name)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            return True
@@ -0,0 +1,48 @@
+"""
+helix_cancel.py - cooperative cancellation and pause for long-running work
+
+A CancellationToken is shared by the GUI and the workers of one batch. Workers
+call check() at safe points (between files, every few thousand rows, in FTP
+transfer callbacks); it blocks while the token is paused and raises
+OperationCancelled once it has been cancelled.
+"""
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised by CancellationToken.check() after cancel()"""
+
+
+class CancellationToken:
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Wake anything blocked in a paused check() so it can raise
+        self._running.set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def check(self):
+        """Block while paused; raise OperationCancelled if cancelled"""
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled.is_set():
+            raise OperationCancelled("Operation cancelled")
@@ -0,0 +1,187 @@
+"""
+helix_catalog.py - SQLite catalog of archived clinical data files
+
+Per-file metadata (record count, StartDate/EndDate bounds, distinct trial and
+drug codes, byte size and SHA-256) is gathered by the validator while it
+reads the file - size and hash come from its byte-level pre-scan
+(helix_encoding) - and written here when the file is archived, so
+questions like "which archives mention DRG-901 in March?" are answered from
+the catalog instead of opening every archive.
+"""
+
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from helix_archive import compression_of, strip_archive_suffix
+from helix_events import emit
+
+CATALOG_FILENAME = "archive_catalog.sqlite"
+ARCHIVE_NAME_PATTERN = re.compile(r'^CLINICALDATA\d{14}_\d{8}\.CSV(\.gz|\.xz)?$', re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_files (
+    archive_name   TEXT PRIMARY KEY,
+    source_name    TEXT,
+    record_count   INTEGER NOT NULL,
+    min_start_date TEXT,
+    max_start_date TEXT,
+    min_end_date   TEXT,
+    max_end_date   TEXT,
+    byte_size      INTEGER,
+    stored_size    INTEGER,
+    sha256         TEXT,
+    compression    TEXT,
+    archived_at    TEXT
+);
+CREATE TABLE IF NOT EXISTS archive_codes (
+    kind         TEXT NOT NULL,
+    code         TEXT NOT NULL,
+    archive_name TEXT NOT NULL,
+    PRIMARY KEY (kind, code, archive_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_archive_codes_name ON archive_codes(archive_name);
+CREATE INDEX IF NOT EXISTS idx_archive_files_dates ON archive_files(min_start_date, max_end_date);
+"""
+
+
+class RecordStats:
+    """Running per-file statistics over valid records"""
+
+    def __init__(self):
+        self.record_count = 0
+        self.min_start = self.max_start = None
+        self.min_end = self.max_end = None
+        self.trial_codes = set()
+        self.drug_codes = set()
+
+    def add(self, trial_code, drug_code, start_date, end_date):
+        """start_date/end_date are date or datetime objects"""
+        self.record_count += 1
+        self.trial_codes.add(trial_code)
+        self.drug_codes.add(drug_code)
+        if self.min_start is None or start_date < self.min_start:
+            self.min_start = start_date
+        if self.max_start is None or start_date > self.max_start:
+            self.max_start = start_date
+        if self.min_end is None or end_date < self.min_end:
+            self.min_end = end_date
+        if self.max_end is None or end_date > self.max_end:
+            self.max_end = end_date
+
+
+def _iso(value):
+    return value.strftime("%Y-%m-%d") if value is not None else None
+
+
+class ArchiveCatalog:
+    """SQLite-backed index of archived files.
+
+    A short-lived connection is used per call so the catalog can be shared by
+    the GUI, background workers and command-line tools.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_archive(cls, archive_dir):
+        return cls(Path(archive_dir) / CATALOG_FILENAME)
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record_file(self, archive_name, stats, byte_size=None, stored_size=None, sha256=None,
+                    compression=None, source_name=None, archived_at=None):
+        """Insert or replace the catalog entry for one archived file"""
+        archived_at = archived_at or datetime.now().isoformat(timespec='seconds')
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM archive_codes WHERE archive_name = ?", (archive_name,))
+            conn.execute(
+                "INSERT OR REPLACE INTO archive_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (archive_name, source_name, stats.record_count,
+                 _iso(stats.min_start), _iso(stats.max_start), _iso(stats.min_end), _iso(stats.max_end),
+                 byte_size, stored_size, sha256, compression, archived_at))
+            conn.executemany(
+                "INSERT OR IGNORE INTO archive_codes VALUES (?, ?, ?)",
+                [("trial", code, archive_name) for code in stats.trial_codes]
+                + [("drug", code, archive_name) for code in stats.drug_codes])
+
+    def remove_file(self, archive_name):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM archive_codes WHERE archive_name = ?", (archive_name,))
+            conn.execute("DELETE FROM archive_files WHERE archive_name = ?", (archive_name,))
+
+    def get_file(self, archive_name):
+        """Return the catalog entry for one file as a dict (None if unknown)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM archive_files WHERE archive_name = ?", (archive_name,)).fetchone()
+            if row is None:
+                return None
+            entry = dict(row)
+            codes = conn.execute("SELECT kind, code FROM archive_codes WHERE archive_name = ? ORDER BY code",
+                                 (archive_name,)).fetchall()
+        entry["trial_codes"] = [r["code"] for r in codes if r["kind"] == "trial"]
+        entry["drug_codes"] = [r["code"] for r in codes if r["kind"] == "drug"]
+        return entry
+
+    def find_files(self, trial_code=None, drug_code=None, date_from=None, date_to=None):
+        """Archive names whose records may match all given criteria.
+
+        date_from/date_to (YYYY-MM-DD) select files with at least one record
+        period overlapping the window.
+        """
+        clauses, params = [], []
+        if trial_code is not None:
+            clauses.append("archive_name IN (SELECT archive_name FROM archive_codes WHERE kind = 'trial' AND code = ?)")
+            params.append(trial_code)
+        if drug_code is not None:
+            clauses.append("archive_name IN (SELECT archive_name FROM archive_codes WHERE kind = 'drug' AND code = ?)")
+            params.append(drug_code)
+        if date_from is not None:
+            clauses.append("max_end_date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("min_start_date <= ?")
+            params.append(date_to)
+        sql = "SELECT archive_name FROM archive_files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY archive_name"
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    def file_count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM archive_files").fetchone()[0]
+
+    def rebuild(self, archive_dir, validator, status_queue=None):
+        """Re-scan every archive in archive_dir and replace the catalog contents.
+
+        Returns (catalogued, skipped).
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM archive_codes")
+            conn.execute("DELETE FROM archive_files")
+        catalogued = skipped = 0
+        for path in sorted(Path(archive_dir).iterdir()):
+            if not path.is_file() or not ARCHIVE_NAME_PATTERN.match(path.name):
+                continue
+            result = validator.validate_file(path)
+            if not result.is_valid:
+                skipped += 1
+                emit(status_queue, "catalog_skipped", path.name, errors=result.error_total)
+                continue
+            self.record_file(path.name, result.stats, byte_size=result.byte_size,
+                             stored_size=path.stat().st_size, sha256=result.sha256,
+                             compression=compression_of(path),
+                             source_name=strip_archive_suffix(path.name).rsplit('_', 1)[0] + ".CSV")
+            catalogued += 1
+            emit(status_queue, "catalogued", path.name, records=result.stats.record_count)
+        return catalogued, skipped
@@ -0,0 +1,100 @@
+"""
+helix_checkpoint.py - validation checkpoints for files that grow by appends
+
+Some partners append rows to the same-named file over the day. Once a file
+has validated clean, a Checkpoint records how far it was checked: the byte
+offset where its last row ends, the number of data rows, a SHA-256 of the
+BOUNDARY_BYTES before that offset and the duplicate-check keys seen so far.
+When the file is validated again and has grown, the download restarts just
+before the offset (FTP REST); if the re-read boundary bytes still hash to the
+checkpoint, only the appended rows are parsed, numbered on from the
+checkpoint and deduplicated against its keys.
+
+FTP has no portable command for hashing part of a remote file, so the
+boundary window stands in for a hash of the whole prefix: it catches a file
+that was replaced, truncated or rewritten at its end, not an edit earlier in
+the file that left every later byte in place.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CHECKPOINT_DIRNAME = ".checkpoints"
+BOUNDARY_BYTES = 4096
+
+
+def boundary_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_boundary(path, before=b""):
+    """The last BOUNDARY_BYTES of before + the content of path"""
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - BOUNDARY_BYTES))
+        return (before + f.read())[-BOUNDARY_BYTES:]
+
+
+class Checkpoint:
+    """Validation state of the first `offset` bytes of a file, which validated clean
+    and end at a row boundary; offset 0 is a file not yet checked"""
+
+    def __init__(self, filename, offset=0, rows=0, boundary_sha256=None, keys=None):
+        self.filename = filename
+        self.offset = offset
+        self.rows = rows
+        self.boundary_sha256 = boundary_sha256
+        # Duplicate-check keys (tuples of the schema's unique columns)
+        self.keys = keys if keys is not None else set()
+
+    @property
+    def boundary_size(self):
+        """Bytes before offset that are re-read to confirm the prefix is unchanged"""
+        return min(BOUNDARY_BYTES, self.offset)
+
+    def matches(self, boundary):
+        return len(boundary) == self.boundary_size and boundary_digest(boundary) == self.boundary_sha256
+
+    def to_dict(self):
+        return {"filename": self.filename, "offset": self.offset, "rows": self.rows,
+                "boundary_sha256": self.boundary_sha256, "keys": sorted(self.keys)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["filename"], data["offset"], data["rows"], data["boundary_sha256"],
+                   {tuple(key) for key in data["keys"]})
+
+
+class CheckpointStore:
+    """One JSON checkpoint per file name, replaced atomically"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, filename):
+        return self.directory / f"{filename}.json"
+
+    def load(self, filename):
+        """The saved Checkpoint for filename, or None (also for an unreadable one)"""
+        path = self.path_for(filename)
+        try:
+            with open(path, encoding='utf-8') as f:
+                return Checkpoint.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, checkpoint):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(checkpoint.filename)
+        partial = path.with_name(path.name + ".part")
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint.to_dict(), f, ensure_ascii=False)
+        os.replace(partial, path)
+
+    def remove(self, filename):
+        self.path_for(filename).unlink(missing_ok=True)
@@ -0,0 +1,377 @@
+"""
+helix_cli.py - headless batch commands: validate, process and list
+
+The same validator and worker pool the GUI uses, driven from the command line
+so scripts, CI jobs and cron can work without Tk. Every command writes one
+record per file followed by a summary, either as JSON lines (streamed as files
+finish) or as a single JSON document. The exit status is 0 when every file
+passed, 1 when any file was invalid, rejected or could not be handled, and 2
+when the FTP server could not be reached at all.
+
+Records and the summary carry per-stage seconds (see helix_timing). With
+--profile the run is also profiled with cProfile, and the top functions and
+a per-stage table are printed to stderr afterwards.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from helix_archive import COMPRESSION_MODES, DEFAULT_COMPRESSION_LEVEL, strip_archive_suffix
+from helix_batch import BatchProgress, BatchWorkerPool, DEFAULT_BATCH_WORKERS
+from helix_cache import DEFAULT_DOWNLOAD_CACHE_BYTES
+from helix_cancel import CancellationToken, OperationCancelled
+from helix_events import DETAIL, FILE, SILENT, format_status
+from helix_filelist import filename_timestamp
+from helix_ftp import ClinicalDataProcessor
+from helix_timing import RunProfiler, StageTimer, stage_table
+from helix_validation import (ClinicalDataValidator, DEFAULT_MAX_ERRORS, DEFAULT_SAMPLE_FRACTION, FULL_VALIDATION,
+                               VALIDATION_MODES, ValidationMode)
+
+CLI_FORMATS = ("jsonl", "json")
+# Read when --password is not given, so the password stays out of `ps` and crontabs
+PASSWORD_ENV = "HELIX_FTP_PASSWORD"
+PROBLEM_STATES = ("invalid", "rejected", "failed", "cancelled")
+
+
+class StatusPrinter:
+    """Stands in for the GUI status queue, printing status events to stderr.
+
+    verbose is the number of -v flags: none keeps the validator silent (events
+    are never built), -v shows one line per file, -vv every stage.
+    """
+
+    def __init__(self, verbose=0, stream=None):
+        self.verbosity = SILENT if not verbose else FILE if verbose == 1 else DETAIL
+        self.stream = stream
+
+    def put(self, item, block=True, timeout=None):
+        message, _ = format_status(item)
+        if message != "complete":
+            print(message.strip("\n"), file=self.stream or sys.stderr)
+
+
+class ResultWriter:
+    """Writes per-file records, then a summary, as JSON lines or one JSON document"""
+
+    def __init__(self, out, fmt="jsonl", stages=None):
+        if fmt not in CLI_FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}' (expected one of {CLI_FORMATS})")
+        self.out = out
+        self.fmt = fmt
+        self.records = []
+        self.files = 0
+        self.counts = {}
+        self.rows = 0
+        self.problems = 0
+        # The run's per-stage totals: the records' stages plus what is added directly (connect, list)
+        self.stages = stages if stages is not None else StageTimer()
+
+    def write(self, record):
+        self.files += 1
+        status = record.get("status")
+        if status is not None:
+            self.counts[status] = self.counts.get(status, 0) + 1
+            self.problems += status in PROBLEM_STATES
+        self.rows += record.get("rows") or 0
+        self.stages.merge(record.get("stages") or {})
+        if self.fmt == "jsonl":
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.out.flush()
+        else:
+            self.records.append(record)
+
+    def close(self, **summary):
+        summary.update(files=self.files, counts=self.counts, rows=self.rows, stages=self.stages.to_dict())
+        if self.fmt == "jsonl":
+            self.out.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+        else:
+            json.dump({"files": self.records, "summary": summary}, self.out, ensure_ascii=False, indent=2)
+            self.out.write("\n")
+        self.out.flush()
+        return summary
+
+
+def file_record(name, status, seconds, rows=0, errors=0, error_counts=None, size=None, detail="", report=None,
+                result=None, stages=None):
+    record = {"file": name, "status": status, "rows": rows, "errors": errors,
+              "error_counts": {category: count for category, count in (error_counts or {}).items() if count},
+              "bytes": size, "seconds": round(seconds, 4), "detail": detail, "report": report,
+              "stages": {stage: round(value, 4) for stage, value in (stages or {}).items()}}
+    if result is not None and result.mode != "full":
+        # Triage runs: say whether the whole file was checked, and the sampled error rate
+        record.update(mode=result.mode, complete=result.complete)
+        if result.estimated_error_rate is not None:
+            record.update(estimated_rows=result.estimated_rows,
+                          estimated_error_rate=round(result.estimated_error_rate, 6))
+    return record
+
+
+def validation_mode(args):
+    """ValidationMode from --mode, --max-errors, --sample-fraction and --seed"""
+    try:
+        return ValidationMode(args.mode.replace("-", "_"), max_errors=args.max_errors,
+                              fraction=args.sample_fraction, seed=args.seed)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+
+
+def collect_csv_files(paths):
+    """Expand directories to the CSV files (plain or compressed) directly inside them"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(child for child in path.iterdir()
+                                if child.is_file() and strip_archive_suffix(child.name).lower().endswith(".csv")))
+        else:
+            files.append(path)
+    return files
+
+
+# One validator per worker process, created by the pool initializer
+_local_validator = None
+
+
+def _init_local_worker(download_dir, archive_dir, error_dir, mode=None):
+    global _local_validator
+    _local_validator = ClinicalDataValidator(download_dir, archive_dir, error_dir,
+                                             validation_mode=mode or FULL_VALIDATION)
+
+
+def _validate_local(path):
+    started = time.perf_counter()
+    try:
+        result = _local_validator.validate_file(path, report_name=Path(path).name)
+    except Exception as e:
+        return file_record(str(path), "failed", time.perf_counter() - started, detail=str(e))
+    return file_record(str(path), "valid" if result.is_valid else "invalid", time.perf_counter() - started,
+                       rows=result.rows_scanned, errors=result.error_total, error_counts=result.error_counts,
+                       size=result.byte_size, detail="" if result.is_valid else result.errors[0],
+                       report=str(result.report_path) if result.report_path else None, result=result,
+                       stages=result.timings.to_dict())
+
+
+def validate_local(paths, writer, workers, download_dir, archive_dir, error_dir, mode=None):
+    """Validate local files on a process pool (CSV parsing is CPU-bound); records keep input order"""
+    dirs = (download_dir, archive_dir, error_dir, mode)
+    if workers <= 1 or len(paths) <= 1:
+        _init_local_worker(*dirs)
+        for path in paths:
+            writer.write(_validate_local(path))
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_local_worker, initargs=dirs) as executor:
+        for record in executor.map(_validate_local, paths):
+            writer.write(record)
+
+
+def connect_processor(args, status=None):
+    # Every connection adds its connect and list time to the run's stages
+    processor = ClinicalDataProcessor(args.host, args.user, args.password, args.remote_dir, timings=args.stages)
+    if not processor.connect(status):
+        raise ConnectionError(f"Could not connect to {args.host}")
+    return processor
+
+
+def remote_entries(args, status):
+    processor = connect_processor(args, status)
+    try:
+        return processor.get_file_entries(status)
+    finally:
+        processor.disconnect()
+
+
+def run_remote(args, validator, names, action, writer, status):
+    """Run validate_remote_file or process_and_archive for names on a BatchWorkerPool"""
+    progress = BatchProgress()
+    cancel = CancellationToken()
+    timings = {}
+    run = validator.validate_remote_file if action == "validate" else validator.process_and_archive
+
+    def job(ftp, name):
+        started = time.perf_counter()
+        try:
+            if args.profiler is not None:
+                args.profiler.call(run, ftp, name, status, progress, cancel)
+            else:
+                run(ftp, name, status, progress, cancel)
+        finally:
+            timings[name] = time.perf_counter() - started
+
+    def failed(name, error):
+        progress.update(name, "cancelled" if isinstance(error, OperationCancelled) else "failed", str(error))
+
+    pool = BatchWorkerPool(lambda: connect_processor(args), max_workers=args.workers)
+    try:
+        for name in names:
+            progress.update(name, "queued")
+            pool.submit(lambda ftp, name=name: job(ftp, name), on_error=lambda e, name=name: failed(name, e),
+                        cancel=cancel)
+        try:
+            pool.wait()
+        except KeyboardInterrupt:
+            # Workers stop at their next check and remove partial files
+            cancel.cancel()
+            pool.wait()
+    finally:
+        pool.shutdown(wait=True)
+        validator.archive_pool.shutdown()
+    for name in names:
+        entry = progress.entry(name)
+        writer.write(file_record(name, entry["state"], timings.get(name, 0.0), rows=entry["rows"],
+                                 errors=entry["errors"], error_counts=entry["error_counts"],
+                                 size=entry["bytes"], detail=entry["detail"], stages=entry["stages"]))
+
+
+def _open_output(args):
+    if args.output:
+        return open(args.output, 'w', encoding='utf-8', newline='\n')
+    return sys.stdout
+
+
+def _finish(writer, out, started, **summary):
+    writer.close(seconds=round(time.perf_counter() - started, 3), **summary)
+    if out is not sys.stdout:
+        out.close()
+    return 1 if writer.problems else 0
+
+
+def validate_command(args):
+    status = StatusPrinter(args.verbose)
+    started = time.perf_counter()
+    out = _open_output(args)
+    mode = validation_mode(args)
+    writer = ResultWriter(out, args.format, args.stages)
+    if args.remote:
+        args.workers = args.workers or DEFAULT_BATCH_WORKERS
+        validator = ClinicalDataValidator(args.download_dir, args.archive_dir, args.error_dir, validation_mode=mode,
+                                          download_cache_bytes=args.cache_mb << 20)
+        names = args.paths or [name for name, _ in remote_entries(args, status)]
+        run_remote(args, validator, names, "validate", writer, status)
+        return _finish(writer, out, started, command="validate", source="remote", workers=args.workers,
+                       mode=str(mode))
+    # No paths: re-validate the whole archive (the cron use case)
+    paths = collect_csv_files(args.paths or [args.archive_dir])
+    # Profiled runs parse in this process, where cProfile can see it
+    workers = 1 if args.profiler is not None else args.workers or os.cpu_count() or 1
+    validate_local(paths, writer, workers, args.download_dir, args.archive_dir, args.error_dir, mode)
+    return _finish(writer, out, started, command="validate", source="local", workers=workers, mode=str(mode))
+
+
+def process_command(args):
+    status = StatusPrinter(args.verbose)
+    started = time.perf_counter()
+    mode = validation_mode(args)
+    validator = ClinicalDataValidator(args.download_dir, args.archive_dir, args.error_dir,
+                                      archive_compression=args.compression, compression_level=args.level,
+                                      columnar_export=args.columnar, validation_mode=mode,
+                                      download_cache_bytes=args.cache_mb << 20)
+    names = args.names or [name for name, _ in remote_entries(args, status)
+                           if name not in validator.processed_files]
+    out = _open_output(args)
+    writer = ResultWriter(out, args.format, args.stages)
+    run_remote(args, validator, names, "process", writer, status)
+    return _finish(writer, out, started, command="process", workers=args.workers, mode=str(mode))
+
+
+def list_command(args):
+    status = StatusPrinter(args.verbose)
+    started = time.perf_counter()
+    processed = ClinicalDataValidator(args.download_dir, args.archive_dir, args.error_dir).processed_files
+    entries = remote_entries(args, status)
+    out = _open_output(args)
+    writer = ResultWriter(out, args.format, args.stages)
+    for name, size in entries:
+        if args.new and name in processed:
+            continue
+        writer.write({"file": name, "bytes": size, "timestamp": filename_timestamp(name) or None,
+                      "processed": name in processed})
+    return _finish(writer, out, started, command="list")
+
+
+def run_command(args):
+    """Run the subcommand chosen on the command line and return the exit status"""
+    args.stages = StageTimer()
+    args.profiler = RunProfiler() if args.profile or args.profile_output else None
+    try:
+        if args.profiler is not None:
+            return args.profiler.call(args.handler, args)
+        return args.handler(args)
+    except ConnectionError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.profiler is not None:
+            print_profile(args)
+
+
+def print_profile(args):
+    """The per-stage table and the top functions of a profiled run, to stderr"""
+    print("⏱️ Time per stage\n" + stage_table(args.stages), file=sys.stderr)
+    print(args.profiler.report(), file=sys.stderr)
+    if args.profile_output:
+        args.profiler.stats().dump_stats(args.profile_output)
+        print(f"📄 cProfile statistics saved to {args.profile_output}", file=sys.stderr)
+
+
+def add_commands(subparsers, home):
+    """Register validate, process and list on Helix.py's subparsers, dispatched by run_command()"""
+    dirs = {"archive_dir": home / "ClinicalData" / "Archive", "download_dir": home / "ClinicalData" / "Downloads",
+            "error_dir": home / "ClinicalData" / "Errors"}
+
+    def common(parser, workers_help=None):
+        for dest, default in dirs.items():
+            parser.add_argument(f"--{dest.replace('_', '-')}", dest=dest, default=str(default))
+        parser.add_argument('--host', default="localhost")
+        parser.add_argument('--user', default="anonymous")
+        parser.add_argument('--password', default=os.environ.get(PASSWORD_ENV, ""),
+                            help=f'FTP password (default: ${PASSWORD_ENV})')
+        parser.add_argument('--remote-dir', default="")
+        parser.add_argument('--format', choices=CLI_FORMATS, default='jsonl')
+        parser.add_argument('--output', help='Write records to a file instead of stdout')
+        parser.add_argument('-v', '--verbose', action='count', default=0,
+                            help='Print progress to stderr: -v per file, -vv every stage')
+        parser.add_argument('--profile', action='store_true',
+                            help='Profile the run: print the top functions and time per stage to stderr')
+        parser.add_argument('--profile-output', metavar='FILE',
+                            help='With --profile (implied), also save the cProfile statistics to FILE')
+        if workers_help:
+            parser.add_argument('--workers', type=int, default=DEFAULT_BATCH_WORKERS, help=workers_help)
+
+    def triage(parser):
+        parser.add_argument('--mode', choices=[kind.replace("_", "-") for kind in VALIDATION_MODES], default='full',
+                            help='full checks every row; fail-fast stops after --max-errors invalid rows; '
+                                 'sample checks a random --sample-fraction of the rows and estimates the error rate')
+        parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS)
+        parser.add_argument('--sample-fraction', type=float, default=DEFAULT_SAMPLE_FRACTION)
+        parser.add_argument('--seed', type=int, default=0, help='Sampling seed, so a triage run can be repeated')
+        parser.add_argument('--cache-mb', type=int, default=DEFAULT_DOWNLOAD_CACHE_BYTES >> 20,
+                            help='Budget of the download cache shared with the GUI, in MiB (0 disables it)')
+
+    validate = subparsers.add_parser('validate', help='Validate local CSV files or remote files without the GUI')
+    validate.add_argument('paths', nargs='*',
+                          help='Files or directories (default: the archive directory); remote names with --remote')
+    validate.add_argument('--remote', action='store_true',
+                          help='Validate files on the FTP server (all CSV files when no names are given)')
+    common(validate)
+    triage(validate)
+    validate.add_argument('--workers', type=int,
+                          help=f'Parallel workers (default: CPU count locally, {DEFAULT_BATCH_WORKERS} for --remote)')
+    validate.set_defaults(handler=validate_command)
+
+    process = subparsers.add_parser('process', help='Download, validate and archive remote files')
+    process.add_argument('names', nargs='*', help='Remote file names (default: every file not yet processed)')
+    common(process, 'Parallel FTP connections')
+    triage(process)
+    process.add_argument('--compression', choices=COMPRESSION_MODES, default='none')
+    process.add_argument('--level', type=int, choices=range(0, 10), metavar='0-9', default=DEFAULT_COMPRESSION_LEVEL,
+                         help='gzip level or lzma preset for --compression (0 fastest, 9 smallest)')
+    process.add_argument('--columnar', action='store_true', help='Also write a columnar export of each archive')
+    process.set_defaults(handler=process_command)
+
+    listing = subparsers.add_parser('list', help='List CSV files on the FTP server')
+    listing.add_argument('--new', action='store_true', help='Only files not yet processed')
+    common(listing)
+    listing.set_defaults(handler=list_command)
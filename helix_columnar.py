@@ -0,0 +1,280 @@
+"""
+helix_columnar.py - columnar binary export of validated clinical records
+
+An export is a directory written next to an archived file
+(<archive>.CSV.cols/) holding one fixed-width little-endian file per column
+plus meta.json:
+
+    Dosage_mg             int64  ('<i8')
+    StartDate, EndDate    int32  ('<i4') days since 1970-01-01
+    other columns         int32  ('<i4') codes into a dictionary stored in meta.json
+
+Column files are raw arrays, so they can be opened with numpy.memmap (or the
+stdlib mmap fallback below) without any parsing.
+
+Queries filter on the numbers, but rows must read back as the CSV had them:
+a dosage of "007" or a date of "2024-1-5" passes validation yet does not
+survive the round trip through int64 or a day number. When a file has such
+values, the column gets a companion <field>.text.bin of int32 codes into a
+dictionary of the original texts, -1 meaning "the number's own spelling".
+A dosage too large for int64 cannot be stored at all; the writer then skips
+the export (see ColumnarWriter.skipped) and the file is served from its CSV.
+"""
+
+import importlib.util
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+
+from helix_archive import strip_archive_suffix
+
+
+# numpy costs ~100 ms to import, so only the functions that use it import it
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+COLUMNAR_SUFFIX = ".cols"
+COLUMNAR_FORMAT = "helix-columnar"
+COLUMNAR_VERSION = 1
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+FLUSH_ROWS = 65536
+
+FIELDS = ["PatientID", "TrialCode", "DrugCode", "Dosage_mg",
+          "StartDate", "EndDate", "Outcome", "SideEffects", "Analyst"]
+DATE_FIELDS = ("StartDate", "EndDate")
+DICTIONARY_FIELDS = ("PatientID", "TrialCode", "DrugCode", "Outcome", "SideEffects", "Analyst")
+# Numeric columns whose original text is kept when it differs from the number's spelling
+TEXT_FIELDS = ("Dosage_mg",) + DATE_FIELDS
+CANONICAL_TEXT = -1
+# array typecode and on-disk dtype per column kind
+_INT64 = ('q', '<i8')
+_INT32 = ('i', '<i4')
+
+
+def columnar_path_for(archive_path):
+    """Directory holding the columnar export for an archived file"""
+    archive_path = Path(archive_path)
+    return archive_path.with_name(strip_archive_suffix(archive_path.name) + COLUMNAR_SUFFIX)
+
+
+def date_to_days(value):
+    """date/datetime -> days since 1970-01-01"""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def days_to_date(days):
+    return date.fromordinal(int(days) + EPOCH_ORDINAL)
+
+
+def _column_layout(field):
+    return _INT64 if field == "Dosage_mg" else _INT32
+
+
+def _text_of(field, value):
+    """How iter_rows spells a numeric column's stored value"""
+    if field in DATE_FIELDS:
+        return days_to_date(value).isoformat()
+    return str(int(value))
+
+
+class ColumnarWriter:
+    """Streams valid records into column files under a temporary directory.
+
+    finish() moves the export into place; discard() throws it away (used when
+    the file turns out to be invalid). A row that cannot be stored (a dosage
+    outside int64) discards the export: skipped then says why, later rows are
+    ignored and finish() returns None.
+    """
+
+    def __init__(self, work_dir):
+        self.work_dir = Path(work_dir)
+        if self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+        self.work_dir.mkdir(parents=True)
+        self.rows = 0
+        self.skipped = None
+        self._buffers = {f: array(_column_layout(f)[0]) for f in FIELDS}
+        self._files = {f: open(self.work_dir / f"{f}.bin", 'wb') for f in FIELDS}
+        self._dictionaries = {f: {} for f in DICTIONARY_FIELDS}
+        for field in TEXT_FIELDS:
+            self._buffers[f"{field}.text"] = array(_INT32[0])
+            self._files[f"{field}.text"] = open(self.work_dir / f"{field}.text.bin", 'wb')
+            self._dictionaries[f"{field}.text"] = {}
+
+    def add(self, row, start_date, end_date, dosage):
+        """Append one validated row (start/end already parsed, dosage as int)"""
+        if self.skipped is not None:
+            return
+        buffers = self._buffers
+        try:
+            buffers["Dosage_mg"].append(dosage)
+        except OverflowError:
+            self.skipped = f"Dosage_mg '{row[3]}' does not fit in int64"
+            self.discard()
+            return
+        buffers["StartDate"].append(date_to_days(start_date))
+        buffers["EndDate"].append(date_to_days(end_date))
+        for field, value in zip(FIELDS, row):
+            codes = self._dictionaries.get(field)
+            if codes is not None:
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                buffers[field].append(code)
+        for field in TEXT_FIELDS:
+            text = row[FIELDS.index(field)]
+            code = CANONICAL_TEXT
+            if text != _text_of(field, buffers[field][-1]):
+                codes = self._dictionaries[f"{field}.text"]
+                code = codes.get(text)
+                if code is None:
+                    code = codes[text] = len(codes)
+            buffers[f"{field}.text"].append(code)
+        self.rows += 1
+        if self.rows % FLUSH_ROWS == 0:
+            self._flush()
+
+    def _flush(self):
+        for key, buf in self._buffers.items():
+            if buf:
+                if sys.byteorder == 'big':
+                    buf.byteswap()
+                buf.tofile(self._files[key])
+                del buf[:]
+
+    def _close_files(self):
+        for fh in self._files.values():
+            fh.close()
+
+    def finish(self, dest_dir):
+        """Write meta.json and move the export to dest_dir (replacing any old one).
+
+        Returns dest_dir, or None when the export was skipped.
+        """
+        if self.skipped is not None:
+            return None
+        self._flush()
+        self._close_files()
+        columns = {}
+        for field in FIELDS:
+            spec = {"file": f"{field}.bin", "dtype": _column_layout(field)[1]}
+            if field in DATE_FIELDS:
+                spec["unit"] = "days since 1970-01-01"
+            if field in self._dictionaries:
+                spec["dictionary"] = list(self._dictionaries[field])
+            if field in TEXT_FIELDS:
+                texts = self._dictionaries[f"{field}.text"]
+                if texts:
+                    spec["text"] = {"file": f"{field}.text.bin", "dtype": _INT32[1], "dictionary": list(texts)}
+                else:
+                    # Every value is spelled as the number: no companion column needed
+                    (self.work_dir / f"{field}.text.bin").unlink()
+            columns[field] = spec
+        meta = {"format": COLUMNAR_FORMAT, "version": COLUMNAR_VERSION, "rows": self.rows, "columns": columns}
+        with open(self.work_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        dest_dir = Path(dest_dir)
+        if dest_dir.exists():
+            shutil.rmtree(dest_dir)
+        os.replace(self.work_dir, dest_dir)
+        return dest_dir
+
+    def discard(self):
+        self._close_files()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class ColumnarReader:
+    """Memory-mapped access to a columnar export"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != COLUMNAR_FORMAT:
+            raise ValueError(f"{self.path} is not a {COLUMNAR_FORMAT} export")
+        self.rows = self.meta["rows"]
+        self._maps = []
+
+    @property
+    def fields(self):
+        return list(self.meta["columns"])
+
+    def column(self, field):
+        """Raw column values: numpy.memmap when numpy is available, else a memoryview"""
+        return self._map_column(self.meta["columns"][field])
+
+    def _map_column(self, spec):
+        file_path = self.path / spec["file"]
+        if HAS_NUMPY:
+            import numpy as np
+            if self.rows == 0:
+                return np.empty(0, dtype=spec["dtype"])
+            return np.memmap(file_path, dtype=spec["dtype"], mode='r', shape=(self.rows,))
+        typecode = 'q' if spec["dtype"] == '<i8' else 'i'
+        if self.rows == 0:
+            return memoryview(array(typecode))
+        if sys.byteorder == 'big':
+            values = array(typecode)
+            with open(file_path, 'rb') as f:
+                values.fromfile(f, self.rows)
+            values.byteswap()
+            return memoryview(values)
+        with open(file_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def dictionary(self, field):
+        return self.meta["columns"][field].get("dictionary")
+
+    def decode(self, field, codes=None):
+        """Decode a dictionary column (or selected codes) back to strings"""
+        dictionary = self.dictionary(field)
+        codes = self.column(field) if codes is None else codes
+        return [dictionary[c] for c in codes]
+
+    def iter_rows(self, indices=None):
+        """Yield rows as lists of strings in CSV column order, as the CSV spelled them"""
+        columns = {f: self.column(f) for f in FIELDS}
+        dictionaries = {f: self.dictionary(f) for f in DICTIONARY_FIELDS}
+        # field -> (codes, original texts) for numeric columns with non-canonical values
+        texts = {}
+        for field in TEXT_FIELDS:
+            spec = self.meta["columns"][field].get("text")
+            if spec is not None:
+                texts[field] = (self._map_column(spec), spec["dictionary"])
+        for i in (range(self.rows) if indices is None else indices):
+            row = []
+            for field in FIELDS:
+                value = columns[field][i]
+                if field in dictionaries:
+                    row.append(dictionaries[field][value])
+                    continue
+                if field in texts:
+                    codes, originals = texts[field]
+                    code = codes[i]
+                    if code != CANONICAL_TEXT:
+                        row.append(originals[code])
+                        continue
+                row.append(_text_of(field, value))
+            yield row
+
+    def close(self):
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,139 @@
+"""
+helix_encoding.py - byte-level pre-scan of file content
+
+ContentScan is fed the raw bytes of a file chunk by chunk - from an FTP
+transfer callback, or by scan_file() in the read that hashes a local file -
+and records, without parsing:
+
+- the SHA-256 and size of the content (the catalog fingerprint)
+- whether the bytes are valid UTF-8, and the offset of the first bad byte
+- a UTF-8 byte order mark, which is then stripped when the file is parsed
+- the line endings used ("\\n", "\\r\\n", "\\r" or "mixed")
+
+ASCII chunks, the usual case for clinical exports, are accepted with
+bytes.isascii() and never decoded; only chunks holding non-ASCII bytes pass
+through an incremental UTF-8 decoder (which also handles sequences split
+across chunks). A mis-encoded file is therefore rejected after the transfer,
+before any CSV parsing, and a clean file is decoded exactly once, by the
+parser. ScanningReader scans while a parser reads, for runs that may stop
+early (fail-fast) and so should not read the whole file up front.
+"""
+
+import codecs
+import hashlib
+import io
+
+from helix_archive import open_archive
+
+SCAN_CHUNK = 1 << 16
+UTF8_BOM = codecs.BOM_UTF8
+
+
+class ContentScan:
+    """Hash, UTF-8 validity, BOM and line endings of bytes passed to feed()"""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.byte_size = 0
+        self.valid = True
+        self.ascii = True
+        self.bom = False
+        self.error_offset = None
+        self.line_endings = {"\r\n": 0, "\n": 0, "\r": 0}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._head = b""
+        self._last_cr = False
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        self.sha256.update(chunk)
+        offset = self.byte_size
+        self.byte_size += len(chunk)
+        if offset < len(UTF8_BOM):
+            self._head += chunk[:len(UTF8_BOM) - offset]
+            self.bom = self._head == UTF8_BOM
+        self._count_line_endings(chunk)
+        if not self.valid:
+            return
+        # A pending partial sequence means the decoder must see this chunk even if it is ASCII
+        if chunk.isascii() and not self._decoder.getstate()[0]:
+            return
+        self.ascii = False
+        pending = len(self._decoder.getstate()[0])
+        try:
+            self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            # e.start counts from the bytes the decoder held back from the previous chunk
+            self._invalid(offset - pending + e.start)
+
+    def _count_line_endings(self, chunk):
+        crlf = chunk.count(b"\r\n")
+        if self._last_cr and chunk[:1] == b"\n":
+            # "\r" | "\n" split across chunks: counted as "\r" last time
+            crlf += 1
+            self.line_endings["\r"] -= 1
+        self.line_endings["\r\n"] += crlf
+        self.line_endings["\n"] += chunk.count(b"\n") - crlf
+        self.line_endings["\r"] += chunk.count(b"\r") - chunk.count(b"\r\n")
+        self._last_cr = chunk[-1:] == b"\r"
+
+    def _invalid(self, offset):
+        self.valid = False
+        self.error_offset = max(offset, 0)
+
+    def finish(self):
+        """Call after the last chunk: a sequence cut off at the end makes the content invalid"""
+        if self.valid:
+            pending = len(self._decoder.getstate()[0])
+            try:
+                self._decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self._invalid(self.byte_size - pending)
+        return self
+
+    @property
+    def encoding(self):
+        """Codec for parsing the content: utf-8-sig strips the BOM"""
+        return "utf-8-sig" if self.bom else "utf-8"
+
+    @property
+    def line_ending(self):
+        used = [ending for ending, count in self.line_endings.items() if count]
+        if not used:
+            return None
+        return used[0] if len(used) == 1 else "mixed"
+
+
+class ScanningReader(io.RawIOBase):
+    """Raw binary reader that feeds a ContentScan with the bytes as they are read,
+    for a caller that parses the stream while scanning it"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.scan = ContentScan()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.scan.feed(data)
+        return n
+
+    def close(self):
+        try:
+            self.raw.close()
+        finally:
+            super().close()
+
+
+def scan_file(path, chunk_size=SCAN_CHUNK):
+    """ContentScan of a plain or compressed file's content, in one read"""
+    scan = ContentScan()
+    with open_archive(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            scan.feed(chunk)
+    return scan.finish()
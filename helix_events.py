@@ -0,0 +1,133 @@
+"""
+helix_events.py - typed status events from the validator
+
+Workers report progress as StatusEvent objects (an event code, the file it
+concerns and its counts) rather than pre-formatted strings. Text is produced
+only when a consumer displays an event, with format_status(). A status queue
+may carry a `verbosity` attribute; emit() drops events above it before they
+are built, so a quiet or headless run pays almost nothing for reporting.
+Queues without the attribute receive every event, and plain (message, tag)
+tuples are still accepted wherever events are.
+"""
+
+from helix_timing import format_stages
+
+# Verbosity levels: an event is delivered when its level <= the queue's verbosity
+SILENT = 0
+SUMMARY = 1   # batch results and failures
+FILE = 2      # one line per file outcome
+DETAIL = 3    # every validation stage
+VERBOSITY_LEVELS = {"quiet": SUMMARY, "normal": FILE, "detail": DETAIL}
+
+SEPARATOR = "\n" + "=" * 60
+
+ERROR_LABELS = {
+    'dosage': "Dosage errors", 'date_range': "Date range errors", 'date_format': "Date format errors",
+    'outcome': "Outcome errors", 'duplicate': "Duplicates", 'missing_fields': "Missing fields",
+}
+
+# code -> (level, tag, template); templates are formatted with file= and the event's fields
+EVENTS = {
+    # Content validation stages
+    "filename_ok": (DETAIL, "success", "  ✓ Filename pattern valid"),
+    "filename_bad": (DETAIL, "error", "  ✗ Invalid pattern (expected CLINICALDATAYYYYMMDDHHMMSS.CSV)"),
+    "content_start": (DETAIL, "info", "  → Validating content..."),
+    "encoding_error": (DETAIL, "error", "  ✗ File is not valid UTF-8 encoded CSV"),
+    "read_error": (DETAIL, "error", "  ✗ File read error: {error}"),
+    "empty_file": (DETAIL, "error", "  ✗ File is empty"),
+    "header_check": (DETAIL, "info", "→ Checking header..."),
+    "header_bad": (DETAIL, "error", "  ✗ Header mismatch"),
+    "header_ok": (DETAIL, "success", "  ✓ Header valid ({fields} fields)"),
+    "rows_start": (DETAIL, "info", "→ Validating rows..."),
+    "no_data_rows": (DETAIL, "error", "  ✗ No data rows found"),
+    "duplicates_check": (DETAIL, "info", "→ Checking duplicates..."),
+    "rows_scanned": (DETAIL, "info", "  → Scanned {rows} rows"),
+    "valid_records": (DETAIL, "success", "  → Valid records: {records}"),
+    "error_count": (DETAIL, "error", "    • {label}: {count}"),
+    "finalizing": (DETAIL, "info", "→ Finalizing..."),
+    "stopped_early": (FILE, "warning", "  ⏹️ Stopped after {errors} invalid rows ({rows} scanned, {mode})"),
+    "sample_summary": (FILE, "info", "  🎲 Sampled {rows} of ~{estimated} rows: {rate:.1%} invalid ({mode})"),
+    # Per-file pipeline
+    "separator": (DETAIL, "info", SEPARATOR),
+    "skipped": (FILE, "warning", "\n⏭️ Skipping: {file} (already processed)"),
+    "validate_start": (FILE, "info", "🔍 Validating: {file}"),
+    "process_start": (FILE, "info", "Processing: {file}"),
+    "downloaded": (DETAIL, "success", "  📥 Downloaded successfully"),
+    "download_cached": (DETAIL, "success", "  ♻️ Unchanged on the server: using the cached download"),
+    "result_reused": (FILE, "info", "  ♻️ Content already validated ({records} records); not parsed again"),
+    "checkpoint_resume": (FILE, "info", "  ⏩ Resuming after row {rows} (byte {offset:,}): {appended:,} bytes appended"),
+    "checkpoint_stale": (FILE, "warning", "  ↩️ Checkpoint discarded ({reason}); downloading the whole file"),
+    "file_valid": (FILE, "success", "✅ VALID: {file} ({records} records)"),
+    "file_invalid": (FILE, "error", "❌ INVALID: {file} ({errors} errors)"),
+    "error_report": (FILE, "info", "  📄 Error report: {report}"),
+    "error_sample": (DETAIL, "error", "    • {message}"),
+    "rejected_pattern": (FILE, "error", "  ❌ Rejected - Invalid pattern (GUID: {guid})"),
+    "rejected": (FILE, "error", "  ❌ Rejected ({errors} errors)"),
+    "columnar_export": (DETAIL, "info", "  🧱 Columnar export: {path}"),
+    "columnar_skipped": (FILE, "warning", "  ⚠️ Columnar export skipped: {reason}"),
+    "compressing": (DETAIL, "info", "  🗜️ Compressing to: {archive} ({method}, level {level})"),
+    "archived": (FILE, "success", "  ✅ Archived as: {archive} ({records} records)"),
+    "archived_compressed": (FILE, "success", "  ✅ Archived as: {archive} ({records} records, "
+                                             "{original_size:,} → {stored_size:,} bytes, {ratio:.1f}x)"),
+    "archive_wait": (DETAIL, "info", "🗜️ Waiting for {count} archive job(s)..."),
+    "cancelled": (FILE, "warning", "⛔ Cancelled: {file}"),
+    "catalogued": (FILE, "success", "  ✓ Catalogued {file} ({records} records)"),
+    "catalog_skipped": (FILE, "warning", "  ⚠️ Skipped {file}: {errors} validation errors"),
+    "stage_times": (DETAIL, "info", "  ⏱️ {stages}"),
+    # Failures and batch results
+    "validate_failed": (SUMMARY, "error", "❌ Error validating {file}: {error}"),
+    "fatal_error": (SUMMARY, "error", "  ❌ Fatal error: {error}"),
+    "archive_failed": (SUMMARY, "error", "  ❌ Archival error for {file} (GUID: {guid})"),
+    "catalog_failed": (SUMMARY, "warning", "  ⚠️ Catalog update failed for {archive}: {error}"),
+    "validation_cancelled": (SUMMARY, "warning", "⛔ Validation cancelled"),
+    "processing_cancelled": (SUMMARY, "warning", "⛔ Processing cancelled"),
+    "validation_complete": (SUMMARY, "complete", "✅ Validation complete!"),
+    "validation_summary": (SUMMARY, "summary", "📊 Results: {valid} valid, {invalid} invalid"),
+    "processing_complete": (SUMMARY, "complete", "✅ Processing complete!"),
+    "processing_summary": (SUMMARY, "summary", "📊 Summary: {archived} archived, {rejected} rejected"),
+}
+
+
+class StatusEvent:
+    """What happened (code), to which file, with which counts; formatted on display"""
+
+    __slots__ = ("code", "file", "fields")
+
+    def __init__(self, code, file=None, fields=None):
+        self.code = code
+        self.file = file
+        self.fields = fields or {}
+
+    @property
+    def level(self):
+        return EVENTS[self.code][0]
+
+    @property
+    def tag(self):
+        return EVENTS[self.code][1]
+
+    def format(self):
+        template = EVENTS[self.code][2]
+        if self.code == "error_count":
+            return template.format(label=ERROR_LABELS.get(self.fields["category"], self.fields["category"]),
+                                   **self.fields)
+        if self.code == "stage_times":
+            return template.format(stages=format_stages(self.fields["stages"]))
+        return template.format(file=self.file, **self.fields)
+
+    def __repr__(self):
+        return f"StatusEvent({self.code!r}, {self.file!r}, {self.fields!r})"
+
+
+def emit(status_queue, code, file=None, **fields):
+    """Queue a StatusEvent unless status_queue is None or too quiet for code's level"""
+    if status_queue is None or EVENTS[code][0] > getattr(status_queue, "verbosity", DETAIL):
+        return
+    status_queue.put(StatusEvent(code, file, fields))
+
+
+def format_status(item):
+    """(message, tag) for a StatusEvent or an already formatted (message, tag) tuple"""
+    if isinstance(item, StatusEvent):
+        return item.format(), item.tag
+    return item
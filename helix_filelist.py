@@ -0,0 +1,156 @@
+"""
+helix_filelist.py - search and ordering over large remote file listings
+
+FileSearchIndex is built once per listing. Substring queries of three or more
+characters only check names from the rarest trigram's posting list, and a query
+that extends the previous one only re-checks the previous matches.
+
+FileListModel holds the whole listing in memory and exposes the current
+filtered, sorted view by position, so a list widget only has to render the
+rows that are on screen.
+"""
+
+import re
+from collections import defaultdict
+
+NGRAM = 3
+SORT_KEYS = ("name", "size", "timestamp")
+TIMESTAMP_PATTERN = re.compile(r'(\d{14})')
+
+
+class FileSearchIndex:
+    """Case-insensitive substring search over a fixed list of names"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._lower = [name.lower() for name in self.names]
+        postings = defaultdict(list)
+        for i, name in enumerate(self._lower):
+            for gram in {name[j:j + NGRAM] for j in range(len(name) - NGRAM + 1)}:
+                postings[gram].append(i)
+        self._postings = dict(postings)
+        self._last_term = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, term):
+        """Return ascending indices of names containing term"""
+        term = term.lower()
+        if not term:
+            result = list(range(len(self.names)))
+        else:
+            if self._last_term and self._last_term in term:
+                candidates = self._last_result
+            elif len(term) >= NGRAM:
+                grams = {term[j:j + NGRAM] for j in range(len(term) - NGRAM + 1)}
+                lists = [self._postings.get(gram, ()) for gram in grams]
+                candidates = min(lists, key=len)
+            else:
+                candidates = range(len(self.names))
+            lower = self._lower
+            result = [i for i in candidates if term in lower[i]]
+        self._last_term = term
+        self._last_result = result
+        return result
+
+
+def filename_timestamp(name):
+    """The YYYYMMDDHHMMSS stamp embedded in a filename, or "" when there is none"""
+    match = TIMESTAMP_PATTERN.search(name)
+    return match.group(1) if match else ""
+
+
+def format_size(size):
+    if size is None:
+        return ""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class FileListModel:
+    """Remote listing with a filtered, sorted view addressed by row position.
+
+    Selection is kept as a set of names so it survives scrolling, sorting and
+    filtering; selected_names() only reports names in the current view.
+    """
+
+    def __init__(self, names=(), sizes=None):
+        self.names = list(names)
+        self.sizes = list(sizes) if sizes is not None else [None] * len(self.names)
+        self.index = FileSearchIndex(self.names)
+        self.sort_key = "name"
+        self.reverse = False
+        self.term = ""
+        self.selected = set()
+        self._ranks = {}
+        self.view = self._ordered(range(len(self.names)))
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build from (name, size) pairs as returned by get_file_entries"""
+        entries = list(entries)
+        return cls([name for name, _ in entries], [size for _, size in entries])
+
+    def __len__(self):
+        return len(self.view)
+
+    @property
+    def total(self):
+        return len(self.names)
+
+    def _rank(self, key):
+        """rank[i] is the position of names[i] when sorted by key (computed once per key)"""
+        if key not in self._ranks:
+            if key == "name":
+                sort_key = self.names.__getitem__
+            elif key == "size":
+                sort_key = lambda i: (-1 if self.sizes[i] is None else self.sizes[i], self.names[i])
+            else:
+                sort_key = lambda i: (filename_timestamp(self.names[i]), self.names[i])
+            order = sorted(range(len(self.names)), key=sort_key)
+            rank = [0] * len(order)
+            for position, i in enumerate(order):
+                rank[i] = position
+            self._ranks[key] = rank
+        return self._ranks[key]
+
+    def _ordered(self, indices):
+        return sorted(indices, key=self._rank(self.sort_key).__getitem__, reverse=self.reverse)
+
+    def set_filter(self, term):
+        """Apply a substring filter; returns True when the view changed"""
+        term = term.lower()
+        if term == self.term:
+            return False
+        self.term = term
+        self.view = self._ordered(self.index.search(term))
+        return True
+
+    def set_sort(self, key, reverse=False):
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{key}' (expected one of {SORT_KEYS})")
+        if (key, reverse) == (self.sort_key, self.reverse):
+            return
+        self.sort_key, self.reverse = key, reverse
+        self.view = self._ordered(self.view)
+
+    def name_at(self, position):
+        return self.names[self.view[position]]
+
+    def label_at(self, position):
+        i = self.view[position]
+        size = self.sizes[i]
+        return self.names[i] if size is None else f"{self.names[i]}    {format_size(size)}"
+
+    def labels(self, start, stop):
+        return [self.label_at(position) for position in range(start, min(stop, len(self.view)))]
+
+    def selected_names(self):
+        """Selected names that are in the current view, in view order"""
+        if not self.selected:
+            return []
+        return [self.names[i] for i in self.view if self.names[i] in self.selected]
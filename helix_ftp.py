@@ -0,0 +1,106 @@
+"""
+helix_ftp.py - FTP access to the clinical data server
+"""
+
+import ftplib
+import re
+
+from helix_timing import StageTimer
+
+class ClinicalDataProcessor:
+    def __init__(self, ftp_host, ftp_user, ftp_pass, remote_dir="", timings=None):
+        self.ftp_host = ftp_host
+        self.ftp_user = ftp_user
+        self.ftp_pass = ftp_pass
+        self.remote_dir = remote_dir
+        self.ftp = None
+        self.connected = False
+        # Seconds spent connecting and listing (a StageTimer, possibly shared by a run's connections)
+        self.timings = timings if timings is not None else StageTimer()
+
+    def connect(self, status_queue=None, passive=True, timeout=30):
+        with self.timings.stage("connect"):
+            return self._connect(status_queue, passive, timeout)
+
+    def _connect(self, status_queue, passive, timeout):
+        try:
+            if self.ftp:
+                try:
+                    self.ftp.quit()
+                except Exception:
+                    pass
+            self.ftp = ftplib.FTP(timeout=timeout)
+            self.ftp.connect(self.ftp_host)
+            self.ftp.set_pasv(passive)
+            self.ftp.login(self.ftp_user, self.ftp_pass)
+            if self.remote_dir:
+                try:
+                    self.ftp.cwd(self.remote_dir)
+                except Exception as e:
+                    if status_queue:
+                        status_queue.put((f"Warning: Could not change to remote dir '{self.remote_dir}': {e}", "warning"))
+            self.connected = True
+            if status_queue:
+                status_queue.put(("✅ FTP connection successful", "success"))
+                try:
+                    status_queue.put((f"Current directory: {self.ftp.pwd()}", "info"))
+                except Exception:
+                    pass
+            return True
+        except Exception as e:
+            self.connected = False
+            if status_queue:
+                status_queue.put((f"❌ Connection failed: {e}", "error"))
+            return False
+
+    def disconnect(self):
+        if self.ftp:
+            try:
+                self.ftp.quit()
+            except Exception:
+                try:
+                    self.ftp.close()
+                except Exception:
+                    pass
+        self.connected = False
+        self.ftp = None
+
+    def get_file_list(self, status_queue=None):
+        if not self.ftp or not self.connected:
+            if status_queue:
+                status_queue.put(("Not connected to FTP server", "error"))
+            return []
+        try:
+            with self.timings.stage("list"):
+                files = self.ftp.nlst()
+            # simple CSV detection; keep case-insensitive
+            csv_files = [f for f in files if re.search(r'\.csv$', f, re.IGNORECASE)]
+            if status_queue and csv_files:
+                status_queue.put((f"Found {len(csv_files)} CSV files", "success"))
+            elif status_queue:
+                status_queue.put(("No CSV files found", "warning"))
+            return sorted(csv_files)
+        except Exception as e:
+            if status_queue:
+                status_queue.put((f"Failed to retrieve file list: {e}", "error"))
+            return []
+
+    def get_file_entries(self, status_queue=None):
+        """(name, size) pairs for CSV files; size is None when the server has no MLSD"""
+        if not self.ftp or not self.connected:
+            if status_queue:
+                status_queue.put(("Not connected to FTP server", "error"))
+            return []
+        try:
+            with self.timings.stage("list"):
+                entries = [(name, int(facts["size"]) if facts.get("size", "").isdigit() else None)
+                           for name, facts in self.ftp.mlsd(facts=["type", "size"])
+                           if facts.get("type", "file") == "file" and re.search(r'\.csv$', name, re.IGNORECASE)]
+        except ftplib.all_errors:
+            # Servers without MLSD: names only
+            return [(name, None) for name in self.get_file_list(status_queue)]
+        if status_queue and entries:
+            status_queue.put((f"Found {len(entries)} CSV files", "success"))
+        elif status_queue:
+            status_queue.put(("No CSV files found", "warning"))
+        return sorted(entries)
@@ -0,0 +1,852 @@
+"""
+helix_gui.py - Tk user interface for the clinical data processor
+
+Imported only when the GUI starts (or a GUI name is looked up on Helix), so
+headless use of the validator never loads tkinter.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from datetime import datetime
+from pathlib import Path
+from tkinter import ttk, scrolledtext, messagebox, filedialog, Listbox, SINGLE, EXTENDED
+
+from helix_archive import COMPRESSION_MODES, DEFAULT_COMPRESSION_LEVEL
+from helix_batch import (ACTIVE_STATES, BatchDashboard, BatchProgress, BatchWorkerPool, DEFAULT_BATCH_WORKERS,
+                         FINAL_STATES, format_eta)
+from helix_cancel import CancellationToken, OperationCancelled
+from helix_events import DETAIL, VERBOSITY_LEVELS, format_status
+from helix_filelist import FileListModel, SORT_KEYS, format_size
+from helix_ftp import ClinicalDataProcessor
+from helix_reports import ErrorReportReader, REPORT_SUFFIX
+from helix_validation import ClinicalDataValidator
+
+COLORS = {
+    'primary': '#8B7355','secondary': '#A52A2A','accent': '#D2691E','dark_bg': '#2F4F4F',
+    'medium_bg': '#708090','light_bg': '#F5F5F5','card_bg': '#FFFFFF','text_dark': '#2F4F4F',
+    'text_light': '#FFFFFF','text_muted': '#696969','success': '#228B22','warning': '#FF8C00',
+    'error': '#DC143C','border': '#C0C0C0','btn_connect': '#27AE60','btn_disconnect': '#E74C3C',
+    'btn_validate': '#3498DB','btn_process': '#9B59B6','btn_search': '#16A085','btn_refresh': '#F39C12',
+    'btn_browse': '#95A5A6','btn_utility': '#34495E','btn_disabled': '#BDC3C7',
+}
+
+# Status log rendering: the log widget keeps at most LOG_MAX_LINES lines and each
+# check_queue tick spends at most QUEUE_TICK_BUDGET seconds draining messages.
+LOG_MAX_LINES = 5000
+QUEUE_TICK_BUDGET = 0.015
+QUEUE_TICK_MAX_MESSAGES = 500
+QUEUE_POLL_MS = 100
+QUEUE_IDLE_POLL_MS = 2000
+SEARCH_DEBOUNCE_MS = 150
+BATCH_REFRESH_MS = 500
+# The dashboard redraws at a fixed low rate regardless of batch activity
+DASHBOARD_REFRESH_MS = 1000
+
+
+class NotifyingQueue(queue.Queue):
+    """Status queue that wakes the consumer instead of waiting to be polled.
+
+    notify() is called once per burst of puts; the consumer calls
+    clear_wakeup() before draining so the next put signals again.
+    Producers skip status events above `verbosity` (see helix_events.emit).
+    """
+
+    def __init__(self, notify=None, verbosity=DETAIL):
+        super().__init__()
+        self.notify = notify
+        self.verbosity = verbosity
+        self._wakeup_pending = False
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if self.notify is not None and not self._wakeup_pending:
+            self._wakeup_pending = True
+            try:
+                self.notify()
+            except Exception:
+                # No wakeup delivered; the consumer's fallback poll will pick it up
+                self._wakeup_pending = False
+
+    def clear_wakeup(self):
+        self._wakeup_pending = False
+
+
+class ErrorReportViewer:
+    """Paged view of a JSONL error report; only the visible page is read from disk"""
+
+    COLUMNS = ("row", "field", "code", "value", "message")
+
+    def __init__(self, parent, report_path, page_size=200):
+        self.reader = ErrorReportReader(report_path, page_size=page_size)
+        self.page = 0
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Error Report - {Path(report_path).name}")
+        self.window.geometry("900x500")
+        self.window.configure(bg=COLORS['light_bg'])
+
+        table_frame = ttk.Frame(self.window, style='Modern.TFrame'); table_frame.pack(fill=tk.BOTH, expand=True, padx=12, pady=(12, 6))
+        scrollbar = ttk.Scrollbar(table_frame); scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(table_frame, columns=self.COLUMNS, show='headings', yscrollcommand=scrollbar.set)
+        widths = {"row": 60, "field": 160, "code": 150, "value": 160, "message": 320}
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.title())
+            self.tree.column(col, width=widths[col], anchor=tk.W)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.tree.yview)
+
+        nav_frame = ttk.Frame(self.window, style='Modern.TFrame'); nav_frame.pack(fill=tk.X, padx=12, pady=(0, 12))
+        self.prev_btn = ttk.Button(nav_frame, text="◀ PREV", command=self.prev_page, style='Utility.TButton'); self.prev_btn.pack(side=tk.LEFT)
+        self.next_btn = ttk.Button(nav_frame, text="NEXT ▶", command=self.next_page, style='Utility.TButton'); self.next_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.page_label = ttk.Label(nav_frame, text="", style='Subheader.TLabel'); self.page_label.pack(side=tk.RIGHT)
+        self.show_page(0)
+
+    def show_page(self, page):
+        entries = self.reader.read_page(page)
+        if not entries and page > 0:
+            self.next_btn.config(state=tk.DISABLED)
+            return
+        self.page = page
+        self.tree.delete(*self.tree.get_children())
+        for entry in entries:
+            self.tree.insert("", tk.END, values=tuple("" if entry.get(col) is None else entry.get(col) for col in self.COLUMNS))
+        first = page * self.reader.page_size + 1
+        self.page_label.config(text=f"Page {page + 1} · entries {first}-{first + len(entries) - 1}" if entries else "No entries")
+        self.prev_btn.config(state=tk.NORMAL if page > 0 else tk.DISABLED)
+        self.next_btn.config(state=tk.NORMAL if self.reader.has_next(page) else tk.DISABLED)
+
+    def prev_page(self):
+        if self.page > 0:
+            self.show_page(self.page - 1)
+
+    def next_page(self):
+        self.show_page(self.page + 1)
+
+
+class VirtualFileList:
+    """Listbox that only holds the rows on screen; the listing lives in a FileListModel"""
+
+    def __init__(self, parent, model=None, on_select=None, selectmode=SINGLE, height=12, **listbox_options):
+        self.model = model if model is not None else FileListModel()
+        self.on_select = on_select
+        self.selectmode = selectmode
+        self.rows = height
+        self.top = 0
+        self._linespace = None
+        self.frame = ttk.Frame(parent, style='Modern.TFrame')
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self.yview); self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = Listbox(self.frame, selectmode=selectmode, height=height, exportselection=False,
+                               activestyle='none', **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.bind('<<ListboxSelect>>', self._on_listbox_select)
+        self.listbox.bind('<Button-1>', self._on_click)
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-1, "units"))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(1, "units"))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-1, "pages"))
+        self.listbox.bind('<Next>', lambda e: self.scroll(1, "pages"))
+        self.listbox.bind('<Home>', lambda e: self.scroll_to(0))
+        self.listbox.bind('<End>', lambda e: self.scroll_to(len(self.model)))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_model(self, model):
+        self.model = model
+        self.top = 0
+        self.render()
+
+    def scroll_to(self, top):
+        self.top = max(0, min(int(top), len(self.model) - self.rows))
+        self.render()
+        return "break"
+
+    def scroll(self, number, what="units"):
+        step = self.rows if what == "pages" else 1
+        return self.scroll_to(self.top + int(number) * step)
+
+    def yview(self, *args):
+        """Scrollbar command: moveto FRACTION | scroll N units|pages"""
+        if args and args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.model))
+        elif args and args[0] == "scroll":
+            self.scroll(args[1], args[2])
+
+    def render(self):
+        total = len(self.model)
+        self.top = max(0, min(self.top, total - self.rows))
+        labels = self.model.labels(self.top, self.top + self.rows)
+        self.listbox.delete(0, tk.END)
+        if labels:
+            self.listbox.insert(0, *labels)
+        for offset in range(len(labels)):
+            if self.model.name_at(self.top + offset) in self.model.selected:
+                self.listbox.selection_set(offset)
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(labels)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        if self._linespace is None:
+            self._linespace = tkfont.Font(root=self.listbox, font=self.listbox.cget('font')).metrics('linespace')
+        # Tk listbox rows are one pixel taller than the font's line spacing
+        rows = max(1, event.height // (self._linespace + 1))
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
+
+    def _on_click(self, event):
+        # A plain click replaces the selection, including rows scrolled out of view
+        if self.selectmode == SINGLE or not event.state & (0x0001 | 0x0004):
+            self.model.selected.clear()
+
+    def _on_listbox_select(self, event=None):
+        visible = [self.model.name_at(self.top + offset)
+                   for offset in range(min(self.rows, len(self.model) - self.top))]
+        self.model.selected.difference_update(visible)
+        self.model.selected.update(visible[i] for i in self.listbox.curselection() if i < len(visible))
+        if self.on_select:
+            self.on_select(event)
+
+    def selected_names(self):
+        return self.model.selected_names()
+
+
+class ClinicalDataGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("HelixSoft Clinical Data Processor")
+        self.root.geometry("1100x800")
+        self.root.configure(bg=COLORS['light_bg'])
+        self.style = ttk.Style()
+        try:
+            self.style.theme_use('clam')
+        except Exception:
+            pass
+        self.configure_styles()
+        self.processor = None
+        self.validator = None
+        self.is_processing = False
+        self.file_entries = []
+        self._search_job = None
+        self.batch_pool = None
+        self.batch_progress = BatchProgress()
+        # The latest submission's token; batch_tokens holds those of every submission in the running batch
+        self.batch_cancel = CancellationToken()
+        self.batch_tokens = []
+        self.batch_dashboard = BatchDashboard(self.batch_progress)
+        self._batch_rows = {}
+        self._batch_refresh_job = None
+        home = Path.home()
+        self.ftp_host = tk.StringVar(value="localhost")
+        self.ftp_user = tk.StringVar(value="anonymous")
+        self.ftp_pass = tk.StringVar(value="")
+        self.remote_dir = tk.StringVar(value="")
+        self.download_dir = tk.StringVar(value=str(home / "ClinicalData" / "Downloads"))
+        self.archive_dir = tk.StringVar(value=str(home / "ClinicalData" / "Archive"))
+        self.error_dir = tk.StringVar(value=str(home / "ClinicalData" / "Errors"))
+        self.archive_compression = tk.StringVar(value="none")
+        self.compression_level = tk.IntVar(value=DEFAULT_COMPRESSION_LEVEL)
+        self.columnar_export = tk.BooleanVar(value=False)
+        self.sort_key = tk.StringVar(value="name")
+        self.sort_reverse = tk.BooleanVar(value=False)
+        self.batch_workers = tk.IntVar(value=DEFAULT_BATCH_WORKERS)
+        self.search_var = tk.StringVar()
+        self.log_verbosity = tk.StringVar(value="detail")
+        self.setup_directories()
+        self.create_widgets()
+        self.status_queue = NotifyingQueue(notify=self._notify_status,
+                                           verbosity=VERBOSITY_LEVELS[self.log_verbosity.get()])
+        self.root.bind('<<StatusQueued>>', lambda event: self.check_queue())
+        self._poll_ms = QUEUE_POLL_MS
+        self._poll_job = self.root.after(QUEUE_POLL_MS, self.check_queue)
+        self.root.after(DASHBOARD_REFRESH_MS, self.refresh_dashboard)
+
+    def configure_styles(self):
+        s = self.style
+        s.configure('Modern.TFrame', background=COLORS['light_bg'])
+        s.configure('Card.TFrame', background=COLORS['card_bg'], relief='raised', borderwidth=1)
+        s.configure('Header.TLabel', font=('Segoe UI', 16, 'bold'), background=COLORS['light_bg'], foreground=COLORS['dark_bg'])
+        s.configure('Subheader.TLabel', font=('Segoe UI', 10, 'bold'), background=COLORS['light_bg'], foreground=COLORS['text_dark'])
+        btn_map = {'Connect': COLORS['btn_connect'],'Disconnect': COLORS['btn_disconnect'],'Validate': COLORS['btn_validate'],'Process': COLORS['btn_process'],'Search': COLORS['btn_search'],'Refresh': COLORS['btn_refresh'],'Browse': COLORS['btn_browse'],'Utility': COLORS['btn_utility'],}
+        for name, bg in btn_map.items():
+            s.configure(f'{name}.TButton', padding=(8, 6), font=('Segoe UI', 9, 'bold'), background=bg, foreground=COLORS['text_light'], relief='raised', borderwidth=1)
+            s.map(f'{name}.TButton', background=[('disabled', COLORS['btn_disabled'])], relief=[('pressed', 'sunken'), ('!pressed', 'raised')])
+        s.configure('Metric.TLabel', font=('Consolas', 9), background=COLORS['light_bg'], foreground=COLORS['text_dark'])
+        s.configure('Modern.TEntry', padding=(6, 6), font=('Segoe UI', 10), fieldbackground=COLORS['card_bg'])
+
+    def setup_directories(self):
+        for var in [self.download_dir, self.archive_dir, self.error_dir]:
+            Path(var.get()).mkdir(parents=True, exist_ok=True)
+
+    def create_widgets(self):
+        main_container = ttk.Frame(self.root, style='Modern.TFrame')
+        main_container.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        header_frame = ttk.Frame(main_container, style='Modern.TFrame')
+        header_frame.pack(fill=tk.X, pady=(0, 12))
+        ttk.Label(header_frame, text="🧬 HELIXSOFT CLINICAL DATA PROCESSOR", style='Header.TLabel').pack(side=tk.LEFT)
+        self.status_label = ttk.Label(header_frame, text="● DISCONNECTED", foreground=COLORS['error'], font=('Segoe UI', 10, 'bold'), background=COLORS['light_bg'])
+        self.status_label.pack(side=tk.RIGHT)
+        content_frame = ttk.Frame(main_container, style='Modern.TFrame')
+        content_frame.pack(fill=tk.BOTH, expand=True)
+        left_panel = ttk.Frame(content_frame, style='Modern.TFrame')
+        left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 12))
+        right_panel = ttk.Frame(content_frame, style='Modern.TFrame')
+        right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(12, 0))
+
+        ftp_card = ttk.LabelFrame(left_panel, text="🔌 FTP CONNECTION", style='Modern.TFrame', padding=12)
+        ftp_card.pack(fill=tk.X, pady=(0, 12))
+        form_frame = ttk.Frame(ftp_card, style='Modern.TFrame'); form_frame.pack(fill=tk.X)
+        host_frame = ttk.Frame(form_frame, style='Modern.TFrame'); host_frame.pack(fill=tk.X, pady=4)
+        ttk.Label(host_frame, text="Host:", style='Subheader.TLabel', width=12).pack(side=tk.LEFT)
+        ttk.Entry(host_frame, textvariable=self.ftp_host, style='Modern.TEntry', width=28).pack(side=tk.LEFT, fill=tk.X, padx=(6, 0))
+        user_frame = ttk.Frame(form_frame, style='Modern.TFrame'); user_frame.pack(fill=tk.X, pady=4)
+        ttk.Label(user_frame, text="Username:", style='Subheader.TLabel', width=12).pack(side=tk.LEFT)
+        ttk.Entry(user_frame, textvariable=self.ftp_user, style='Modern.TEntry', width=28).pack(side=tk.LEFT, fill=tk.X, padx=(6, 0))
+        pass_frame = ttk.Frame(form_frame, style='Modern.TFrame'); pass_frame.pack(fill=tk.X, pady=4)
+        ttk.Label(pass_frame, text="Password:", style='Subheader.TLabel', width=12).pack(side=tk.LEFT)
+        ttk.Entry(pass_frame, textvariable=self.ftp_pass, show="*", style='Modern.TEntry', width=28).pack(side=tk.LEFT, fill=tk.X, padx=(6, 0))
+        conn_btn_frame = ttk.Frame(ftp_card, style='Modern.TFrame'); conn_btn_frame.pack(fill=tk.X, pady=(8, 0))
+        self.connect_btn = ttk.Button(conn_btn_frame, text="🔌 CONNECT", command=self.connect_to_server, style='Connect.TButton'); self.connect_btn.pack(side=tk.LEFT, padx=(0, 8))
+        self.disconnect_btn = ttk.Button(conn_btn_frame, text="❌ DISCONNECT", command=self.disconnect_from_server, style='Disconnect.TButton', state=tk.DISABLED); self.disconnect_btn.pack(side=tk.LEFT)
+
+        file_card = ttk.LabelFrame(left_panel, text="📁 SERVER FILES", style='Modern.TFrame', padding=12); file_card.pack(fill=tk.BOTH, expand=True, pady=(0, 12))
+        controls_frame = ttk.Frame(file_card, style='Modern.TFrame'); controls_frame.pack(fill=tk.X, pady=(0, 8))
+        ttk.Label(controls_frame, text="Search:", style='Subheader.TLabel').pack(side=tk.LEFT)
+        self.search_entry = ttk.Entry(controls_frame, textvariable=self.search_var, style='Modern.TEntry', width=28); self.search_entry.pack(side=tk.LEFT, padx=(6, 6), fill=tk.X, expand=True)
+        self.search_entry.bind('<KeyRelease>', self.schedule_filter)
+        ttk.Button(controls_frame, text="🔍 SEARCH", command=self.filter_file_list, style='Search.TButton').pack(side=tk.LEFT, padx=(6, 6))
+        ttk.Button(controls_frame, text="🔄 REFRESH", command=self.refresh_file_list, style='Refresh.TButton').pack(side=tk.RIGHT)
+
+        sort_frame = ttk.Frame(file_card, style='Modern.TFrame'); sort_frame.pack(fill=tk.X, pady=(0, 8))
+        ttk.Label(sort_frame, text="Sort:", style='Subheader.TLabel').pack(side=tk.LEFT)
+        sort_box = ttk.Combobox(sort_frame, textvariable=self.sort_key, values=SORT_KEYS, state='readonly', width=10); sort_box.pack(side=tk.LEFT, padx=(6, 6))
+        sort_box.bind('<<ComboboxSelected>>', self.sort_file_list)
+        ttk.Checkbutton(sort_frame, text="Descending", variable=self.sort_reverse, command=self.sort_file_list).pack(side=tk.LEFT)
+        self.file_count_label = ttk.Label(sort_frame, text="", style='Subheader.TLabel'); self.file_count_label.pack(side=tk.RIGHT)
+
+        self.file_list = VirtualFileList(file_card, on_select=self.on_file_selection_change, selectmode=EXTENDED, height=12, width=48, font=('Segoe UI', 10), bg=COLORS['card_bg'], relief='flat', highlightthickness=1, selectbackground=COLORS['btn_validate'], selectforeground=COLORS['text_light'])
+        self.file_list.pack(fill=tk.BOTH, expand=True)
+
+        action_card = ttk.LabelFrame(left_panel, text="⚡ ACTIONS", style='Modern.TFrame', padding=12); action_card.pack(fill=tk.X)
+        action_btn_frame = ttk.Frame(action_card, style='Modern.TFrame'); action_btn_frame.pack(fill=tk.X)
+        self.validate_btn = ttk.Button(action_btn_frame, text="🔍 VALIDATE SELECTED", command=self.validate_selected, style='Validate.TButton', state=tk.DISABLED); self.validate_btn.pack(side=tk.LEFT, padx=(0, 8))
+        self.process_btn = ttk.Button(action_btn_frame, text="🚀 PROCESS SELECTED", command=self.process_selected, style='Process.TButton', state=tk.DISABLED); self.process_btn.pack(side=tk.LEFT, padx=(0, 8))
+        self.process_all_btn = ttk.Button(action_btn_frame, text="📥 PROCESS ALL NEW", command=self.process_all_new, style='Process.TButton', state=tk.DISABLED); self.process_all_btn.pack(side=tk.LEFT)
+        workers_frame = ttk.Frame(action_card, style='Modern.TFrame'); workers_frame.pack(fill=tk.X, pady=(8, 0))
+        ttk.Label(workers_frame, text="Workers:", style='Subheader.TLabel').pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, from_=1, to=16, textvariable=self.batch_workers, width=4, state='readonly').pack(side=tk.LEFT, padx=(6, 0))
+        self.cancel_btn = ttk.Button(workers_frame, text="⛔ CANCEL", command=self.cancel_batch, style='Disconnect.TButton', state=tk.DISABLED); self.cancel_btn.pack(side=tk.RIGHT)
+        self.pause_btn = ttk.Button(workers_frame, text="⏸ PAUSE", command=self.toggle_pause, style='Utility.TButton', state=tk.DISABLED); self.pause_btn.pack(side=tk.RIGHT, padx=(0, 8))
+
+        dir_card = ttk.LabelFrame(right_panel, text="📂 LOCAL DIRECTORIES", style='Modern.TFrame', padding=12); dir_card.pack(fill=tk.X, pady=(0, 12))
+        directories = [("📥 Download:", self.download_dir),("📦 Archive:", self.archive_dir),("❌ Errors:", self.error_dir)]
+        for i, (label, var) in enumerate(directories):
+            row_frame = ttk.Frame(dir_card, style='Modern.TFrame'); row_frame.pack(fill=tk.X, pady=6)
+            ttk.Label(row_frame, text=label, style='Subheader.TLabel', width=12).pack(side=tk.LEFT)
+            entry = ttk.Entry(row_frame, textvariable=var, style='Modern.TEntry'); entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(6, 6))
+            ttk.Button(row_frame, text="📁", command=lambda v=var: self.browse_directory(v), style='Browse.TButton', width=4).pack(side=tk.RIGHT)
+
+        compress_frame = ttk.Frame(dir_card, style='Modern.TFrame'); compress_frame.pack(fill=tk.X, pady=6)
+        ttk.Label(compress_frame, text="🗜️ Compress:", style='Subheader.TLabel', width=12).pack(side=tk.LEFT)
+        ttk.Combobox(compress_frame, textvariable=self.archive_compression, values=COMPRESSION_MODES, state='readonly', width=8).pack(side=tk.LEFT, padx=(6, 6))
+        ttk.Label(compress_frame, text="Level:", style='Subheader.TLabel').pack(side=tk.LEFT)
+        ttk.Spinbox(compress_frame, from_=1, to=9, textvariable=self.compression_level, width=4, state='readonly').pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Checkbutton(compress_frame, text="Columnar export", variable=self.columnar_export).pack(side=tk.LEFT, padx=(12, 0))
+
+        util_frame = ttk.Frame(dir_card, style='Modern.TFrame'); util_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(util_frame, text="📋 OPEN ERROR LOG", command=self.open_error_log, style='Utility.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(util_frame, text="📄 ERROR REPORT", command=self.open_error_report, style='Utility.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(util_frame, text="🗑️ CLEAR LOG", command=self.clear_log, style='Utility.TButton').pack(side=tk.LEFT)
+        verbosity_combo = ttk.Combobox(util_frame, textvariable=self.log_verbosity, values=list(VERBOSITY_LEVELS), width=8, state='readonly'); verbosity_combo.pack(side=tk.RIGHT)
+        verbosity_combo.bind('<<ComboboxSelected>>', self.set_log_verbosity)
+        ttk.Label(util_frame, text="Log detail:", style='Subheader.TLabel').pack(side=tk.RIGHT, padx=(0, 6))
+
+        batch_card = ttk.LabelFrame(right_panel, text="📊 BATCH PROGRESS", style='Modern.TFrame', padding=12); batch_card.pack(fill=tk.X, pady=(0, 12))
+        batch_table = ttk.Frame(batch_card, style='Modern.TFrame'); batch_table.pack(fill=tk.X)
+        batch_scroll = ttk.Scrollbar(batch_table); batch_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.progress_tree = ttk.Treeview(batch_table, columns=("file", "state", "detail", "bytes"), show='headings', height=6, yscrollcommand=batch_scroll.set)
+        for col, title, width in (("file", "File", 260), ("state", "State", 90), ("detail", "Detail", 200), ("bytes", "Downloaded", 90)):
+            self.progress_tree.heading(col, text=title)
+            self.progress_tree.column(col, width=width, anchor=tk.W)
+        self.progress_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        batch_scroll.config(command=self.progress_tree.yview)
+        for state, color in (("archived", 'success'), ("valid", 'success'), ("rejected", 'error'), ("invalid", 'error'), ("failed", 'error'), ("skipped", 'warning'), ("cancelled", 'warning')):
+            self.progress_tree.tag_configure(state, foreground=COLORS[color])
+        self.throughput_label = ttk.Label(batch_card, text="No batch running", style='Subheader.TLabel'); self.throughput_label.pack(fill=tk.X, pady=(6, 0))
+
+        dash_card = ttk.LabelFrame(right_panel, text="📈 DASHBOARD", style='Modern.TFrame', padding=12); dash_card.pack(fill=tk.X, pady=(0, 12))
+        dash_card.columnconfigure(1, weight=1)
+        self.dashboard_labels = {}
+        for row, (key, title) in enumerate((("transfers", "Transfers"), ("rows", "Validation"), ("queues", "Queues"),
+                                            ("remaining", "Remaining"), ("errors", "Errors"))):
+            ttk.Label(dash_card, text=title, style='Subheader.TLabel').grid(row=row, column=0, sticky=tk.NW, padx=(0, 10))
+            self.dashboard_labels[key] = ttk.Label(dash_card, text="-", style='Metric.TLabel', justify=tk.LEFT)
+            self.dashboard_labels[key].grid(row=row, column=1, sticky=tk.W)
+
+        log_card = ttk.LabelFrame(right_panel, text="📝 PROCESSING LOG", style='Modern.TFrame', padding=12); log_card.pack(fill=tk.BOTH, expand=True)
+        self.log_text = scrolledtext.ScrolledText(log_card, height=20, width=65, wrap=tk.WORD, font=('Consolas', 9), bg=COLORS['card_bg'], relief='flat', padx=10, pady=10)
+        self.log_text.pack(fill=tk.BOTH, expand=True)
+        self.log_text.tag_configure("info", foreground=COLORS['dark_bg'], font=('Consolas', 9))
+        self.log_text.tag_configure("success", foreground=COLORS['success'], font=('Consolas', 9))
+        self.log_text.tag_configure("warning", foreground=COLORS['warning'], font=('Consolas', 9))
+        self.log_text.tag_configure("error", foreground=COLORS['error'], font=('Consolas', 9))
+        self.log_text.tag_configure("complete", foreground=COLORS['primary'], font=('Consolas', 10, 'bold'))
+        self.log_text.tag_configure("summary", foreground=COLORS['secondary'], font=('Consolas', 10, 'bold'))
+
+        # Note: Progress bar removed (short stage-based logs will be used instead)
+
+    def browse_directory(self, var):
+        path = filedialog.askdirectory()
+        if path:
+            var.set(path)
+
+    def log_message(self, message, tag="info"):
+        self.log_messages([(message, tag)])
+
+    def log_messages(self, messages):
+        """Append (message, tag) pairs with a single Text insert, then trim to LOG_MAX_LINES"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        chunks = []
+        for message, tag in messages:
+            line = f"[{timestamp}] {message}\n"
+            if chunks and chunks[-1] == tag:
+                chunks[-2] += line
+            else:
+                chunks.extend([line, tag])
+        try:
+            self.log_text.insert(tk.END, *chunks)
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+            self.log_text.see(tk.END)
+        except Exception:
+            for message, _ in messages:
+                print(f"[{timestamp}] {message}")
+
+    def _notify_status(self):
+        # Called from worker threads; Tk queues the virtual event for the main loop
+        self.root.event_generate('<<StatusQueued>>', when='tail')
+
+    def check_queue(self):
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.status_queue.clear_wakeup()
+        batch = []
+        refresh_status = False
+        drained = False
+        deadline = time.perf_counter() + QUEUE_TICK_BUDGET
+        try:
+            while len(batch) < QUEUE_TICK_MAX_MESSAGES and time.perf_counter() < deadline:
+                message, tag = format_status(self.status_queue.get_nowait())
+                # Removed "progress" handling; logs drive all feedback now.
+
+                # Special case: a "complete" code separate from tag
+                if message == "complete" and tag == "complete":
+                    self.is_processing = False
+                    refresh_status = True
+                    continue
+
+                batch.append((message, tag))
+
+                if tag in ["complete", "error"]:
+                    refresh_status = True
+                    self.is_processing = False
+
+        except queue.Empty:
+            drained = True
+        finally:
+            if batch:
+                self.log_messages(batch)
+            if refresh_status:
+                self.update_status_label()
+            # Come back right away while a backlog remains so Tk can repaint in between.
+            # Otherwise workers wake us via <<StatusQueued>>; the poll is only a fallback
+            # and backs off while idle.
+            if not drained:
+                delay = 1
+            elif batch:
+                delay = self._poll_ms = QUEUE_POLL_MS
+            else:
+                delay = self._poll_ms = min(self._poll_ms * 2, QUEUE_IDLE_POLL_MS)
+            self._poll_job = self.root.after(delay, self.check_queue)
+
+    def update_status_label(self):
+        if self.processor and getattr(self.processor, "connected", False):
+            self.status_label.config(text="● CONNECTED", foreground=COLORS['success'])
+            self.connect_btn.config(state=tk.DISABLED)
+            self.disconnect_btn.config(state=tk.NORMAL)
+            self.process_all_btn.config(state=tk.NORMAL)
+            if self.file_list.selected_names():
+                self.validate_btn.config(state=tk.NORMAL)
+                self.process_btn.config(state=tk.NORMAL)
+        else:
+            self.status_label.config(text="● DISCONNECTED", foreground=COLORS['error'])
+            self.connect_btn.config(state=tk.NORMAL)
+            self.disconnect_btn.config(state=tk.DISABLED)
+            self.validate_btn.config(state=tk.DISABLED)
+            self.process_btn.config(state=tk.DISABLED)
+            self.process_all_btn.config(state=tk.DISABLED)
+
+    def on_file_selection_change(self, event):
+        selection = self.file_list.selected_names()
+        if selection and self.processor and getattr(self.processor, "connected", False):
+            self.validate_btn.config(state=tk.NORMAL)
+            self.process_btn.config(state=tk.NORMAL)
+        else:
+            self.validate_btn.config(state=tk.DISABLED)
+            self.process_btn.config(state=tk.DISABLED)
+
+    def connect_to_server(self):
+        if self.is_processing:
+            return
+        self.log_text.delete(1.0, tk.END)
+        self.is_processing = True
+        thread = threading.Thread(target=self._connect_and_load_files)
+        thread.daemon = True
+        thread.start()
+
+    def _connect_and_load_files(self):
+        try:
+            self.processor = ClinicalDataProcessor(
+                self.ftp_host.get(),
+                self.ftp_user.get(),
+                self.ftp_pass.get(),
+                self.remote_dir.get()
+            )
+            if self.processor.connect(self.status_queue):
+                self.file_entries = self.processor.get_file_entries(self.status_queue)
+                self.root.after(0, self.update_file_listbox)
+                self.root.after(0, self.update_status_label)
+                self.status_queue.put(("✅ File list loaded successfully", "success"))
+                self.status_queue.put(("🟢 Ready to validate/process files", "info"))
+            else:
+                self.status_queue.put(("❌ Failed to connect", "error"))
+            self.status_queue.put(("complete", "complete"))
+        except Exception as e:
+            self.status_queue.put((f"🚨 Connection error: {e}", "error"))
+            self.status_queue.put(("complete", "complete"))
+
+    def disconnect_from_server(self):
+        if self.is_processing:
+            return
+        if not self.processor:
+            messagebox.showwarning("Not Connected", "You are not connected to any server.")
+            return
+        self.log_text.delete(1.0, tk.END)
+        self.is_processing = True
+        thread = threading.Thread(target=self._disconnect_worker)
+        thread.daemon = True
+        thread.start()
+
+    def _disconnect_worker(self):
+        try:
+            if self.processor:
+                try:
+                    if isinstance(self.processor, ClinicalDataProcessor):
+                        self.processor.disconnect()
+                except Exception:
+                    pass
+                self._shutdown_batch_pool()
+                self.processor.connected = False
+                self.file_entries = []
+                self.root.after(0, self.update_file_listbox)
+                self.root.after(0, self.update_status_label)
+                self.status_queue.put(("✅ Disconnected from FTP server", "success"))
+            self.status_queue.put(("complete", "complete"))
+        except Exception as e:
+            self.status_queue.put((f"🚨 Disconnect failed: {e}", "error"))
+            self.status_queue.put(("complete", "complete"))
+
+    def update_file_listbox(self):
+        # Only the rows on screen are handed to Tk; the model holds the full listing
+        model = FileListModel.from_entries(self.file_entries)
+        model.set_sort(self.sort_key.get(), self.sort_reverse.get())
+        model.set_filter(self.search_var.get())
+        self.file_list.set_model(model)
+        self.update_file_count()
+        self.log_message(f"📁 Loaded {model.total} files from server", "info")
+
+    def schedule_filter(self, event=None):
+        """Debounce keystrokes: filter once typing pauses for SEARCH_DEBOUNCE_MS"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_file_list)
+
+    def filter_file_list(self, event=None):
+        self._search_job = None
+        search_term = self.search_var.get().lower()
+        model = self.file_list.model
+        if not model.set_filter(search_term):
+            return
+        self.file_list.scroll_to(0)
+        self.update_file_count()
+        if search_term and not len(model):
+            self.log_message(f"❌ No files found matching '{search_term}'", "error")
+        elif search_term:
+            self.log_message(f"🔍 Filtered: showing {len(model)} files matching '{search_term}'", "info")
+
+    def sort_file_list(self, event=None):
+        self.file_list.model.set_sort(self.sort_key.get(), self.sort_reverse.get())
+        self.file_list.scroll_to(0)
+
+    def update_file_count(self):
+        model = self.file_list.model
+        shown = f"{len(model)} of {model.total}" if len(model) != model.total else f"{model.total}"
+        self.file_count_label.config(text=f"{shown} files")
+
+    def refresh_file_list(self):
+        if not (self.processor and getattr(self.processor, "connected", False)):
+            messagebox.showwarning("Not Connected", "Please connect to the FTP server first.")
+            return
+        if self.is_processing:
+            return
+        self.search_var.set("")
+        self.log_text.delete(1.0, tk.END)
+        self.is_processing = True
+        thread = threading.Thread(target=self._refresh_files)
+        thread.daemon = True
+        thread.start()
+
+    def _refresh_files(self):
+        try:
+            if not self.processor.connected:
+                self.processor.connect(self.status_queue)
+            self.file_entries = self.processor.get_file_entries(self.status_queue)
+            self.root.after(0, self.update_file_listbox)
+            self.status_queue.put(("✅ File list refreshed", "success"))
+            self.status_queue.put(("complete", "complete"))
+        except Exception as e:
+            self.status_queue.put((f"🚨 Refresh failed: {e}", "error"))
+            self.status_queue.put(("complete", "complete"))
+
+    def validate_selected(self):
+        names = self._batch_selection("validate")
+        if names:
+            self._submit_batch(names, "validate")
+
+    def process_selected(self):
+        names = self._batch_selection("process")
+        if not names:
+            return
+        label = f"file '{names[0]}'" if len(names) == 1 else f"{len(names)} files"
+        confirm = messagebox.askyesno("Confirm Processing",
+                                      f"Process {label}?\n\n"
+                                      "✓ If valid, will be archived with date suffix\n"
+                                      "✗ If invalid, will be moved to error folder\n"
+                                      "⏭ Already processed files will be skipped")
+        if confirm:
+            self._submit_batch(names, "process")
+
+    def process_all_new(self):
+        if not (self.processor and getattr(self.processor, "connected", False)):
+            messagebox.showwarning("Not Connected", "Please connect to the FTP server first.")
+            return
+        processed = self._batch_validator().processed_files
+        names = [name for name in self.file_list.model.names
+                 if name not in processed and not self.batch_progress.is_active(name)]
+        if not names:
+            messagebox.showinfo("Nothing To Process", "Every listed file has already been processed or queued.")
+            return
+        confirm = messagebox.askyesno("Confirm Processing",
+                                      f"Process {len(names)} new files?\n\n"
+                                      "✓ Valid files will be archived with date suffix\n"
+                                      "✗ Invalid files will be moved to error folder")
+        if confirm:
+            self._submit_batch(names, "process")
+
+    def _batch_selection(self, action):
+        names = self.file_list.selected_names()
+        if not names:
+            messagebox.showwarning("No Selection", f"Please select one or more files to {action}.")
+        return names
+
+    def _create_validator(self):
+        # The result cache outlives each batch's validator, so Process reuses what Validate downloaded
+        previous = self.validator
+        cache = None
+        if previous is not None and previous.download_dir == Path(self.download_dir.get()):
+            cache = previous.result_cache
+        return ClinicalDataValidator(self.download_dir.get(), self.archive_dir.get(), self.error_dir.get(),
+                                     archive_compression=self.archive_compression.get(),
+                                     compression_level=self.compression_level.get(),
+                                     columnar_export=self.columnar_export.get(), result_cache=cache)
+
+    def _batch_validator(self):
+        """Reuse the validator while a batch is running so workers share one processed set"""
+        if self.validator is None or not (self.batch_pool and self.batch_pool.pending):
+            self.validator = self._create_validator()
+        return self.validator
+
+    def _get_batch_pool(self):
+        workers = self.batch_workers.get()
+        if self.batch_pool is not None and not self.batch_pool.pending and self.batch_pool.max_workers != workers:
+            self._shutdown_batch_pool()
+        if self.batch_pool is None:
+            host, user, password, remote_dir = (self.ftp_host.get(), self.ftp_user.get(),
+                                                self.ftp_pass.get(), self.remote_dir.get())
+
+            def connect():
+                processor = ClinicalDataProcessor(host, user, password, remote_dir)
+                if not processor.connect():
+                    raise ConnectionError(f"Could not connect to {host}")
+                return processor
+
+            self.batch_pool = BatchWorkerPool(connect, max_workers=workers)
+        return self.batch_pool
+
+    def _shutdown_batch_pool(self):
+        if self.batch_pool is not None:
+            # Queued jobs see their cancelled token and exit without connecting
+            for token in self.batch_tokens:
+                token.cancel()
+            self.batch_pool.shutdown()
+            self.batch_pool = None
+
+    def cancel_batch(self):
+        if not (self.batch_pool and self.batch_pool.pending) or self.batch_cancel.cancelled:
+            return
+        for token in self.batch_tokens:
+            token.cancel()
+        self.pause_btn.config(state=tk.DISABLED, text="⏸ PAUSE")
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.log_message("⛔ Cancelling batch: stopping transfers and removing partial files...", "warning")
+
+    def toggle_pause(self):
+        if self.batch_cancel.paused:
+            for token in self.batch_tokens:
+                token.resume()
+            self.pause_btn.config(text="⏸ PAUSE")
+            self.log_message("▶ Batch resumed", "info")
+        else:
+            for token in self.batch_tokens:
+                token.pause()
+            self.pause_btn.config(text="▶ RESUME")
+            self.log_message("⏸ Batch paused (workers stop at the next block or row check)", "warning")
+
+    def _job_failed(self, name, error):
+        if isinstance(error, OperationCancelled):
+            self.batch_progress.update(name, "cancelled")
+        else:
+            self.batch_progress.update(name, "failed", str(error))
+
+    def _submit_batch(self, names, action):
+        validator = self._batch_validator()
+        pool = self._get_batch_pool()
+        progress = self.batch_progress
+        # Every submission gets its own token: files queued after a Cancel, while the
+        # cancelled jobs are still draining, must not inherit the cancelled one
+        cancel = CancellationToken()
+        if not pool.pending:
+            self.batch_tokens = []
+            progress.reset()
+            self.progress_tree.delete(*self.progress_tree.get_children())
+            self._batch_rows.clear()
+        elif self.batch_cancel.paused:
+            cancel.pause()
+        self.batch_cancel = cancel
+        self.batch_tokens.append(cancel)
+        if action == "validate":
+            run = validator.validate_remote_file
+        else:
+            run = validator.process_and_archive
+        queued = 0
+        for name in names:
+            if progress.is_active(name):
+                continue
+            progress.update(name, "queued")
+            pool.submit(lambda ftp, name=name: run(ftp, name, self.status_queue, progress, cancel),
+                        on_error=lambda e, name=name: self._job_failed(name, e), cancel=cancel)
+            queued += 1
+        self.log_message(f"📥 Queued {queued} file(s) to {action} on {pool.max_workers} worker(s)", "info")
+        self.pause_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self._schedule_batch_refresh()
+
+    def _schedule_batch_refresh(self):
+        if self._batch_refresh_job is None:
+            self._batch_refresh_job = self.root.after(BATCH_REFRESH_MS, self.refresh_batch_progress)
+
+    def refresh_batch_progress(self):
+        """Apply changed rows to the progress table and update the throughput readout"""
+        self._batch_refresh_job = None
+        # Check for idle first so no update can land between the last drain and the summary
+        idle = not (self.batch_pool and self.batch_pool.pending)
+        for name, state, detail, size in self.batch_progress.take_changes():
+            values = (name, state, detail, format_size(size) if size else "")
+            item = self._batch_rows.get(name)
+            if item is None:
+                self._batch_rows[name] = self.progress_tree.insert("", tk.END, values=values, tags=(state,))
+            else:
+                self.progress_tree.item(item, values=values, tags=(state,))
+        done, total, files_rate, byte_rate = self.batch_progress.throughput()
+        paused = " · paused" if self.batch_cancel.paused and not idle else ""
+        self.throughput_label.config(text=f"{done}/{total} files · {files_rate:.2f} files/s · "
+                                          f"{format_size(int(byte_rate))}/s{paused}")
+        if not idle:
+            self._schedule_batch_refresh()
+            return
+        self.pause_btn.config(state=tk.DISABLED, text="⏸ PAUSE")
+        self.cancel_btn.config(state=tk.DISABLED)
+        if total:
+            counts = self.batch_progress.counts()
+            summary = ", ".join(f"{counts[state]} {state}" for state in FINAL_STATES if counts.get(state))
+            self.log_message(f"📊 Batch complete: {summary}", "summary")
+
+    def refresh_dashboard(self):
+        """Sample the batch and redraw the dashboard, then re-arm the fixed-rate timer"""
+        dash = self.batch_dashboard.sample()
+        transfers = "\n".join(f"{name}  {rate / (1024 * 1024):6.2f} MB/s" for name, rate in dash.transfer_rates)
+        errors = " · ".join(f"{category} {count}" for category, count in dash.error_counts)
+        text = {
+            "transfers": transfers or "idle",
+            "rows": f"{dash.rows_rate:,.0f} rows/s",
+            "queues": " → ".join(f"{state} {dash.queue_depths[state]}" for state in ACTIVE_STATES),
+            "remaining": f"{dash.remaining} files · ETA {format_eta(dash.eta)}" if dash.remaining else "0 files",
+            "errors": errors or "none",
+        }
+        for key, value in text.items():
+            label = self.dashboard_labels[key]
+            if label.cget("text") != value:
+                label.config(text=value)
+        self.root.after(DASHBOARD_REFRESH_MS, self.refresh_dashboard)
+
+    def open_error_log(self):
+        error_log_path = Path(self.error_dir.get()) / "error_report.log"
+        if error_log_path.exists():
+            try:
+                if os.name == 'nt':
+                    os.startfile(error_log_path)
+                elif sys.platform == 'darwin':
+                    os.system(f'open "{error_log_path}"')
+                else:
+                    os.system(f'xdg-open "{error_log_path}"')
+            except Exception as e:
+                messagebox.showinfo("Open Error Log", f"Cannot open log file directly: {e}\nPath: {error_log_path}")
+        else:
+            messagebox.showinfo("Error Log", "No errors have been logged yet.")
+
+    def open_error_report(self):
+        error_dir = Path(self.error_dir.get())
+        reports = sorted(error_dir.glob(f"*{REPORT_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+        if not reports:
+            messagebox.showinfo("Error Report", "No error reports have been written yet.")
+            return
+        path = filedialog.askopenfilename(initialdir=str(error_dir), initialfile=reports[0].name,
+                                          filetypes=[("Error reports", f"*{REPORT_SUFFIX}"), ("All files", "*.*")])
+        if path:
+            ErrorReportViewer(self.root, path)
+
+    def set_log_verbosity(self, event=None):
+        # Takes effect for the next event each worker emits
+        self.status_queue.verbosity = VERBOSITY_LEVELS[self.log_verbosity.get()]
+
+    def clear_log(self):
+        self.log_text.delete(1.0, tk.END)
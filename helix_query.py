@@ -0,0 +1,190 @@
+"""
+helix_query.py - query engine over the clinical data archive
+
+A query is a set of predicates (outcome, codes, date window, dosage range).
+Files are pruned first using the archive catalog; the remaining files are
+read from their columnar export when one exists (memory-mapped, filtered with
+numpy masks when numpy is available) and otherwise streamed from the plain or
+compressed CSV. Matching rows are yielded one at a time so results can be
+written as CSV or JSONL without being collected in memory.
+"""
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+
+from helix_archive import open_archive
+from helix_catalog import ArchiveCatalog, ARCHIVE_NAME_PATTERN, CATALOG_FILENAME
+from helix_columnar import ColumnarReader, FIELDS, HAS_NUMPY, columnar_path_for, date_to_days
+
+OUTPUT_FORMATS = ("csv", "jsonl")
+SOURCE_FIELD = "ArchiveFile"
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class ArchiveQuery:
+    """Predicates over archived records; None means "no constraint".
+
+    date_from/date_to select records whose StartDate..EndDate period overlaps
+    the window, matching how the catalog prunes files.
+    """
+
+    def __init__(self, outcome=None, drug_code=None, trial_code=None, patient_id=None,
+                 date_from=None, date_to=None, min_dosage=None, max_dosage=None):
+        self.outcome = outcome
+        self.drug_code = drug_code
+        self.trial_code = trial_code
+        self.patient_id = patient_id
+        self.date_from = _parse_date(date_from) if isinstance(date_from, str) else date_from
+        self.date_to = _parse_date(date_to) if isinstance(date_to, str) else date_to
+        self.min_dosage = min_dosage
+        self.max_dosage = max_dosage
+
+    @property
+    def code_filters(self):
+        """(field, value) pairs for the equality predicates in use"""
+        pairs = [("Outcome", self.outcome), ("DrugCode", self.drug_code),
+                 ("TrialCode", self.trial_code), ("PatientID", self.patient_id)]
+        return [(field, value) for field, value in pairs if value is not None]
+
+    def matches_row(self, row):
+        """Row-at-a-time predicate used for CSV archives"""
+        for field, value in self.code_filters:
+            if row[FIELDS.index(field)] != value:
+                return False
+        if self.min_dosage is not None or self.max_dosage is not None:
+            dosage = int(row[3])
+            if self.min_dosage is not None and dosage < self.min_dosage:
+                return False
+            if self.max_dosage is not None and dosage > self.max_dosage:
+                return False
+        if self.date_from is not None and _parse_date(row[5]) < self.date_from:
+            return False
+        if self.date_to is not None and _parse_date(row[4]) > self.date_to:
+            return False
+        return True
+
+
+class QueryStats:
+    def __init__(self):
+        self.files_total = 0
+        self.files_pruned = 0
+        self.files_columnar = 0
+        self.files_csv = 0
+        self.rows_matched = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class ArchiveQueryEngine:
+    """Runs ArchiveQuery objects against an archive directory"""
+
+    def __init__(self, archive_dir, catalog=None):
+        self.archive_dir = Path(archive_dir)
+        if catalog is None and (self.archive_dir / CATALOG_FILENAME).exists():
+            catalog = ArchiveCatalog.for_archive(self.archive_dir)
+        self.catalog = catalog
+        self.stats = QueryStats()
+
+    def archive_files(self):
+        return sorted(p for p in self.archive_dir.iterdir()
+                      if p.is_file() and ARCHIVE_NAME_PATTERN.match(p.name))
+
+    def candidate_files(self, query):
+        """Archives that may hold matches; files missing from the catalog are always scanned"""
+        files = self.archive_files()
+        self.stats.files_total = len(files)
+        if self.catalog is None:
+            return files
+        catalogued = set(self.catalog.find_files())
+        matching = set(self.catalog.find_files(
+            trial_code=query.trial_code, drug_code=query.drug_code,
+            date_from=query.date_from.isoformat() if query.date_from else None,
+            date_to=query.date_to.isoformat() if query.date_to else None))
+        candidates = [p for p in files if p.name in matching or p.name not in catalogued]
+        self.stats.files_pruned = len(files) - len(candidates)
+        return candidates
+
+    def run(self, query):
+        """Yield (archive_name, row) for every matching record"""
+        self.stats = QueryStats()
+        for path in self.candidate_files(query):
+            columns_dir = columnar_path_for(path)
+            if (columns_dir / "meta.json").exists():
+                self.stats.files_columnar += 1
+                rows = self._scan_columnar(columns_dir, query)
+            else:
+                self.stats.files_csv += 1
+                rows = self._scan_csv(path, query)
+            for row in rows:
+                self.stats.rows_matched += 1
+                yield path.name, row
+
+    def _scan_csv(self, path, query):
+        with open_archive(path, 'rt', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) == len(FIELDS) and query.matches_row(row):
+                    yield row
+
+    def _scan_columnar(self, columns_dir, query):
+        with ColumnarReader(columns_dir) as reader:
+            wanted = {}
+            for field, value in query.code_filters:
+                dictionary = reader.dictionary(field)
+                if value not in dictionary:
+                    return
+                wanted[field] = dictionary.index(value)
+            day_from = date_to_days(query.date_from) if query.date_from else None
+            day_to = date_to_days(query.date_to) if query.date_to else None
+
+            if HAS_NUMPY:
+                import numpy as np
+                mask = np.ones(reader.rows, dtype=bool)
+                for field, code in wanted.items():
+                    mask &= reader.column(field) == code
+                if day_from is not None:
+                    mask &= reader.column("EndDate") >= day_from
+                if day_to is not None:
+                    mask &= reader.column("StartDate") <= day_to
+                if query.min_dosage is not None:
+                    mask &= reader.column("Dosage_mg") >= query.min_dosage
+                if query.max_dosage is not None:
+                    mask &= reader.column("Dosage_mg") <= query.max_dosage
+                indices = np.flatnonzero(mask)
+            else:
+                checks = [(reader.column(field), code) for field, code in wanted.items()]
+                end, start, dosage = reader.column("EndDate"), reader.column("StartDate"), reader.column("Dosage_mg")
+                indices = [i for i in range(reader.rows)
+                           if all(col[i] == code for col, code in checks)
+                           and (day_from is None or end[i] >= day_from)
+                           and (day_to is None or start[i] <= day_to)
+                           and (query.min_dosage is None or dosage[i] >= query.min_dosage)
+                           and (query.max_dosage is None or dosage[i] <= query.max_dosage)]
+            yield from reader.iter_rows(indices)
+
+
+def write_results(results, out, fmt="csv"):
+    """Stream (archive_name, row) pairs to a text stream; returns the row count"""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}' (expected one of {OUTPUT_FORMATS})")
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow([SOURCE_FIELD] + FIELDS)
+        for archive_name, row in results:
+            writer.writerow([archive_name] + row)
+            count += 1
+    else:
+        for archive_name, row in results:
+            record = {SOURCE_FIELD: archive_name}
+            record.update(zip(FIELDS, row))
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
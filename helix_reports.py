@@ -0,0 +1,112 @@
+"""
+helix_reports.py - per-file JSONL error reports for rejected clinical data files
+
+Each report lives next to the rejected file in the error directory as
+<filename>.errors.jsonl, one JSON object per error:
+
+    {"row": 7, "field": "Dosage_mg", "code": "dosage_non_numeric", "value": "abc", "message": "..."}
+
+The writer streams entries to disk as the validator finds them, and the reader
+pages through a report without loading it into memory.
+"""
+
+import json
+from pathlib import Path
+
+REPORT_SUFFIX = ".errors.jsonl"
+DEFAULT_PAGE_SIZE = 200
+# In-memory cap on error messages per file; the JSONL report holds the rest
+ERROR_SAMPLE_LIMIT = 100
+
+
+def report_path_for(error_dir, filename):
+    """Return the JSONL report path used for a given source filename"""
+    return Path(error_dir) / f"{Path(filename).name}{REPORT_SUFFIX}"
+
+
+class ErrorReportWriter:
+    """Streams structured error entries to a JSONL report file.
+
+    The file is only created when the first entry is written, so valid files
+    never leave an empty report behind. A stale report from an earlier run of
+    the same file is removed up front.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._fh = None
+        if self.path.exists():
+            self.path.unlink()
+
+    def write(self, row, field, code, value, message):
+        if self._fh is None:
+            self._fh = open(self.path, 'w', encoding='utf-8', newline='\n')
+        entry = {"row": row, "field": field, "code": code, "value": value, "message": message}
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    @property
+    def written(self):
+        """True once at least one entry has been written"""
+        return self.count > 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ErrorReportReader:
+    """Lazily pages through a JSONL error report.
+
+    Byte offsets of page starts are remembered as pages are visited, so moving
+    back and forth only re-reads the page being shown.
+    """
+
+    def __init__(self, path, page_size=DEFAULT_PAGE_SIZE):
+        self.path = Path(path)
+        self.page_size = page_size
+        self._page_offsets = [0]
+        self._last_page = None
+
+    def read_page(self, page):
+        """Return the entries on a zero-based page ([] past the end)"""
+        if page < 0:
+            return []
+        with open(self.path, 'rb') as f:
+            known = min(page, len(self._page_offsets) - 1)
+            f.seek(self._page_offsets[known])
+            while known < page:
+                for _ in range(self.page_size):
+                    if not f.readline():
+                        self._last_page = known
+                        return []
+                known += 1
+                if known == len(self._page_offsets):
+                    self._page_offsets.append(f.tell())
+
+            entries = []
+            for _ in range(self.page_size):
+                line = f.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+            if page + 1 == len(self._page_offsets):
+                self._page_offsets.append(f.tell())
+            if not f.readline():
+                self._last_page = page
+        return entries
+
+    def has_next(self, page):
+        """True if a page after the given one may contain entries"""
+        return self._last_page is None or page < self._last_page
@@ -0,0 +1,155 @@
+"""
+helix_rows.py - lines of a local file read through a memory map
+
+Re-validating a downloaded or archived file used to stream it through
+open(), a buffered reader and a TextIOWrapper, copying every byte into
+Python buffers before decoding it. MappedFile maps a plain (uncompressed)
+file read-only and finds record boundaries in the mapping itself: the file
+is cut into blocks of about BLOCK_BYTES that end just after a "\\n", and
+each block is decoded with one call and split into lines with the same
+newline='' rules as the text path (so "\\r\\n", "\\n" and a lone "\\r" inside
+a block all end a line, and csv.reader sees identical input). Pages come
+straight from the OS cache and are released as the scan moves on, so peak
+memory is one decoded block however large the file.
+
+A UTF-8 sequence never contains a "\\n" byte, so cutting after one never
+splits a character or a "\\r\\n" pair. Files whose lines end only in "\\r"
+have no such cut points and are left to the text path, like compressed
+files.
+
+rows() tokenizes the blocks. Partner files almost never quote a field, and
+a block without a '"' and with uniform line endings splits exactly as
+csv.reader would read it: str.split per line, an empty line being []. A
+block that has quotes (or mixed line endings, or a line longer than the
+csv field size limit) goes to one csv.reader, which may read on into the
+following blocks to finish a quoted field that spans the cut; once it
+stops at a block's end the split path resumes. The reader starts each
+record in a clean state, so feeding it only those blocks yields the same
+rows as feeding it the whole file.
+"""
+
+import csv
+import io
+import mmap
+from collections import deque
+
+from helix_archive import compression_of
+from helix_encoding import UTF8_BOM
+
+BLOCK_BYTES = 1 << 20
+
+
+def can_map(path, scan):
+    """True when path, whose content scanned as scan, can be read by MappedFile"""
+    return compression_of(path) is None and scan.valid and scan.line_ending != "\r"
+
+
+class MappedFile:
+    """Read-only memory map of a plain UTF-8 file, read as decoded blocks of whole lines"""
+
+    def __init__(self, path, encoding="utf-8", block_bytes=BLOCK_BYTES, timer=None):
+        self.path = path
+        # A helix_timing.StageTimer that times the block decodes as "decode"
+        self.timer = timer
+        # utf-8-sig only means "skip the BOM": blocks are decoded as plain UTF-8
+        self.start = len(UTF8_BOM) if encoding == "utf-8-sig" else 0
+        self.block_bytes = block_bytes
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'rb')
+        try:
+            # mmap refuses empty files; they simply have no blocks
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._map = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        return False
+
+    def block_spans(self):
+        """(start, end) byte offsets of consecutive blocks, each ending after a "\\n" or at the end of the file"""
+        mapped = self._map
+        if mapped is None:
+            return
+        pos, size = self.start, len(mapped)
+        while pos < size:
+            cut = mapped.find(b"\n", min(pos + self.block_bytes, size) - 1)
+            end = size if cut < 0 else cut + 1
+            yield pos, end
+            pos = end
+
+    def blocks(self):
+        """Decoded text of each block"""
+        for start, end in self.block_spans():
+            if self.timer is None:
+                yield self._map[start:end].decode("utf-8")
+                continue
+            with self.timer.stage("decode"):
+                block = self._map[start:end].decode("utf-8")
+            yield block
+
+    def lines(self):
+        """Lines of the file with their line endings, as a text file opened with newline='' yields them"""
+        for block in self.blocks():
+            yield from io.StringIO(block, newline='')
+
+    def rows(self):
+        """CSV rows of the file, equal to csv.reader(self.lines())"""
+        return split_rows(self.blocks())
+
+
+def _split_lines(block):
+    """block's lines without line endings, or None when str.split cannot stand in for csv.reader"""
+    if '"' in block:
+        return None
+    if "\r" in block:
+        crlf = block.count("\r\n")
+        if crlf != block.count("\r") or crlf != block.count("\n"):
+            return None
+        lines = block.split("\r\n")
+    else:
+        lines = block.split("\n")
+    if not lines[-1]:
+        # The block ended with a line ending
+        lines.pop()
+    return lines
+
+
+def split_rows(blocks):
+    """csv.reader rows of text blocks that each end at a line boundary, split without csv.reader
+    where the block has no quoting"""
+    pending = deque()
+    remaining = iter(blocks)
+
+    def feed():
+        # Lines for csv.reader: the current block's, then further blocks while it is inside a record
+        while True:
+            while pending:
+                yield pending.popleft()
+            block = next(remaining, None)
+            if block is None:
+                return
+            pending.extend(io.StringIO(block, newline=''))
+
+    reader = csv.reader(feed())
+    field_limit = csv.field_size_limit()
+    for block in remaining:
+        lines = _split_lines(block)
+        if lines is not None and len(block) > field_limit and max(map(len, lines), default=0) > field_limit:
+            # Let csv.reader raise its field-size error
+            lines = None
+        if lines is None:
+            pending.extend(io.StringIO(block, newline=''))
+            for row in reader:
+                yield row
+                if not pending:
+                    break
+            continue
+        for line in lines:
+            yield line.split(",") if line else []
@@ -0,0 +1,325 @@
+"""
+helix_schema.py - file formats declared as data, compiled to row checkers
+
+A Schema lists its columns (type, required, range, enum, decimal places),
+cross-field rules and uniqueness key. compile_row_checker() turns a schema
+into Python source for one specialised function - every column's checks are
+written out inline, with no per-field dispatch - and compiles it once; the
+function is cached by the schema's declaration, so every validator using the
+same format shares it.
+
+The generated function is called as
+
+    errors, values = check(row_num, row, seen, counts)
+
+errors is a list of (row, field, code, value, message) report entries,
+values the row with typed columns parsed (None where parsing failed), seen
+the set of uniqueness keys so far and counts the per-category error counters
+(ValidationResult.error_counts) it increments.
+"""
+
+import re
+from datetime import datetime
+
+KINDS = ("str", "int", "decimal", "date")
+
+# Message templates per check; {label}/{Label} name the column's error category
+DEFAULT_MESSAGES = {
+    "missing_field": "Missing required fields",
+    "non_numeric": "Non-numeric {label}: '{value}'",
+    "below_min": "{Label} must be at least {min}, got '{value}'",
+    "not_above": "{Label} must be greater than {gt}, got '{value}'",
+    "above_max": "{Label} exceeds {max}, got '{value}'",
+    "decimals": "{Label} must have at most {decimals} decimal places, got '{value}'",
+    "date_format": "Invalid date format (expected YYYY-MM-DD)",
+    "enum": "Invalid {label} '{value}'",
+    "date_range": "{end} ({end_value}) before {start} ({start_value})",
+    "duplicate": "Duplicate record",
+}
+
+
+class Column:
+    """One CSV column. label is the error category (defaults to the lowercased name).
+
+    codes/messages override the report code and message template of a check
+    (keys as in DEFAULT_MESSAGES) so a schema can keep an established report
+    vocabulary.
+    """
+
+    def __init__(self, name, kind="str", required=True, min=None, max=None, gt=None, decimals=None,
+                 enum=None, label=None, codes=None, messages=None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown column kind '{kind}' (expected one of {KINDS})")
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.min = min
+        self.max = max
+        self.gt = gt
+        self.decimals = decimals
+        self.enum = tuple(enum) if enum is not None else None
+        self.label = label or name.lower()
+        self.codes = dict(codes or {})
+        self.messages = dict(messages or {})
+
+    def code(self, check):
+        if check == "missing_field":
+            default = check
+        else:
+            default = self.label if check == "enum" else f"{self.label}_{check}"
+        return self.codes.get(check, default)
+
+    def message(self, check):
+        return self.messages.get(check, DEFAULT_MESSAGES[check])
+
+    def signature(self):
+        return (self.name, self.kind, self.required, self.min, self.max, self.gt, self.decimals, self.enum,
+                self.label, tuple(sorted(self.codes.items())), tuple(sorted(self.messages.items())))
+
+
+class DateRange:
+    """start and end columns parse as dates (reported together) and end is not before start"""
+
+    def __init__(self, start, end, fmt="%Y-%m-%d"):
+        self.start = start
+        self.end = end
+        self.fmt = fmt
+
+    def signature(self):
+        return ("date_range", self.start, self.end, self.fmt)
+
+
+class Schema:
+    def __init__(self, name, columns, rules=(), unique=()):
+        self.name = name
+        self.columns = tuple(columns)
+        self.rules = tuple(rules)
+        self.unique = tuple(unique)
+        self.header = [column.name for column in self.columns]
+        for field in self.unique + tuple(f for rule in self.rules for f in (rule.start, rule.end)):
+            self.index(field)
+
+    def index(self, name):
+        try:
+            return self.header.index(name)
+        except ValueError:
+            raise ValueError(f"Schema '{self.name}' has no column '{name}'") from None
+
+    def column(self, name):
+        return self.columns[self.index(name)]
+
+    def signature(self):
+        return (self.name, tuple(c.signature() for c in self.columns),
+                tuple(r.signature() for r in self.rules), self.unique)
+
+    def row_checker(self):
+        return compile_row_checker(self)
+
+
+def parse_iso_date(value, fmt="%Y-%m-%d"):
+    """datetime.strptime(value, fmt) with a fast path for zero-padded YYYY-MM-DD"""
+    if (fmt == "%Y-%m-%d" and len(value) == 10 and value[4] == "-" and value[7] == "-"
+            and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()):
+        return datetime(int(value[:4]), int(value[5:7]), int(value[8:]))
+    return datetime.strptime(value, fmt)
+
+
+class _Source:
+    """Indented source lines for the generated checker"""
+
+    def __init__(self):
+        self.lines = []
+        self.depth = 1
+
+    def __call__(self, line):
+        self.lines.append("    " * self.depth + line)
+
+    def indent(self):
+        self.depth += 1
+
+    def dedent(self):
+        self.depth -= 1
+
+
+def generate_checker_source(schema):
+    """(source, namespace) of the specialised row checker for schema"""
+    namespace = {"parse_iso_date": parse_iso_date}
+    width = len(schema.columns)
+    out = _Source()
+
+    def const(name, value):
+        namespace[name] = value
+        return name
+
+    def fail(category, field, code, value_expr, message, **fmt):
+        """Append an error entry; the message template is formatted only on this path"""
+        template = const(f"_msg{len(namespace)}", message)
+        args = ", ".join(f"{key}={expr}" for key, expr in fmt.items())
+        out(f"counts[{category!r}] = counts.get({category!r}, 0) + 1")
+        out(f"errors.append((row_num, {field!r}, {code!r}, {value_expr}, {template}.format({args})))")
+
+    out(f"if len(row) != {width}:")
+    out("    counts['field_count'] = counts.get('field_count', 0) + 1")
+    out(f"    return [(row_num, None, 'field_count', len(row), "
+        f"'Expected {width} fields, got ' + str(len(row)))], None")
+    names = [f"v{i}" for i in range(width)]
+    out(f"{', '.join(names)}, = row")
+    out("errors = []")
+
+    required = [i for i, column in enumerate(schema.columns) if column.required]
+    if required:
+        # One missing_fields count per row, one entry per empty field
+        out(f"if not ({' and '.join(names[i] for i in required)}):")
+        out.indent()
+        out("counts['missing_fields'] = counts.get('missing_fields', 0) + 1")
+        for i in required:
+            column = schema.columns[i]
+            out(f"if not v{i}:")
+            out(f"    errors.append((row_num, {column.name!r}, {column.code('missing_field')!r}, v{i}, "
+                f"{column.message('missing_field')!r}))")
+        out.dedent()
+
+    parsed = list(names)
+    rules_after = {}
+    for rule in schema.rules:
+        rules_after.setdefault(max(schema.index(rule.start), schema.index(rule.end)), []).append(rule)
+
+    for i, column in enumerate(schema.columns):
+        v, label = f"v{i}", column.label
+        fmt = {"value": v, "label": repr(label), "Label": repr(label.capitalize())}
+        optional = not column.required and (column.kind != "str" or column.enum is not None)
+        if column.kind != "str":
+            out(f"p{i} = None")
+        if optional:
+            # An empty optional column is valid and stays unparsed
+            out(f"if {v}:")
+            out.indent()
+        if column.kind in ("int", "decimal"):
+            p = parsed[i] = f"p{i}"
+            out("try:")
+            out(f"    {p} = {'int' if column.kind == 'int' else 'float'}({v})")
+            out("except ValueError:")
+            out.indent()
+            fail(label, column.name, column.code("non_numeric"), v, column.message("non_numeric"), **fmt)
+            out.dedent()
+            out("else:")
+            out.indent()
+            checks = []
+            if column.gt is not None:
+                checks.append((f"not {p} > {column.gt!r}", "not_above", dict(fmt, gt=repr(column.gt))))
+            if column.min is not None:
+                checks.append((f"{p} < {column.min!r}", "below_min", dict(fmt, min=repr(column.min))))
+            if column.max is not None:
+                checks.append((f"{p} > {column.max!r}", "above_max", dict(fmt, max=repr(column.max))))
+            if column.decimals is not None:
+                # Plain digits with up to N decimals: no sign, exponent or thousands separators
+                pattern = const(f"_dec{i}", re.compile(rf"\d+(\.\d{{1,{column.decimals}}})?\Z"))
+                checks.append((f"not {pattern}.match({v})", "decimals", dict(fmt, decimals=repr(column.decimals))))
+            if not checks:
+                out("pass")
+            for n, (condition, check, check_fmt) in enumerate(checks):
+                out(f"{'if' if n == 0 else 'elif'} {condition}:")
+                out.indent()
+                fail(label, column.name, column.code(check), v, column.message(check), **check_fmt)
+                out.dedent()
+            out.dedent()
+        elif column.kind == "date":
+            p = parsed[i] = f"p{i}"
+            out("try:")
+            out(f"    {p} = parse_iso_date({v})")
+            out("except ValueError:")
+            out.indent()
+            fail("date_format", column.name, column.code("date_format"), v, column.message("date_format"))
+            out.dedent()
+        if column.enum is not None:
+            allowed = const(f"_enum{i}", frozenset(column.enum))
+            out(f"if {v} not in {allowed}:")
+            out.indent()
+            fail(label, column.name, column.code("enum"), v, column.message("enum"), **fmt)
+            out.dedent()
+        if optional:
+            out.dedent()
+        for rule in rules_after.get(i, ()):
+            s, e = schema.index(rule.start), schema.index(rule.end)
+            fmt_const = const(f"_fmt{s}_{e}", rule.fmt)
+            parsed[s], parsed[e] = f"p{s}", f"p{e}"
+            out(f"p{s} = p{e} = None")
+            # Open-ended ranges: the rule applies once both optional ends are present
+            guards = [f"v{c}" for c in (s, e) if not schema.columns[c].required]
+            if guards:
+                out(f"if {' and '.join(guards)}:")
+                out.indent()
+            out("try:")
+            out(f"    p{s} = parse_iso_date(v{s}, {fmt_const})")
+            out(f"    p{e} = parse_iso_date(v{e}, {fmt_const})")
+            out("except ValueError:")
+            out.indent()
+            fail("date_format", f"{rule.start}/{rule.end}", "date_format", f"v{s} + '/' + v{e}",
+                 DEFAULT_MESSAGES["date_format"])
+            out.dedent()
+            out("else:")
+            out(f"    if p{e} < p{s}:")
+            out.depth += 2
+            fail("date_range", rule.end, "date_range", f"v{e}", DEFAULT_MESSAGES["date_range"],
+                 start=repr(rule.start), end=repr(rule.end), start_value=f"v{s}", end_value=f"v{e}")
+            out.depth -= 2
+            if guards:
+                out.dedent()
+
+    if schema.unique:
+        key_vars = [f"v{schema.index(name)}" for name in schema.unique]
+        out(f"key = ({', '.join(key_vars)},)")
+        out("if key in seen:")
+        out.indent()
+        fail("duplicate", "/".join(schema.unique), "duplicate", "'_'.join(key)", DEFAULT_MESSAGES["duplicate"])
+        out.dedent()
+        out("else:")
+        out("    seen.add(key)")
+    out(f"return errors, ({', '.join(parsed)},)")
+
+    name = re.sub(r"\W", "_", schema.name)
+    source = f"def check_{name}(row_num, row, seen, counts):\n" + "\n".join(out.lines) + "\n"
+    return source, namespace
+
+
+_CHECKERS = {}
+
+
+def compile_row_checker(schema):
+    """The compiled checker for schema, generated on first use and cached by declaration"""
+    signature = schema.signature()
+    checker = _CHECKERS.get(signature)
+    if checker is None:
+        source, namespace = generate_checker_source(schema)
+        exec(compile(source, f"<schema {schema.name}>", "exec"), namespace)
+        checker = namespace[source[4:source.index("(")]]
+        checker.source = source
+        _CHECKERS[signature] = checker
+    return checker
+
+
+CLINICAL_SCHEMA = Schema(
+    "clinical",
+    [
+        Column("PatientID"),
+        Column("TrialCode"),
+        Column("DrugCode"),
+        Column("Dosage_mg", "int", gt=0, label="dosage",
+               messages={"not_above": "Dosage must be positive integer, got '{value}'"},
+               codes={"not_above": "dosage_non_positive"}),
+        Column("StartDate"),
+        Column("EndDate"),
+        Column("Outcome", enum=("Improved", "No Change", "Worsened")),
+        Column("SideEffects"),
+        Column("Analyst"),
+    ],
+    rules=[DateRange("StartDate", "EndDate")],
+    unique=("PatientID", "TrialCode", "DrugCode"),
+)
+
+SENSOR_BATCH_SCHEMA = Schema(
+    "sensor_batch",
+    [Column("batch_id", required=False), Column("timestamp", required=False)]
+    + [Column(f"reading{i}", "decimal", max=9.9, decimals=3, label="reading") for i in range(1, 11)],
+    unique=("batch_id",),
+)
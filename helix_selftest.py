@@ -0,0 +1,61 @@
+"""
+helix_selftest.py - quick validator checks run by `python Helix.py --test`
+"""
+
+import csv
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from helix_validation import ClinicalDataValidator
+
+
+class ValidatorUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp(prefix="clinical_test_"))
+        self.download = self.tmpdir / "down"
+        self.archive = self.tmpdir / "arc"
+        self.errors = self.tmpdir / "err"
+        for p in [self.download, self.archive, self.errors]:
+            p.mkdir(parents=True, exist_ok=True)
+        self.validator = ClinicalDataValidator(self.download, self.archive, self.errors)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def create_csv(self, name, rows):
+        path = self.download / name
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            for r in rows:
+                w.writerow(r)
+        return path
+
+    def test_valid_file_passes(self):
+        rows = [
+            ["PatientID", "TrialCode", "DrugCode", "Dosage_mg", "StartDate", "EndDate", "Outcome", "SideEffects", "Analyst"],
+            ["P1", "T1", "D1", "10", "2024-01-01", "2024-01-02", "Improved", "None", "A"]
+        ]
+        path = self.create_csv("CLINICALDATA20250101120000.CSV", rows)
+        ok, errors, count = self.validator._validate_csv_content(path, status_queue=None)
+        self.assertTrue(ok)
+        self.assertEqual(count, 1)
+
+    def test_invalid_header(self):
+        rows = [["Bad", "Header"],]
+        path = self.create_csv("CLINICALDATA20250101120001.CSV", rows)
+        ok, errors, count = self.validator._validate_csv_content(path, status_queue=None)
+        self.assertFalse(ok)
+        self.assertTrue(any("Invalid header" in e for e in errors) or len(errors) > 0)
+
+    def test_bad_dosage_and_date(self):
+        rows = [
+            ["PatientID", "TrialCode", "DrugCode", "Dosage_mg", "StartDate", "EndDate", "Outcome", "SideEffects", "Analyst"],
+            ["P2", "T1", "D1", "-5", "2024-01-10", "2024-01-01", "Improved", "None", "B"],
+            ["P3", "T1", "D2", "abc", "2024-01-05", "2024-01-10", "No Change", "SE", "C"]
+        ]
+        path = self.create_csv("CLINICALDATA20250101120002.CSV", rows)
+        ok, errors, count = self.validator._validate_csv_content(path, status_queue=None)
+        self.assertFalse(ok)
+        self.assertTrue(any("Dosage" in e or "EndDate" in e or "Non-numeric dosage" in e for e in errors))
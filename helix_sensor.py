@@ -0,0 +1,326 @@
+"""
+helix_sensor.py - streaming validator for sensor-batch reading exports
+
+Instrument exports (batch_id, timestamp, reading1..reading10) run to millions
+of rows, so SensorBatchValidator never holds a whole file: rows are read in
+blocks of BLOCK_ROWS and each block is first checked in bulk -
+
+- the decimal columns are joined and their format (plain digits, at most N
+  decimal places) checked in one pass over the bytes, then converted to a
+  rows x columns float array and compared with the column limits
+- required and enum text columns are checked with set/all over the column
+- uniqueness keys go into a KeyIndex of 64-bit hashes (sorted numpy runs,
+  8 bytes per key) instead of a set of strings
+
+Only a block that fails the bulk check is re-checked row by row with the
+schema's compiled row checker, which produces the exact report entries. A
+hash hit is only a candidate duplicate until confirmed against the real keys
+by re-reading the rows before it, so hash collisions never reject a file.
+
+By default validation stops at the first violation, like the original
+standalone validator; report_all=True scans the whole file and reports every
+violation (the first ERROR_SAMPLE_LIMIT entries are kept, all are counted).
+"""
+
+import csv
+import io
+import re
+from itertools import chain, islice
+from operator import itemgetter
+
+from helix_columnar import HAS_NUMPY
+from helix_reports import ERROR_SAMPLE_LIMIT
+from helix_schema import SENSOR_BATCH_SCHEMA, Schema, compile_row_checker
+
+BLOCK_ROWS = 8192
+_DIGIT, _DOT, _COMMA = ord("0"), ord("."), ord(",")
+
+
+class KeyIndex:
+    """Uniqueness keys seen so far, as 64-bit hashes.
+
+    With numpy, hashes are kept in sorted runs that are merged as they grow
+    (like an LSM tree), so lookups are a searchsorted per run; without it a
+    set of hashes is used. add() returns the positions of keys whose hash
+    was already present - candidates that still need confirming.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.hashes = set()
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs) + len(self.hashes)
+
+    def add(self, keys):
+        if not HAS_NUMPY:
+            repeats = []
+            for position, value in enumerate(map(hash, keys)):
+                if value in self.hashes:
+                    repeats.append(position)
+                else:
+                    self.hashes.add(value)
+            return repeats
+
+        import numpy as np
+        hashes = np.fromiter(map(hash, keys), dtype=np.int64, count=len(keys))
+        if not len(hashes):
+            return []
+        # A stable sort keeps the first occurrence of a repeated hash ahead of the others
+        order = np.argsort(hashes, kind="stable")
+        ordered = hashes[order]
+        repeat = np.zeros(len(hashes), dtype=bool)
+        repeat[1:] = ordered[1:] == ordered[:-1]
+        # Sorted queries keep searchsorted walking each run in order
+        for run in self.runs:
+            found = np.minimum(np.searchsorted(run, ordered), len(run) - 1)
+            repeat |= run[found] == ordered
+        if not repeat.all():
+            self._push(ordered[~repeat])
+        return np.sort(order[repeat]).tolist()
+
+    def _push(self, run):
+        import numpy as np
+        self.runs.append(run)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate((self.runs[-1], newest)), kind="mergesort")
+
+
+def plain_decimals(text, count, decimals):
+    """True when text is exactly count comma-separated plain decimals (digits with at
+    most `decimals` places; no sign, exponent, spaces or empty values)"""
+    if HAS_NUMPY:
+        import numpy as np
+        try:
+            data = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        except UnicodeEncodeError:
+            return False
+        digits = np.count_nonzero((data >= _DIGIT) & (data <= _DIGIT + 9))
+        dots = np.flatnonzero(data == _DOT)
+        commas = np.flatnonzero(data == _COMMA)
+        if len(commas) != count - 1 or digits + len(dots) + len(commas) != len(data):
+            return False
+        bounds = np.concatenate(([-1], commas, [len(data)]))
+        if np.any(np.diff(bounds) < 2):
+            return False
+        if not len(dots):
+            return True
+        token = np.searchsorted(commas, dots)
+        places = bounds[token + 1] - dots - 1
+        return bool(np.all(np.diff(token) > 0) and np.all(dots - bounds[token] >= 2)
+                    and np.all(places >= 1) and (decimals is None or np.all(places <= decimals)))
+
+    places = r"\d+" if decimals is None else rf"\d{{1,{decimals}}}"
+    pattern = re.compile(rf"\d+(?:\.{places})?", re.ASCII)
+    values = text.split(",")
+    return len(values) == count and all(map(pattern.fullmatch, values))
+
+
+class _DecimalGroup:
+    """Decimal columns sharing decimal places and limits, checked as one array"""
+
+    def __init__(self, indices, column):
+        self.indices = indices
+        self.getter = itemgetter(*indices)
+        self.decimals = column.decimals
+        self.limits = [(op, bound) for op, bound in (("gt", column.gt), ("min", column.min), ("max", column.max))
+                       if bound is not None]
+
+    def check(self, rows):
+        values = list(chain.from_iterable(map(self.getter, rows))) if len(self.indices) > 1 \
+            else list(map(self.getter, rows))
+        if not plain_decimals(",".join(values), len(values), self.decimals):
+            return False
+        if not self.limits:
+            return True
+        if HAS_NUMPY:
+            import numpy as np
+            array = np.array(values, dtype=np.float64).reshape(len(rows), len(self.indices))
+            low, high = array.min(), array.max()
+        else:
+            floats = list(map(float, values))
+            low, high = min(floats), max(floats)
+        for op, bound in self.limits:
+            if (op == "gt" and not low > bound) or (op == "min" and low < bound) or (op == "max" and high > bound):
+                return False
+        return True
+
+
+class SensorBatchResult:
+    """Outcome of validating one sensor-batch file"""
+
+    def __init__(self):
+        self.is_valid = False
+        self.errors = []       # report entries (row, field, code, value, message), capped
+        self.error_total = 0
+        self.error_counts = {}
+        self.rows_scanned = 0
+
+    @property
+    def message(self):
+        """'Valid', or the first violation as one line"""
+        if self.is_valid:
+            return "Valid"
+        return describe(self.errors[0]) if self.errors else "Invalid"
+
+    def add(self, entry, category):
+        self.error_total += 1
+        self.error_counts[category] = self.error_counts.get(category, 0) + 1
+        if len(self.errors) < ERROR_SAMPLE_LIMIT:
+            self.errors.append(entry)
+
+
+def describe(entry):
+    row, field, _code, _value, message = entry
+    if row is None:
+        return message
+    return f"Row {row} {field}: {message}" if field else f"Row {row}: {message}"
+
+
+class SensorBatchValidator:
+    """Streaming validator for a schema of text and decimal columns (SENSOR_BATCH_SCHEMA by default)"""
+
+    def __init__(self, schema=SENSOR_BATCH_SCHEMA, report_all=False, block_rows=BLOCK_ROWS):
+        self.schema = schema
+        self.report_all = report_all
+        self.block_rows = block_rows
+        self.width = len(schema.columns)
+        # Uniqueness is tracked by KeyIndex, so the row checker is compiled without it
+        self.check_row = compile_row_checker(Schema(f"{schema.name}_rows", schema.columns, schema.rules))
+        self.key = itemgetter(*[schema.index(name) for name in schema.unique]) if schema.unique else None
+        self.unique_field = "/".join(schema.unique)
+        self.bulk = all(column.kind in ("str", "decimal") for column in schema.columns) and not schema.rules
+        self.required = [i for i, column in enumerate(schema.columns)
+                         if column.required and column.kind == "str" and column.enum is None]
+        self.enums = [(i, frozenset(column.enum) | ({""} if not column.required else frozenset()))
+                      for i, column in enumerate(schema.columns) if column.enum is not None]
+        groups = {}
+        for i, column in enumerate(schema.columns):
+            if column.kind == "decimal":
+                limits = (column.decimals, column.gt, column.min, column.max, column.required)
+                groups.setdefault(limits, []).append(i)
+        self.groups = [_DecimalGroup(indices, schema.columns[indices[0]]) for indices in groups.values()]
+
+    def validate(self, path, encoding="utf-8"):
+        """Validate the CSV file at path"""
+        return self._run(lambda: open(path, newline="", encoding=encoding))
+
+    def validate_text(self, content):
+        """Validate CSV content already in memory"""
+        return self._run(lambda: io.StringIO(content, newline=""))
+
+    def _run(self, opener):
+        result = SensorBatchResult()
+        try:
+            self._scan(opener, result)
+        except csv.Error as e:
+            result.add((None, None, "malformed", None, f"Malformed file error: {e}"), "malformed")
+        except UnicodeDecodeError:
+            result.add((None, None, "encoding", None, "File is not valid UTF-8 encoded CSV"), "encoding")
+        result.is_valid = result.error_total == 0
+        return result
+
+    def _scan(self, opener, result):
+        with opener() as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != self.schema.header:
+                result.add((None, None, "header", header, f"Incorrect or missing headers: {header}"), "header")
+                return
+            index = KeyIndex()
+            candidates = []    # (row_num, key) of rows whose key hash was already seen
+            row_num = 1
+            while True:
+                rows = list(islice(reader, self.block_rows))
+                if not rows:
+                    break
+                first = row_num + 1
+                row_num += len(rows)
+                result.rows_scanned += len(rows)
+                full = rows if self._widths_ok(rows) else None
+                if self.key is None:
+                    block_candidates = []
+                else:
+                    keyed = [(n, row) for n, row in enumerate(rows, start=first) if len(row) == self.width] \
+                        if full is None else None
+                    keys = list(map(self.key, full if full is not None else (row for _, row in keyed)))
+                    repeats = index.add(keys)
+                    block_candidates = [(first + p if full is not None else keyed[p][0], keys[p]) for p in repeats]
+                if full is not None and not block_candidates and self._block_ok(full):
+                    continue
+                if self._check_rows(opener, result, rows, first, block_candidates, candidates):
+                    return
+            if candidates:
+                self._report_duplicates(opener, result, candidates)
+
+    def _widths_ok(self, rows):
+        return set(map(len, rows)) == {self.width}
+
+    def _block_ok(self, rows):
+        if not self.bulk:
+            return False
+        for i in self.required:
+            if not all(map(itemgetter(i), rows)):
+                return False
+        for i, allowed in self.enums:
+            if not set(map(itemgetter(i), rows)) <= allowed:
+                return False
+        return all(group.check(rows) for group in self.groups)
+
+    def _check_rows(self, opener, result, rows, first, block_candidates, candidates):
+        """Row-by-row pass over a block; True once validation should stop.
+
+        Without report_all the first invalid row ends validation, with all of
+        its entries reported; with it, candidate duplicates are collected and
+        confirmed in one pass at the end.
+        """
+        suspects = dict(block_candidates)
+        seen = set()
+        for row_num, row in enumerate(rows, start=first):
+            # The checker counts each entry's category in error_counts itself
+            entries, _ = self.check_row(row_num, row, seen, result.error_counts)
+            result.error_total += len(entries)
+            result.errors.extend(entries[:ERROR_SAMPLE_LIMIT - len(result.errors)])
+            if self.report_all:
+                if row_num in suspects:
+                    candidates.append((row_num, suspects[row_num]))
+                continue
+            if row_num in suspects and row_num in self._confirm(opener, {suspects[row_num]}, row_num):
+                result.add(self._duplicate(row_num, suspects[row_num]), "duplicate")
+            if result.error_total:
+                return True
+        return False
+
+    def _duplicate(self, row_num, key):
+        value = "_".join(key) if isinstance(key, tuple) else key
+        return (row_num, self.unique_field, "duplicate", value, "Duplicate record")
+
+    def _confirm(self, opener, keys, last_row):
+        """Rows up to last_row that really repeat one of keys, found by re-reading the file"""
+        seen, repeated = set(), set()
+        with opener() as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row_num, row in enumerate(islice(reader, last_row - 1), start=2):
+                if len(row) != self.width:
+                    continue
+                key = self.key(row)
+                if key in keys:
+                    if key in seen:
+                        repeated.add(row_num)
+                    else:
+                        seen.add(key)
+        return repeated
+
+    def _report_duplicates(self, opener, result, candidates):
+        repeated = self._confirm(opener, {key for _, key in candidates}, candidates[-1][0])
+        duplicates = [self._duplicate(row_num, key) for row_num, key in candidates if row_num in repeated]
+        if not duplicates:
+            return
+        result.error_total += len(duplicates)
+        result.error_counts["duplicate"] = result.error_counts.get("duplicate", 0) + len(duplicates)
+        # The sample holds the first entries without duplicates, so merging it with every
+        # duplicate keeps the first entries overall. The sort is stable: a row's duplicate
+        # entry follows its other entries, as in the row checker.
+        result.errors = sorted(result.errors + duplicates, key=itemgetter(0))[:ERROR_SAMPLE_LIMIT]
@@ -0,0 +1,139 @@
+"""
+helix_timing.py - where a file's or a run's time went
+
+A StageTimer adds up the wall-clock seconds spent in each of STAGES. The
+validator keeps one per ValidationResult (decode, header check, row
+validation, dedup, error logging) and one per downloaded file, which adds
+the download and the archive move; the FTP processor times its connect and
+list calls. Timers are cheap enough to stay on: a stage is timed once per
+file or per block, never per row.
+
+A few stages are defined by what can be timed without slowing the row loop:
+rows are tokenized and checked - including each row's duplicate-key lookup -
+inside the compiled row checker, so that time is row_validation. decode is
+the byte pre-scan (UTF-8 check, hash) plus, for memory-mapped files, the
+block decode; dedup is the duplicate summary and the checkpoint key set
+load and save; error_logging covers closing the error report, the error log
+and moving rejected files.
+
+RunProfiler collects cProfile statistics for the CLI's --profile option
+from every thread that runs a job; cProfile is only imported when used.
+"""
+
+import io
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = ("connect", "list", "download", "decode", "header_check", "row_validation", "dedup", "archive_move",
+          "error_logging")
+PROFILE_TOP_FUNCTIONS = 25
+
+
+class StageTimer:
+    """Seconds spent per stage of STAGES.
+
+    One timer may be shared between threads. stage() blocks nest within a
+    thread, and a stage's time excludes the stages timed inside it, so the
+    stages add up to the elapsed time.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = {}
+        self._lock = threading.Lock()
+        # Per thread: seconds of the stages nested in each open stage() block
+        self._local = threading.local()
+        for name, value in (seconds or {}).items():
+            self.add(name, value)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the with-block as stage name (also when it raises)"""
+        nested = getattr(self._local, "nested", None)
+        if nested is None:
+            nested = self._local.nested = []
+        started = time.perf_counter()
+        nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.add(name, elapsed - nested.pop())
+            if nested:
+                nested[-1] += elapsed
+
+    def add(self, name, seconds):
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage '{name}' (expected one of {STAGES})")
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def merge(self, other):
+        """Add another StageTimer's, or a {stage: seconds} dict's, times to this one"""
+        seconds = other.seconds if isinstance(other, StageTimer) else other
+        for name, value in list(seconds.items()):
+            self.add(name, value)
+
+    @property
+    def total(self):
+        return sum(self.seconds.values())
+
+    def to_dict(self, digits=4):
+        """{stage: seconds} in STAGES order, for JSON output"""
+        return {name: round(self.seconds[name], digits) for name in STAGES if name in self.seconds}
+
+
+def format_stages(seconds):
+    """One line, e.g. "download 0.120s · row_validation 1.350s", for a {stage: seconds} dict"""
+    return " · ".join(f"{name} {seconds[name]:.3f}s" for name in STAGES if name in seconds)
+
+
+def stage_table(timer):
+    """Per-stage summary table of a run's StageTimer, for --profile"""
+    total = timer.total
+    lines = [f"{'Stage':<16}{'Seconds':>10}{'Share':>8}"]
+    for name, value in timer.to_dict().items():
+        share = value / total if total else 0.0
+        lines.append(f"{name:<16}{value:>10.3f}{share:>8.1%}")
+    lines.append(f"{'total':<16}{total:>10.3f}")
+    return "\n".join(lines)
+
+
+class RunProfiler:
+    """cProfile statistics of the calls made through call(), from any thread"""
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def call(self, func, *args, **kwargs):
+        import cProfile
+        # cProfile only sees the thread it is enabled in, so each call gets its own profile
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._profiles.append(profile)
+
+    def stats(self):
+        """pstats.Stats of every call so far, or None"""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        import pstats
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def report(self, top=PROFILE_TOP_FUNCTIONS):
+        """The top functions by cumulative time, as text"""
+        stats = self.stats()
+        if stats is None:
+            return ""
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
@@ -0,0 +1,1216 @@
+"""
+helix_validation.py - validation and archival of clinical data files
+
+Validation strategies, ValidationResult and ClinicalDataValidator. This module
+imports neither tkinter nor requests, so headless workers and tests can use
+the validator without GUI import cost: requests is loaded on the first GUID
+request and ftplib only when a transfer error has to be recognised.
+"""
+
+import csv
+import io
+import math
+import os
+import random
+import re
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from helix_reports import ERROR_SAMPLE_LIMIT, ErrorReportWriter, report_path_for
+from helix_archive import (ArchiveWorkerPool, DEFAULT_COMPRESSION_LEVEL, archive_suffix,
+                           compression_of, normalize_compression, open_archive)
+from helix_catalog import ArchiveCatalog, RecordStats
+from helix_columnar import ColumnarWriter, COLUMNAR_SUFFIX, columnar_path_for
+from helix_cache import (DEFAULT_DOWNLOAD_CACHE_BYTES, DOWNLOAD_CACHE_DIRNAME, DownloadCache, ValidationCache,
+                         move_unshared)
+from helix_cancel import OperationCancelled
+from helix_checkpoint import CHECKPOINT_DIRNAME, Checkpoint, CheckpointStore, boundary_digest, read_boundary
+from helix_encoding import UTF8_BOM, ContentScan, ScanningReader, scan_file
+from helix_events import emit
+from helix_rows import MappedFile, can_map
+from helix_schema import CLINICAL_SCHEMA
+from helix_timing import StageTimer
+
+
+# Bump when validation rules outside the schema change, so cached results are not reused
+VALIDATOR_VERSION = 1
+
+
+def _transfer_errors():
+    """ftplib.all_errors, imported on first use (except clauses evaluate this only when raising)"""
+    import ftplib
+    return ftplib.all_errors
+
+
+def _refused_errors():
+    """ftplib.error_perm: the server refused a command (5xx), leaving the connection usable"""
+    import ftplib
+    return ftplib.error_perm
+
+#STRATEGY PATTERN
+class ValidationStrategy(ABC):
+    
+    @abstractmethod
+    def validate(self, data, status_queue=None):
+        pass
+    
+    @abstractmethod
+    def get_strategy_name(self):
+        pass
+
+
+class FilenameValidationStrategy(ValidationStrategy):
+    
+    def validate(self, filename, status_queue=None):
+        pattern = r'^CLINICALDATA\d{14}\.CSV$'
+        is_valid = re.match(pattern, filename, re.IGNORECASE) is not None
+        
+        if status_queue:
+            if is_valid:
+                status_queue.put((f"  ✓ Filename pattern valid (Strategy: {self.get_strategy_name()})", "success"))
+            else:
+                status_queue.put((f"  ✗ Invalid filename pattern (Strategy: {self.get_strategy_name()})", "error"))
+        
+        return is_valid
+    
+    def get_strategy_name(self):
+        return "Filename Pattern Validator"
+
+
+class CSVHeaderValidationStrategy(ValidationStrategy):    
+    def __init__(self):
+        self.expected_header = list(CLINICAL_SCHEMA.header)
+    
+    def validate(self, header, status_queue=None):
+        """Validate CSV header matches expected format"""
+        is_valid = header == self.expected_header
+        
+        if status_queue:
+            if is_valid:
+                status_queue.put((f"  ✓ Header valid (Strategy: {self.get_strategy_name()})", "success"))
+            else:
+                status_queue.put((f"  ✗ Header mismatch (Strategy: {self.get_strategy_name()})", "error"))
+        
+        return is_valid
+    
+    def get_strategy_name(self):
+        return "CSV Header Validator"
+
+
+class DosageValidationStrategy(ValidationStrategy):
+
+    def validate(self, dosage, status_queue=None):
+        """Validate dosage is positive integer"""
+        try:
+            dosage_val = int(dosage)
+            is_valid = dosage_val > 0
+            
+            if not is_valid and status_queue:
+                status_queue.put((f"    • Dosage error (Strategy: {self.get_strategy_name()})", "error"))
+            
+            return is_valid
+        except ValueError:
+            if status_queue:
+                status_queue.put((f"    • Non-numeric dosage (Strategy: {self.get_strategy_name()})", "error"))
+            return False
+    
+    def get_strategy_name(self):
+        return "Dosage Validator"
+
+
+class DateValidationStrategy(ValidationStrategy):
+    """Concrete Strategy: Validates date ranges and formats"""
+    
+    def validate(self, date_data, status_queue=None):
+        """date_data should be tuple (start_date, end_date)"""
+        start_date, end_date = date_data
+        
+        try:
+            sd = datetime.strptime(start_date, "%Y-%m-%d")
+            ed = datetime.strptime(end_date, "%Y-%m-%d")
+            
+            if ed < sd:
+                if status_queue:
+                    status_queue.put((f"    • Date range error (Strategy: {self.get_strategy_name()})", "error"))
+                return False
+            return True
+        except ValueError:
+            if status_queue:
+                status_queue.put((f"    • Date format error (Strategy: {self.get_strategy_name()})", "error"))
+            return False
+    
+    def get_strategy_name(self):
+        return "Date Range Validator"
+
+
+class OutcomeValidationStrategy(ValidationStrategy):
+    """Concrete Strategy: Validates outcome values"""
+    
+    def __init__(self):
+        self.valid_outcomes = list(CLINICAL_SCHEMA.column("Outcome").enum)
+    
+    def validate(self, outcome, status_queue=None):
+        """Validate outcome is one of allowed values"""
+        is_valid = outcome in self.valid_outcomes
+        
+        if not is_valid and status_queue:
+            status_queue.put((f"    • Invalid outcome (Strategy: {self.get_strategy_name()})", "error"))
+        
+        return is_valid
+    
+    def get_strategy_name(self):
+        return "Outcome Validator"
+
+
+class ValidationContext:
+    """Context class that uses validation strategies"""
+    
+    def __init__(self):
+        self.strategies = []
+    
+    def add_strategy(self, strategy):
+        """Add a validation strategy to the context"""
+        self.strategies.append(strategy)
+    
+    def execute_validation(self, data_type, data, status_queue=None):
+        """Execute appropriate validation strategy based on data type"""
+        for strategy in self.strategies:
+            if strategy.get_strategy_name().startswith(data_type):
+                return strategy.validate(data, status_queue)
+        return True  
+    
+    def get_all_strategies(self):
+        """Return list of all registered strategies"""
+        return [strategy.get_strategy_name() for strategy in self.strategies]
+#END STRATEGY PATTERN
+
+# Rows between cancellation checks (and row progress reports) while validating
+CANCEL_CHECK_ROWS = 4096
+
+VALIDATION_MODES = ("full", "fail_fast", "sample")
+DEFAULT_MAX_ERRORS = 10
+DEFAULT_SAMPLE_FRACTION = 0.01
+SAMPLE_BLOCK_ROWS = 1024
+# Caps a plain file's sample (~64k rows) so triage time does not grow with the file
+DEFAULT_SAMPLE_MAX_BLOCKS = 64
+
+
+class ValidationMode:
+    """How much of a file validate_file() checks.
+
+    full checks every row. fail_fast stops once max_errors rows have failed.
+    sample checks a seeded random choice of `fraction` of the file's blocks of
+    block_rows rows (the first block always) and estimates the error rate:
+    plain files are read only at the sampled offsets, at most max_blocks of
+    them; compressed ones are decompressed throughout, but skipped blocks are
+    never decoded or parsed. Errors found by fail_fast or sample are real, so
+    they may reject a file, but only a complete pass may accept it for
+    archiving.
+    """
+
+    def __init__(self, kind="full", max_errors=DEFAULT_MAX_ERRORS, fraction=DEFAULT_SAMPLE_FRACTION, seed=0,
+                 block_rows=SAMPLE_BLOCK_ROWS, max_blocks=DEFAULT_SAMPLE_MAX_BLOCKS):
+        if kind not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode '{kind}' (expected one of {VALIDATION_MODES})")
+        if kind == "fail_fast" and max_errors < 1:
+            raise ValueError("fail_fast needs max_errors >= 1")
+        if kind == "sample" and not 0 < fraction <= 1:
+            raise ValueError("sample fraction must be in (0, 1]")
+        if block_rows < 1 or max_blocks < 1:
+            raise ValueError("block_rows and max_blocks must be >= 1")
+        self.kind = kind
+        self.max_errors = max_errors
+        self.fraction = fraction
+        self.seed = seed
+        self.block_rows = block_rows
+        self.max_blocks = max_blocks
+
+    def __str__(self):
+        if self.kind == "fail_fast":
+            return f"fail_fast({self.max_errors})"
+        if self.kind == "sample":
+            return f"sample({self.fraction:g}, seed={self.seed})"
+        return "full"
+
+
+FULL_VALIDATION = ValidationMode()
+
+
+class ValidationResult:
+    """Outcome of validating one file's content"""
+
+    def __init__(self):
+        self.is_valid = False
+        self.errors = []
+        self.error_total = 0
+        self.valid_count = 0
+        self.rows_scanned = 0
+        self.error_counts = {
+            'field_count': 0, 'missing_fields': 0, 'dosage': 0,
+            'date_range': 0, 'date_format': 0, 'outcome': 0,
+            'duplicate': 0
+        }
+        self.report_path = None
+        self.stats = RecordStats()
+        self.sha256 = None
+        self.byte_size = None
+        self.encoding = None
+        self.line_ending = None
+        self.mode = "full"
+        # False when rows were left unchecked (fail_fast stopped early, or sampled)
+        self.complete = True
+        self.estimated_rows = None
+        self.estimated_error_rate = None
+        # Byte offset of the checkpoint validation resumed from (only appended rows were parsed)
+        self.resumed_from = None
+        # Seconds per stage of this validation (helix_timing.STAGES)
+        self.timings = StageTimer()
+
+    def add_error(self, message, report=None, entries=()):
+        """Count an error, keep its message if under the cap and stream its entries"""
+        self.error_total += 1
+        if len(self.errors) < ERROR_SAMPLE_LIMIT:
+            self.errors.append(message)
+        if report:
+            for entry in entries:
+                report.write(*entry)
+
+    def fail(self, message, report=None, code=None):
+        """File-level failure: the file is rejected as a whole"""
+        self.is_valid = False
+        self.valid_count = 0
+        self.errors = [message]
+        self.error_total += 1
+        if report:
+            report.write(None, None, code, None, message)
+
+
+class ClinicalDataValidator:
+    def __init__(self, download_dir, archive_dir, error_dir, archive_compression=None,
+                 compression_level=DEFAULT_COMPRESSION_LEVEL, archive_workers=2, columnar_export=False,
+                 validation_mode=FULL_VALIDATION, result_cache=None,
+                 download_cache_bytes=DEFAULT_DOWNLOAD_CACHE_BYTES):
+        self.download_dir = Path(download_dir)
+        self.archive_dir = Path(archive_dir)
+        self.error_dir = Path(error_dir)
+        for directory in [self.download_dir, self.archive_dir, self.error_dir]:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.processed_files_log = self.download_dir / "processed_files.txt"
+        self.processed_files = self._load_processed_files()
+        self.archive_compression = normalize_compression(archive_compression)
+        self.compression_level = int(compression_level)
+        self.archive_pool = ArchiveWorkerPool(max_workers=archive_workers)
+        self.catalog = ArchiveCatalog.for_archive(self.archive_dir)
+        self.columnar_export = columnar_export
+        self.validation_mode = validation_mode
+        self.checkpoints = CheckpointStore(self.download_dir / CHECKPOINT_DIRNAME)
+        # Pass the previous validator's result_cache to keep reusing its results
+        self.result_cache = result_cache or ValidationCache((VALIDATOR_VERSION, CLINICAL_SCHEMA.signature()))
+        # On disk, shared with every validator using this download directory
+        self.download_cache = DownloadCache(self.download_dir / DOWNLOAD_CACHE_DIRNAME, download_cache_bytes)
+        # Guards processed_files, the error log and files claimed by batch workers
+        self._lock = threading.RLock()
+        self._in_flight = set()
+
+    def _load_processed_files(self):
+        if self.processed_files_log.exists():
+            return set(self.processed_files_log.read_text().splitlines())
+        return set()
+
+    def _save_processed_file(self, filename):
+        with self._lock:
+            self.processed_files.add(filename)
+            self.processed_files_log.write_text("\n".join(sorted(self.processed_files)))
+        # Processed files are never validated again
+        self.checkpoints.remove(filename)
+
+    def generate_uuid_from_api():
+        try:
+            import requests
+        except ImportError:
+            return str(uuid.uuid4())
+        try:
+            response = requests.get("https://www.uuidtools.com/api/generate/v4", timeout=5)
+            response.raise_for_status()
+            uuids = response.json() 
+
+            if isinstance(uuids, list) and len(uuids) > 0: 
+                return uuids[0]
+        except requests.exceptions.Timeout: 
+             pass
+        except requests. exceptions.ConnectionError: 
+            pass
+        except Exception as e: 
+            pass
+
+        return str(uuid.uuid4())
+
+        if response.status_code != 200:
+            raise ConnectionError(
+                    f"API returned status code {response.status_code}"
+                )
+
+            data = response.json()
+            return data[0] 
+
+
+    def _generate_guid(self):
+        return ClinicalDataValidator.generate_uuid_from_api()
+
+    def _log_error(self, filename, error_details):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        guid = self._generate_guid()
+        log_entry = f"[{timestamp}] GUID: {guid} | File: {filename} | Error: {error_details}\n"
+        error_log_path = self.error_dir / "error_report.log"
+        with self._lock:
+            with open(error_log_path, "a", encoding='utf-8') as f:
+                f.write(log_entry)
+        return guid, log_entry
+
+    def _validate_filename_pattern(self, filename, status_queue=None):
+        pattern = r'^CLINICALDATA\d{14}\.CSV$'
+        is_valid = re.match(pattern, filename, re.IGNORECASE) is not None
+        emit(status_queue, "filename_ok" if is_valid else "filename_bad", filename)
+        return is_valid
+
+    def _validate_csv_content(self, file_path, status_queue=None, progress_callback=None, report_name=None):
+        """
+        Returns: (is_valid: bool, errors: [str], valid_count: int)
+        Uses short stage-based logs instead of progress percentages.
+        Only the first ERROR_SAMPLE_LIMIT error messages are kept in memory;
+        see validate_file() for the full result.
+        """
+        result = self.validate_file(file_path, status_queue=status_queue,
+                                    progress_callback=progress_callback, report_name=report_name)
+        return result.is_valid, result.errors, result.valid_count
+
+    def validate_file(self, file_path, status_queue=None, progress_callback=None, report_name=None, sink=None,
+                      cancel=None, scan=None, mode=None, checkpoint=None):
+        """
+        Validate a CSV path or file-like object and return a ValidationResult.
+        A path's bytes are hashed and pre-scanned (UTF-8, BOM, line endings)
+        before parsing, in one read - or not at all when scan, the finished
+        ContentScan of the same bytes taken during the download, is given - so
+        mis-encoded files are rejected without being parsed.
+        A plain file that scanned clean is then parsed through a memory map
+        (helix_rows.MappedFile) rather than a buffered text stream.
+        mode (a ValidationMode, default self.validation_mode) selects full,
+        fail-fast or sampled validation; a sampled pass skips the pre-scan
+        and never feeds sink.
+        checkpoint (a helix_checkpoint.Checkpoint; not with sampling) carries
+        state between runs: past offset 0, file_path holds only the bytes
+        after checkpoint.offset, with no header, and its rows are numbered and
+        counted on from checkpoint.rows. Duplicates are checked against
+        checkpoint.keys, which collects this run's keys.
+        When report_name is given, every error is streamed to
+        <error_dir>/<report_name>.errors.jsonl as it is found.
+        sink (e.g. a ColumnarWriter) receives every valid row via
+        sink.add(row, start_date, end_date, dosage).
+        progress_callback, if given, is called with the number of rows
+        scanned since its previous call, every CANCEL_CHECK_ROWS rows.
+        cancel (a CancellationToken) is checked every CANCEL_CHECK_ROWS rows;
+        on cancellation the partial report is removed and OperationCancelled
+        propagates.
+        """
+        mode = mode or self.validation_mode
+        result = ValidationResult()
+        result.mode = str(mode)
+        max_errors = mode.max_errors if mode.kind == "fail_fast" else None
+        if checkpoint is not None and checkpoint.offset:
+            result.resumed_from = checkpoint.offset
+        cancelled = False
+        report = ErrorReportWriter(report_path_for(self.error_dir, report_name)) if report_name else None
+
+        emit(status_queue, "content_start", report_name)
+
+        try:
+            if mode.kind == "sample" and (scan is None or scan.valid):
+                # Triage reads only the sampled blocks, so there is no whole-file pre-scan
+                if scan is not None:
+                    result.sha256, result.byte_size = scan.sha256.hexdigest(), scan.byte_size
+                with result.timings.stage("row_validation"):
+                    self._validate_sample(file_path, mode, result, report, status_queue, cancel)
+                return result
+            # Accept paths or file-like object
+            if isinstance(file_path, (str, Path)) and scan is None and max_errors is not None:
+                # Fail-fast may stop at row 2, so scan in the parse read instead of a pass before it
+                with open_archive(file_path, 'rb') as raw:
+                    scanning = ScanningReader(raw)
+                    buffered = io.BufferedReader(scanning, 1 << 16)
+                    encoding = "utf-8-sig" if buffered.peek(len(UTF8_BOM)).startswith(UTF8_BOM) else "utf-8"
+                    with io.TextIOWrapper(buffered, encoding=encoding, newline='') as fobj:
+                        self._validate_rows(csv.reader(fobj), result, report, status_queue, sink, cancel,
+                                            progress_callback, max_errors, checkpoint)
+                if result.complete:
+                    self._apply_scan(result, scanning.scan.finish())
+            elif isinstance(file_path, (str, Path)):
+                if scan is None:
+                    with result.timings.stage("decode"):
+                        scan = scan_file(file_path)
+                self._apply_scan(result, scan)
+                if not scan.valid:
+                    emit(status_queue, "encoding_error", report_name)
+                    result.fail(f"File is not valid UTF-8 encoded CSV (invalid byte at offset {scan.error_offset})",
+                                report, code="encoding")
+                    return result
+                # Scanned clean: decoded once, by the parser, with any BOM stripped
+                if can_map(file_path, scan):
+                    with MappedFile(file_path, scan.encoding, timer=result.timings) as mapped:
+                        self._validate_rows(mapped.rows(), result, report, status_queue, sink,
+                                            cancel, progress_callback, max_errors, checkpoint)
+                else:
+                    with open_archive(file_path, 'rb') as raw:
+                        with io.TextIOWrapper(raw, encoding=scan.encoding, newline='') as fobj:
+                            self._validate_rows(csv.reader(fobj), result, report, status_queue, sink, cancel,
+                                                progress_callback, max_errors, checkpoint)
+            else:
+                self._validate_rows(csv.reader(file_path), result, report, status_queue, sink, cancel,
+                                    progress_callback, max_errors, checkpoint)
+
+        except OperationCancelled:
+            cancelled = True
+            raise
+        except UnicodeDecodeError:
+            emit(status_queue, "encoding_error", report_name)
+            result.fail("File is not valid UTF-8 encoded CSV", report, code="encoding")
+        except Exception as e:
+            emit(status_queue, "read_error", report_name, error=str(e))
+            result.fail(f"File read error: {str(e)}", report, code="read_error")
+        finally:
+            if report:
+                with result.timings.stage("error_logging"):
+                    report.close()
+                    if cancelled:
+                        report.path.unlink(missing_ok=True)
+                    elif report.written:
+                        result.report_path = report.path
+        return result
+
+    @staticmethod
+    def _apply_scan(result, scan):
+        result.sha256 = scan.sha256.hexdigest()
+        result.byte_size = scan.byte_size
+        result.line_ending = scan.line_ending
+        if scan.valid:
+            result.encoding = "ascii" if scan.ascii else scan.encoding
+
+    def _check_header(self, header, result, report, status_queue=None):
+        """True when header (None for an empty file) is the expected one; else records the failure"""
+        if header is None:
+            emit(status_queue, "empty_file")
+            result.fail("File is empty", report, code="empty_file")
+            return False
+
+        # Stage: Checking header
+        emit(status_queue, "header_check")
+        expected_fields = CLINICAL_SCHEMA.header
+        if header != expected_fields:
+            result.add_error(f"Invalid header. Expected fields: {expected_fields}", report,
+                             [(1, None, "header", ",".join(header), "Invalid header")])
+            emit(status_queue, "header_bad")
+            return False
+        emit(status_queue, "header_ok", fields=len(header))
+        return True
+
+    def _validate_rows(self, reader, result, report, status_queue=None, sink=None, cancel=None,
+                       progress_callback=None, max_errors=None, checkpoint=None):
+        """Stream rows from a csv reader into result, one row in memory at a time.
+
+        With max_errors, stop (result.complete = False) once that many rows have failed.
+        With a checkpoint past offset 0, reader starts after its last row, not at a header.
+        """
+        schema = CLINICAL_SCHEMA
+        check_row = schema.row_checker()
+        seen_records = checkpoint.keys if checkpoint is not None else set()
+        trial_index, drug_index, dosage_index, start_index, end_index = (
+            schema.index(name) for name in ("TrialCode", "DrugCode", "Dosage_mg", "StartDate", "EndDate"))
+        resumed = checkpoint is not None and checkpoint.offset > 0
+        timings = result.timings
+        if resumed:
+            # The checkpointed rows were all valid
+            result.valid_count = checkpoint.rows
+        else:
+            with timings.stage("header_check"):
+                header_ok = self._check_header(next(reader, None), result, report, status_queue)
+            if not header_ok:
+                return
+
+        # Stage: Validating rows
+        emit(status_queue, "rows_start")
+
+        prefix_rows = checkpoint.rows if resumed else 0
+        row_num = prefix_rows + 1
+        reported = prefix_rows
+        error_counts = result.error_counts
+        with timings.stage("row_validation"):
+            for row in reader:
+                row_num += 1
+                if row_num % CANCEL_CHECK_ROWS == 0:
+                    if cancel is not None:
+                        cancel.check()
+                    if progress_callback is not None:
+                        progress_callback(row_num - 1 - reported)
+                        reported = row_num - 1
+                record_errors, values = check_row(row_num, row, seen_records, error_counts)
+                if record_errors:
+                    messages = []
+                    for entry in record_errors:
+                        if entry[4] not in messages:
+                            messages.append(entry[4])
+                    result.add_error(f"Row {row_num}: {'; '.join(messages)}", report, record_errors)
+                    if max_errors is not None and result.error_total >= max_errors:
+                        result.complete = False
+                        break
+                else:
+                    result.valid_count += 1
+                    start_date, end_date = values[start_index], values[end_index]
+                    result.stats.add(values[trial_index], values[drug_index], start_date, end_date)
+                    if sink is not None:
+                        sink.add(row, start_date, end_date, values[dosage_index])
+
+        result.rows_scanned = row_num - 1 - prefix_rows
+        if progress_callback is not None and row_num - 1 > reported:
+            progress_callback(row_num - 1 - reported)
+        if result.rows_scanned == 0 and not resumed:
+            emit(status_queue, "no_data_rows")
+            result.fail("No data rows", report, code="no_data_rows")
+            return
+
+        # Stage: Checking duplicates (summary stage)
+        with timings.stage("dedup"):
+            emit(status_queue, "duplicates_check")
+            self._finish_rows(result, report, status_queue)
+        if not result.complete:
+            message = f"Validation stopped after {result.error_total} invalid rows ({result.mode})"
+            if report:
+                report.write(None, None, "stopped", result.rows_scanned, message)
+            emit(status_queue, "stopped_early", errors=result.error_total, rows=result.rows_scanned,
+                 mode=result.mode)
+
+    def _finish_rows(self, result, report, status_queue):
+        """Summary events and the verdict once rows have been checked"""
+        emit(status_queue, "rows_scanned", rows=result.rows_scanned)
+        emit(status_queue, "valid_records", records=result.valid_count)
+        for category in ('dosage', 'date_range', 'date_format', 'outcome', 'duplicate', 'missing_fields'):
+            if result.error_counts[category] > 0:
+                emit(status_queue, "error_count", category=category, count=result.error_counts[category])
+
+        # Stage: Finalizing
+        emit(status_queue, "finalizing")
+
+        result.is_valid = result.error_total == 0
+
+    def _validate_sample(self, source, mode, result, report, status_queue=None, cancel=None):
+        """Check a seeded random sample of source's row blocks and estimate the file's error rate"""
+        rng = random.Random(mode.seed)
+        result.complete = False
+        if isinstance(source, (str, Path)) and compression_of(source) is None:
+            with open(source, 'rb') as f:
+                self._check_sample(self._seek_blocks(f, os.fstat(f.fileno()).st_size, mode, rng, result),
+                                   result, report, status_queue, cancel)
+        elif isinstance(source, (str, Path)):
+            with open_archive(source, 'rb') as f:
+                self._check_sample(self._skip_blocks(f, mode, rng, result), result, report, status_queue, cancel)
+        else:
+            self._check_sample(self._skip_blocks(iter(source), mode, rng, result), result, report,
+                               status_queue, cancel)
+
+    @staticmethod
+    def _seek_blocks(f, size, mode, rng, result):
+        """Header line, then blocks of (row_num, byte offset, line) read at sampled offsets of a plain file.
+
+        Block boundaries are byte offsets (block_rows times the mean length of
+        the first block's lines), so sampled rows are labelled by offset, not
+        row number.
+        """
+        yield f.readline()
+        data_start = f.tell()
+        first = list(islice(f, mode.block_rows))
+        if not first:
+            return
+        block_bytes = max(1, sum(map(len, first)) * mode.block_rows // len(first))
+        blocks = max(1, math.ceil((size - data_start) / block_bytes))
+        count = min(blocks - 1, round(mode.fraction * blocks), mode.max_blocks - 1)
+        chosen = sorted(rng.sample(range(1, blocks), max(count, 0)))
+        result.estimated_rows = round((size - data_start) * len(first) / sum(map(len, first)))
+        offset, row_num = data_start, 2
+        block = []
+        for line in first:
+            block.append((row_num, offset, line))
+            offset += len(line)
+            row_num += 1
+        yield block
+        for index in chosen:
+            start = data_start + index * block_bytes
+            if start < offset:
+                # The previous block ran past this one's start
+                start = offset
+            else:
+                # Resynchronise on the next line start
+                f.seek(start - 1)
+                start += len(f.readline()) - 1
+            offset = start
+            block = []
+            for line in islice(f, mode.block_rows):
+                block.append((None, offset, line))
+                offset += len(line)
+            if block:
+                yield block
+
+    @staticmethod
+    def _skip_blocks(lines, mode, rng, result):
+        """Header line, then the sampled blocks of (row_num, None, line) of a sequential stream;
+        skipped blocks are only counted"""
+        yield next(lines, None)
+        row_num = 2
+        first = True
+        for block in iter(lambda: list(islice(lines, mode.block_rows)), []):
+            if first or rng.random() < mode.fraction:
+                yield [(row_num + i, None, line) for i, line in enumerate(block)]
+            first = False
+            row_num += len(block)
+        result.estimated_rows = row_num - 2
+
+    def _check_sample(self, blocks, result, report, status_queue, cancel):
+        header_line = next(blocks)
+        header = None
+        if header_line:
+            if isinstance(header_line, bytes):
+                header_line = header_line.decode('utf-8-sig')
+            header = next(csv.reader([header_line]), None)
+        if not self._check_header(header, result, report, status_queue):
+            return
+        emit(status_queue, "rows_start")
+        check_row = CLINICAL_SCHEMA.row_checker()
+        seen_records = set()
+        invalid_rows = 0
+        for block in blocks:
+            if cancel is not None:
+                cancel.check()
+            lines = [line.decode('utf-8') if isinstance(line, bytes) else line for _, _, line in block]
+            # One row per physical line (a record with quoted line breaks would shift the labels)
+            for (row_num, offset, _), row in zip(block, csv.reader(lines)):
+                record_errors, _ = check_row(row_num, row, seen_records, result.error_counts)
+                result.rows_scanned += 1
+                if not record_errors:
+                    result.valid_count += 1
+                    continue
+                invalid_rows += 1
+                where = f"Row {row_num}" if row_num is not None else f"Row at byte {offset}"
+                messages = []
+                for entry in record_errors:
+                    if entry[4] not in messages:
+                        messages.append(entry[4])
+                result.add_error(f"{where}: {'; '.join(messages)}", report, record_errors)
+        if result.rows_scanned == 0:
+            emit(status_queue, "no_data_rows")
+            result.fail("No data rows", report, code="no_data_rows")
+            return
+        result.estimated_error_rate = invalid_rows / result.rows_scanned
+        self._finish_rows(result, report, status_queue)
+        message = (f"Sampled {result.rows_scanned} of ~{result.estimated_rows} rows: "
+                   f"{result.estimated_error_rate:.1%} invalid ({result.mode})")
+        if report:
+            report.write(None, None, "sampled", result.rows_scanned, message)
+        emit(status_queue, "sample_summary", rows=result.rows_scanned, estimated=result.estimated_rows,
+             rate=result.estimated_error_rate, mode=result.mode)
+
+    def validate_selected_files(self, ftp_obj, files, status_queue, progress=None, cancel=None):
+        valid_count = 0
+        invalid_count = 0
+        for filename in files:
+            try:
+                if cancel is not None:
+                    cancel.check()
+                outcome = self.validate_remote_file(ftp_obj, filename, status_queue, progress, cancel)
+            except OperationCancelled:
+                emit(status_queue, "validation_cancelled")
+                break
+            except _transfer_errors():
+                outcome = "invalid"
+            if outcome == "valid":
+                valid_count += 1
+            elif outcome == "invalid":
+                invalid_count += 1
+        emit(status_queue, "validation_complete")
+        emit(status_queue, "validation_summary", valid=valid_count, invalid=invalid_count)
+
+    def validate_remote_file(self, ftp_obj, filename, status_queue, progress=None, cancel=None):
+        """Download one file to a temporary path and validate it without archiving.
+
+        Returns "valid", "invalid" or "skipped". Transfer errors and
+        OperationCancelled are re-raised after cleanup. A plain file that
+        validates clean and completely is checkpointed, so a later run
+        downloads and parses only the rows appended to it since. A file the
+        download cache holds is not transferred, content already validated is
+        not parsed again, and a complete result is cached for process_file.
+        """
+        if filename in self.processed_files:
+            emit(status_queue, "skipped", filename)
+            if progress:
+                progress.update(filename, "skipped", "already processed")
+            return "skipped"
+        emit(status_queue, "separator")
+        emit(status_queue, "validate_start", filename)
+        temp_path = self.download_dir / f"temp_validate_{filename}"
+        outcome = "invalid"
+        timings = StageTimer()
+        try:
+            plain = compression_of(filename) is None
+            checkpoints = plain and self.validation_mode.kind != "sample"
+            checkpoint = tail = scan = None
+            boundary = b""
+            with timings.stage("download"):
+                # Taken before the transfer, so a file changing during it does not match later
+                remote = self._remote_stat(ftp_obj, filename)
+                sha256 = self._cached_copy(filename, remote, temp_path, status_queue)
+                if sha256 is None:
+                    if checkpoints:
+                        with timings.stage("dedup"):
+                            checkpoint = self.checkpoints.load(filename)
+                        if checkpoint is not None:
+                            tail = self._download_tail(ftp_obj, filename, temp_path, checkpoint, remote[0],
+                                                       status_queue, progress, cancel)
+                    if tail is not None:
+                        scan, boundary = tail
+                    else:
+                        scan = self._download(ftp_obj, filename, temp_path, progress, cancel, remote)
+                        if plain:
+                            sha256 = scan.sha256.hexdigest()
+            if checkpoints and tail is None:
+                checkpoint = Checkpoint(filename)
+            if self._validate_filename_pattern(filename, status_queue):
+                if progress:
+                    progress.update(filename, "validating")
+                # The SHA-256 of a compressed file's bytes is not that of its content
+                result = self.result_cache.get(sha256, filename) if plain and sha256 else None
+                if result is not None:
+                    emit(status_queue, "result_reused", filename, records=result.valid_count)
+                    # No rows are read, so count them from the result
+                    if progress:
+                        progress.add_rows(filename, result.rows_scanned)
+                else:
+                    result = self.validate_file(
+                        temp_path, status_queue=status_queue,
+                        progress_callback=self._row_counter(progress, filename),
+                        report_name=filename, cancel=cancel, scan=scan, checkpoint=checkpoint
+                    )
+                    timings.merge(result.timings)
+                    # A reused result has no duplicate-check keys to checkpoint
+                    if checkpoint is not None and result.is_valid and result.complete:
+                        with timings.stage("dedup"):
+                            self._advance_checkpoint(checkpoint, temp_path, boundary, result)
+                if tail is None:
+                    self.result_cache.put(result, filename)
+                if result.is_valid:
+                    emit(status_queue, "file_valid", filename, records=result.valid_count)
+                    outcome = "valid"
+                else:
+                    emit(status_queue, "file_invalid", filename, errors=result.error_total)
+                    if result.report_path:
+                        emit(status_queue, "error_report", filename, report=result.report_path.name)
+                if progress:
+                    progress.update(filename, outcome, f"{result.error_total} errors" if result.error_total else "",
+                                    result=result)
+            elif progress:
+                progress.update(filename, "invalid", "invalid filename pattern")
+            if temp_path.exists():
+                temp_path.unlink()
+        except OperationCancelled:
+            emit(status_queue, "cancelled", filename)
+            if progress:
+                progress.update(filename, "cancelled")
+            temp_path.unlink(missing_ok=True)
+            raise
+        except Exception as e:
+            emit(status_queue, "validate_failed", filename, error=str(e))
+            if progress:
+                progress.update(filename, "failed", str(e))
+            if temp_path.exists():
+                temp_path.unlink()
+            if isinstance(e, _transfer_errors()):
+                raise
+        finally:
+            self._report_timings(filename, timings, status_queue, progress)
+            emit(status_queue, "separator")
+        return outcome
+
+    @staticmethod
+    def _report_timings(filename, timings, status_queue=None, progress=None):
+        """Publish a file's per-stage seconds to the status log and its BatchProgress entry"""
+        stages = timings.to_dict()
+        emit(status_queue, "stage_times", filename, stages=stages)
+        if progress:
+            progress.add_stages(filename, stages)
+
+    @staticmethod
+    def _row_counter(progress, filename):
+        """validate_file() progress_callback feeding a BatchProgress's live row count"""
+        if progress is None:
+            return None
+        return lambda count: progress.add_rows(filename, count)
+
+    def _cached_copy(self, filename, remote, local_path, status_queue=None):
+        """Place the download cache's copy of filename's remote (size, mtime) version at local_path;
+        returns its SHA-256, or None when the cache does not hold it"""
+        sha256 = self.download_cache.fetch(filename, remote, local_path)
+        if sha256 is not None:
+            emit(status_queue, "download_cached", filename)
+        return sha256
+
+    def _download(self, ftp_obj, filename, local_path, progress=None, cancel=None, remote=None):
+        """Transfer filename to local_path; returns the ContentScan of the bytes received,
+        or None for a compressed file, whose content is only seen once decompressed.
+        With remote, the server's (size, mtime) taken before the transfer, the
+        file is added to the download cache."""
+        if progress:
+            progress.update(filename, "downloading")
+        scan = ContentScan() if compression_of(filename) is None else None
+        # A previous file at local_path may be a hard link to a cached copy: never write through it
+        local_path.unlink(missing_ok=True)
+        with open(local_path, 'wb') as f:
+            def write(block):
+                # Raising here aborts retrbinary mid-transfer
+                if cancel is not None:
+                    cancel.check()
+                f.write(block)
+                if scan is not None:
+                    scan.feed(block)
+                if progress:
+                    progress.add_bytes(filename, len(block))
+            ftp_obj.retrbinary(f'RETR {filename}', write)
+        if scan is not None:
+            scan.finish()
+        if remote is not None:
+            self.download_cache.store(filename, remote, local_path, scan.sha256.hexdigest() if scan else None)
+        return scan
+
+    def _download_tail(self, ftp_obj, filename, local_path, checkpoint, size, status_queue=None, progress=None,
+                       cancel=None):
+        """Transfer only the bytes appended to filename since checkpoint to local_path.
+
+        The transfer restarts checkpoint.boundary_size bytes early so the end
+        of the checkpointed prefix can be compared. Returns (scan, boundary):
+        the ContentScan of the appended bytes and the re-read boundary bytes;
+        or None when the whole file has to be downloaded - the server will not
+        give its size or restart a transfer, or the file shrank or changed
+        before the checkpoint (which is then discarded). size is the file's
+        size on the server, None when unknown.
+        """
+        if size is None:
+            return None
+        if size < checkpoint.offset:
+            emit(status_queue, "checkpoint_stale", filename, reason="file is smaller than the checkpoint")
+            self.checkpoints.remove(filename)
+            return None
+        emit(status_queue, "checkpoint_resume", filename, offset=checkpoint.offset, rows=checkpoint.rows,
+             appended=size - checkpoint.offset)
+        if progress:
+            progress.update(filename, "downloading")
+        boundary = bytearray()
+        scan = ContentScan()
+        local_path.unlink(missing_ok=True)
+        with open(local_path, 'wb') as f:
+            def write(block):
+                # Raising here aborts retrbinary mid-transfer
+                if cancel is not None:
+                    cancel.check()
+                if progress:
+                    progress.add_bytes(filename, len(block))
+                missing = checkpoint.boundary_size - len(boundary)
+                if missing > 0:
+                    boundary.extend(block[:missing])
+                    block = block[missing:]
+                if block:
+                    f.write(block)
+                    scan.feed(block)
+            try:
+                ftp_obj.retrbinary(f'RETR {filename}', write, rest=checkpoint.offset - checkpoint.boundary_size)
+            except _refused_errors():
+                # No REST support: nothing was transferred
+                return None
+        if not checkpoint.matches(bytes(boundary)):
+            emit(status_queue, "checkpoint_stale", filename, reason="content before the checkpoint changed")
+            self.checkpoints.remove(filename)
+            return None
+        return scan.finish(), bytes(boundary)
+
+    @staticmethod
+    def _remote_stat(ftp_obj, filename):
+        """(size, modification time) of filename on the server; either is None when the server will not tell"""
+        size = mtime = None
+        try:
+            # Some servers refuse SIZE in ASCII mode
+            ftp_obj.voidcmd('TYPE I')
+            size = ftp_obj.size(filename)
+            reply = ftp_obj.sendcmd(f'MDTM {filename}')
+            if isinstance(reply, str) and reply.startswith("213 "):
+                mtime = reply[4:].strip()
+        except _refused_errors():
+            pass
+        return (size if isinstance(size, int) else None), mtime
+
+    def _advance_checkpoint(self, checkpoint, data_path, before, result):
+        """Move checkpoint past data_path - the bytes after it, which validated clean - and save it.
+
+        It stays where it was while the last row is unterminated, as an append could still extend that row.
+        """
+        if not result.byte_size:
+            return
+        boundary = read_boundary(data_path, before)
+        if not boundary.endswith(b"\n"):
+            return
+        checkpoint.offset += result.byte_size
+        checkpoint.rows = result.valid_count
+        checkpoint.boundary_sha256 = boundary_digest(boundary)
+        self.checkpoints.save(checkpoint)
+
+    def process_selected_files(self, ftp_obj, files, status_queue, progress=None, cancel=None):
+        processed_count = 0
+        error_count = 0
+        pending_archives = []
+        for filename in files:
+            try:
+                if cancel is not None:
+                    cancel.check()
+                outcome, job = self.process_file(ftp_obj, filename, status_queue, progress, cancel)
+            except OperationCancelled:
+                # Files already validated still finish archiving below
+                emit(status_queue, "processing_cancelled")
+                break
+            except _transfer_errors():
+                outcome, job = "failed", None
+            if job is not None:
+                pending_archives.append(job)
+            elif outcome == "archived":
+                processed_count += 1
+            elif outcome in ("rejected", "failed"):
+                error_count += 1
+        archived, failed = self._finish_archive_jobs(pending_archives, status_queue, progress)
+        processed_count += archived
+        error_count += failed
+        emit(status_queue, "processing_complete")
+        emit(status_queue, "processing_summary", archived=processed_count, rejected=error_count)
+
+    def process_file(self, ftp_obj, filename, status_queue, progress=None, cancel=None):
+        """Download, validate and archive or reject one file.
+
+        Returns (outcome, job): outcome is "archived", "rejected", "failed",
+        "skipped" or "archiving"; job is the pending compression job to pass to
+        _finish_archive_jobs when outcome is "archiving", else None. Transfer
+        errors are re-raised after cleanup because they leave the FTP
+        connection unusable; so is OperationCancelled, after the partial
+        download and any columnar output are removed.
+        """
+        with self._lock:
+            if filename in self.processed_files or filename in self._in_flight:
+                claimed = False
+            else:
+                self._in_flight.add(filename)
+                claimed = True
+        if not claimed:
+            emit(status_queue, "skipped", filename)
+            if progress:
+                progress.update(filename, "skipped", "already processed")
+            return "skipped", None
+        emit(status_queue, "separator")
+        emit(status_queue, "process_start", filename)
+        local_path = self.download_dir / filename
+        sink = None
+        outcome, job = "failed", None
+        timings = StageTimer()
+        try:
+            with timings.stage("download"):
+                # A file validated moments ago comes from the download cache, with its result
+                remote = self._remote_stat(ftp_obj, filename)
+                scan = None
+                sha256 = self._cached_copy(filename, remote, local_path, status_queue)
+                if sha256 is None:
+                    scan = self._download(ftp_obj, filename, local_path, progress, cancel, remote)
+                    emit(status_queue, "downloaded", filename)
+                    sha256 = scan.sha256.hexdigest() if scan is not None else None
+            reused = None
+            if sha256 is not None and compression_of(filename) is None:
+                reused = self.result_cache.get(sha256, filename)
+            if not self._validate_filename_pattern(filename, status_queue):
+                error_file = self.error_dir / filename
+                with timings.stage("error_logging"):
+                    move_unshared(local_path, error_file)
+                    guid, _ = self._log_error(filename, "Invalid filename pattern")
+                emit(status_queue, "rejected_pattern", filename, guid=guid)
+                if progress:
+                    progress.update(filename, "rejected", "invalid filename pattern")
+                outcome = "rejected"
+                return outcome, job
+            if self.columnar_export:
+                sink = ColumnarWriter(self.download_dir / f".{filename}{COLUMNAR_SUFFIX}.part")
+            if progress:
+                progress.update(filename, "validating")
+            sampled = self.validation_mode.kind == "sample"
+            if reused is not None and sink is None:
+                result = reused
+                emit(status_queue, "result_reused", filename, records=result.valid_count)
+                # No rows are read, so count them from the result
+                if progress:
+                    progress.add_rows(filename, result.rows_scanned)
+            else:
+                result = self.validate_file(
+                    local_path, status_queue=status_queue, progress_callback=self._row_counter(progress, filename),
+                    report_name=filename, sink=None if sampled else sink,
+                    cancel=cancel, scan=scan
+                )
+                timings.merge(result.timings)
+            if result.is_valid and not result.complete:
+                # A clean sample cannot accept a file for archiving: check every row
+                result = self.validate_file(
+                    local_path, status_queue=status_queue, progress_callback=self._row_counter(progress, filename),
+                    report_name=filename, sink=sink, cancel=cancel, scan=scan, mode=FULL_VALIDATION
+                )
+                timings.merge(result.timings)
+            record_count = result.valid_count
+            if result.is_valid:
+                try:
+                    current_date = datetime.now().strftime("%Y%m%d")
+                    base_name = filename[:-4]
+                    archive_filename = f"{base_name}_{current_date}.CSV{archive_suffix(self.archive_compression)}"
+                    archive_path = self.archive_dir / archive_filename
+                    if progress:
+                        progress.update(filename, "archiving")
+                    with timings.stage("archive_move"):
+                        if sink is not None:
+                            columns_dir = sink.finish(columnar_path_for(archive_path))
+                            if columns_dir is None:
+                                # Queries read this file from its CSV instead
+                                emit(status_queue, "columnar_skipped", filename, reason=sink.skipped)
+                            else:
+                                emit(status_queue, "columnar_export", filename, path=columns_dir.name)
+                            sink = None
+                        if self.archive_compression:
+                            future = self.archive_pool.submit(local_path, archive_path,
+                                                              self.archive_compression, self.compression_level)
+                            job = (filename, archive_filename, result, local_path, future, timings)
+                        else:
+                            move_unshared(local_path, archive_path)
+                            self._save_processed_file(filename)
+                            self._catalog_archive(archive_filename, filename, result,
+                                                  archive_path.stat().st_size, status_queue)
+                    if job is not None:
+                        outcome = "archiving"
+                        emit(status_queue, "compressing", filename, archive=archive_filename,
+                             method=self.archive_compression, level=self.compression_level)
+                    else:
+                        emit(status_queue, "archived", filename, archive=archive_filename, records=record_count)
+                        if progress:
+                            progress.update(filename, "archived", archive_filename)
+                        outcome = "archived"
+                except Exception as e:
+                    guid, _ = self._log_error(filename, f"Archival failed: {e}")
+                    emit(status_queue, "archive_failed", filename, guid=guid)
+                    if progress:
+                        progress.update(filename, "failed", f"archival failed: {e}")
+                    shutil.rmtree(columnar_path_for(self.archive_dir / archive_filename), ignore_errors=True)
+                    if local_path.exists():
+                        local_path.unlink()
+            else:
+                with timings.stage("error_logging"):
+                    if sink is not None:
+                        sink.discard()
+                    error_file = self.error_dir / filename
+                    move_unshared(local_path, error_file)
+                    errors = result.errors
+                    summary = " | ".join(errors[:3])
+                    if result.error_total > 3:
+                        summary += f" ... and {result.error_total - 3} more"
+                    if result.report_path:
+                        summary += f" | Report: {result.report_path.name}"
+                    guid, _ = self._log_error(filename, summary)
+                emit(status_queue, "rejected", filename, errors=result.error_total)
+                for error in errors[:3]:
+                    emit(status_queue, "error_sample", filename, message=error)
+                if result.report_path:
+                    emit(status_queue, "error_report", filename, report=result.report_path.name)
+                if progress:
+                    progress.update(filename, "rejected", f"{result.error_total} errors",
+                                    result=result)
+                outcome = "rejected"
+        except OperationCancelled:
+            emit(status_queue, "cancelled", filename)
+            if progress:
+                progress.update(filename, "cancelled")
+            if sink is not None:
+                sink.discard()
+            local_path.unlink(missing_ok=True)
+            raise
+        except Exception as e:
+            emit(status_queue, "fatal_error", filename, error=str(e))
+            if progress:
+                progress.update(filename, "failed", str(e))
+            if sink is not None:
+                sink.discard()
+            if local_path.exists():
+                local_path.unlink()
+            if isinstance(e, _transfer_errors()):
+                raise
+        finally:
+            if job is None:
+                with self._lock:
+                    self._in_flight.discard(filename)
+                # A compression job reports its file's timings once it has finished
+                self._report_timings(filename, timings, status_queue, progress)
+            emit(status_queue, "separator")
+        return outcome, job
+
+    def process_and_archive(self, ftp_obj, filename, status_queue, progress=None, cancel=None):
+        """process_file plus waiting for its compression job; used by batch workers"""
+        outcome, job = self.process_file(ftp_obj, filename, status_queue, progress, cancel)
+        if job is not None:
+            archived, _ = self._finish_archive_jobs([job], status_queue, progress)
+            outcome = "archived" if archived else "failed"
+        return outcome
+
+    def _finish_archive_jobs(self, pending_archives, status_queue, progress=None):
+        """Wait for background compression jobs and record their outcome"""
+        archived = failed = 0
+        if pending_archives:
+            emit(status_queue, "archive_wait", count=len(pending_archives))
+        for filename, archive_filename, result, local_path, future, timings in pending_archives:
+            try:
+                # The compression itself overlaps other files' work: only the wait for it is counted
+                with timings.stage("archive_move"):
+                    original_size, stored_size = future.result()
+                    self._save_processed_file(filename)
+                    self._catalog_archive(archive_filename, filename, result, stored_size, status_queue)
+                ratio = original_size / stored_size if stored_size else 0
+                emit(status_queue, "archived_compressed", filename, archive=archive_filename,
+                     records=result.valid_count, original_size=original_size, stored_size=stored_size, ratio=ratio)
+                if progress:
+                    progress.update(filename, "archived", archive_filename)
+                archived += 1
+            except Exception as e:
+                guid, _ = self._log_error(filename, f"Archival failed: {e}")
+                emit(status_queue, "archive_failed", filename, guid=guid)
+                if progress:
+                    progress.update(filename, "failed", f"archival failed: {e}")
+                failed += 1
+                shutil.rmtree(columnar_path_for(self.archive_dir / archive_filename), ignore_errors=True)
+                if local_path.exists():
+                    local_path.unlink()
+            finally:
+                with self._lock:
+                    self._in_flight.discard(filename)
+                self._report_timings(filename, timings, status_queue, progress)
+        return archived, failed
+
+    def _catalog_archive(self, archive_filename, filename, result, stored_size, status_queue=None):
+        """Record an archived file in the catalog; a catalog failure never undoes archival"""
+        try:
+            self.catalog.record_file(archive_filename, result.stats, byte_size=result.byte_size,
+                                     stored_size=stored_size, sha256=result.sha256,
+                                     compression=compression_of(archive_filename), source_name=filename)
+        except Exception as e:
+            emit(status_queue, "catalog_failed", filename, archive=archive_filename, error=str(e))
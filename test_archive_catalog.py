@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import shutil
+import hashlib
+import queue
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ftp import mock_ftp
+
+try:
+    from Helix import ClinicalDataValidator
+    from helix_catalog import ArchiveCatalog, CATALOG_FILENAME
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HEADER = "PatientID,TrialCode,DrugCode,Dosage_mg,StartDate,EndDate,Outcome,SideEffects,Analyst\n"
+FILE_A = (HEADER
+          + "P001,TR-A,DRG-1,100,2024-01-05,2024-01-20,Improved,None,A1\n"
+          + "P002,TR-A,DRG-2,150,2024-02-01,2024-03-01,Worsened,Mild,A2\n").encode('utf-8')
+FILE_B = (HEADER
+          + "P101,TR-B,DRG-2,50,2024-06-01,2024-06-10,No Change,None,A3\n").encode('utf-8')
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestArchiveCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="catalog_test_"))
+        self.archive_dir = self.temp_dir / "archive"
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.archive_dir,
+                                               self.temp_dir / "errors", archive_compression="gzip")
+        files = {"CLINICALDATA20240101120000.CSV": FILE_A, "CLINICALDATA20240601120000.CSV": FILE_B}
+        self.validator.process_selected_files(mock_ftp(files), sorted(files), queue.Queue())
+        self.catalog = ArchiveCatalog.for_archive(self.archive_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def archive_name(self, prefix):
+        return next(self.archive_dir.glob(f"{prefix}_*.CSV.gz")).name
+
+    def test_entry_populated_during_processing(self):
+        entry = self.catalog.get_file(self.archive_name("CLINICALDATA20240101120000"))
+
+        self.assertEqual(entry["record_count"], 2)
+        self.assertEqual(entry["min_start_date"], "2024-01-05")
+        self.assertEqual(entry["max_end_date"], "2024-03-01")
+        self.assertEqual(entry["trial_codes"], ["TR-A"])
+        self.assertEqual(entry["drug_codes"], ["DRG-1", "DRG-2"])
+        self.assertEqual(entry["byte_size"], len(FILE_A))
+        self.assertEqual(entry["sha256"], hashlib.sha256(FILE_A).hexdigest())
+        self.assertEqual(entry["compression"], "gzip")
+        self.assertEqual(entry["source_name"], "CLINICALDATA20240101120000.CSV")
+
+    def test_find_files(self):
+        name_a = self.archive_name("CLINICALDATA20240101120000")
+        name_b = self.archive_name("CLINICALDATA20240601120000")
+
+        self.assertEqual(self.catalog.find_files(drug_code="DRG-2"), [name_a, name_b])
+        self.assertEqual(self.catalog.find_files(trial_code="TR-B"), [name_b])
+        self.assertEqual(self.catalog.find_files(date_from="2024-04-01"), [name_b])
+        self.assertEqual(self.catalog.find_files(drug_code="DRG-1", date_from="2024-04-01"), [])
+        self.assertEqual(self.catalog.find_files(date_to="2024-01-31"), [name_a])
+
+    def test_rebuild_from_existing_archives(self):
+        (self.archive_dir / CATALOG_FILENAME).unlink()
+        catalog = ArchiveCatalog.for_archive(self.archive_dir)
+        self.assertEqual(catalog.file_count(), 0)
+
+        catalogued, skipped = catalog.rebuild(self.archive_dir, self.validator)
+
+        self.assertEqual((catalogued, skipped), (2, 0))
+        entry = catalog.get_file(self.archive_name("CLINICALDATA20240601120000"))
+        self.assertEqual(entry["record_count"], 1)
+        self.assertEqual(entry["sha256"], hashlib.sha256(FILE_B).hexdigest())
+        self.assertEqual(entry["source_name"], "CLINICALDATA20240601120000.CSV")
+
+
+if __name__ == "__main__":
+    unittest.main()
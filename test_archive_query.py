@@ -0,0 +1,94 @@
+import unittest
+import tempfile
+import shutil
+import queue
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ftp import mock_ftp
+
+try:
+    from Helix import ClinicalDataValidator
+    import helix_query
+    from helix_query import ArchiveQuery, ArchiveQueryEngine, write_results
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HEADER = "PatientID,TrialCode,DrugCode,Dosage_mg,StartDate,EndDate,Outcome,SideEffects,Analyst\n"
+FILES = {
+    "CLINICALDATA20240101120000.CSV": HEADER
+    + "P001,TR-A,DRG-X,100,2024-01-05,2024-01-20,Worsened,None,A1\n"
+    + "P002,TR-A,DRG-Y,150,2024-01-06,2024-01-21,Worsened,Mild,A2\n"
+    + "P003,TR-A,DRG-X,120,2024-01-07,2024-01-22,Improved,None,A1\n",
+    "CLINICALDATA20240301120000.CSV": HEADER
+    + "P101,TR-B,DRG-X,80,2024-03-01,2024-03-15,Worsened,Nausea,A3\n"
+    + "P102,TR-B,DRG-X,90,2024-03-02,2024-03-16,No Change,None,A3\n",
+    "CLINICALDATA20240601120000.CSV": HEADER
+    + "P201,TR-C,DRG-Z,60,2024-06-01,2024-06-10,Worsened,None,A4\n",
+}
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestArchiveQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="query_test_"))
+        self.archive_dir = self.temp_dir / "archive"
+        names = sorted(FILES)
+        served = {name: content.encode('utf-8') for name, content in FILES.items()}
+        # First file: plain CSV + columnar export, second: gzip CSV only, third: lzma
+        for name, kwargs in zip(names, [{"columnar_export": True},
+                                        {"archive_compression": "gzip"},
+                                        {"archive_compression": "lzma"}]):
+            validator = ClinicalDataValidator(self.temp_dir / "download", self.archive_dir,
+                                              self.temp_dir / "errors", **kwargs)
+            validator.process_selected_files(mock_ftp(served), [name], queue.Queue())
+        self.engine = ArchiveQueryEngine(self.archive_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def patient_ids(self, query):
+        return [row[0] for _, row in self.engine.run(query)]
+
+    def test_worsened_for_drug_between_dates(self):
+        query = ArchiveQuery(outcome="Worsened", drug_code="DRG-X", date_from="2024-01-01", date_to="2024-03-31")
+
+        self.assertEqual(self.patient_ids(query), ["P001", "P101"])
+        self.assertEqual(self.engine.stats.files_pruned, 1)
+        self.assertEqual(self.engine.stats.files_columnar, 1)
+        self.assertEqual(self.engine.stats.files_csv, 1)
+
+    def test_results_identical_without_numpy(self):
+        query = ArchiveQuery(outcome="Worsened", min_dosage=70)
+        expected = list(self.engine.run(query))
+
+        with patch.object(helix_query, "HAS_NUMPY", False):
+            self.assertEqual(list(self.engine.run(query)), expected)
+        self.assertEqual([row[0] for _, row in expected], ["P001", "P002", "P101"])
+
+    def test_uncatalogued_archives_still_scanned(self):
+        self.engine.catalog.remove_file(next(self.archive_dir.glob("CLINICALDATA20240601120000_*")).name)
+
+        self.assertEqual(self.patient_ids(ArchiveQuery(drug_code="DRG-Z")), ["P201"])
+
+    def test_jsonl_output(self):
+        out = io.StringIO()
+
+        count = write_results(self.engine.run(ArchiveQuery(trial_code="TR-B")), out, "jsonl")
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(count, 2)
+        self.assertEqual(records[0]["PatientID"], "P101")
+        self.assertTrue(records[0]["ArchiveFile"].startswith("CLINICALDATA20240301120000_"))
+
+
+if __name__ == "__main__":
+    unittest.main()
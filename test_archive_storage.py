@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import shutil
+import queue
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ftp import mock_ftp
+
+try:
+    from Helix import ClinicalDataValidator
+    from helix_archive import ArchiveWorkerPool, compress_file, open_archive, strip_archive_suffix
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+VALID_CONTENT = (
+    "PatientID,TrialCode,DrugCode,Dosage_mg,StartDate,EndDate,Outcome,SideEffects,Analyst\r\n"
+    "P001,T001,D001,100,2024-01-01,2024-01-02,Improved,None,A1\r\n"
+    "P002,T001,D002,150,2024-01-03,2024-01-09,No Change,Mild,A2\r\n"
+).encode('utf-8')
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestArchiveStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="archive_test_"))
+        self.download_dir = self.temp_dir / "download"
+        self.archive_dir = self.temp_dir / "archive"
+        self.error_dir = self.temp_dir / "errors"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_compress_round_trip(self):
+        for method, suffix in [("gzip", ".gz"), ("lzma", ".xz")]:
+            src = self.temp_dir / "plain.CSV"
+            src.write_bytes(VALID_CONTENT * 200)
+            dst = self.temp_dir / f"plain.CSV{suffix}"
+
+            original, stored = compress_file(src, dst, method, level=9)
+
+            self.assertFalse(src.exists())
+            self.assertFalse(dst.with_name(dst.name + ".part").exists())
+            self.assertEqual(original, len(VALID_CONTENT) * 200)
+            self.assertLess(stored, original)
+            with open_archive(dst, 'rb') as f:
+                self.assertEqual(f.read(), VALID_CONTENT * 200)
+            self.assertEqual(strip_archive_suffix(dst), "plain.CSV")
+
+    def test_pool_created_once_under_concurrent_submits(self):
+        created = []
+
+        def slow_executor(**kwargs):
+            # Widen the window between the check and the assignment
+            time.sleep(0.05)
+            created.append(ThreadPoolExecutor(**kwargs))
+            return created[-1]
+
+        pool = ArchiveWorkerPool(max_workers=2)
+        sources = []
+        for i in range(8):
+            sources.append(self.temp_dir / f"f{i}.CSV")
+            sources[-1].write_bytes(VALID_CONTENT)
+        futures = []
+        with patch("concurrent.futures.ThreadPoolExecutor", side_effect=slow_executor):
+            threads = [threading.Thread(target=lambda src=src: futures.append(
+                pool.submit(src, src.with_name(src.name + ".gz"), "gzip"))) for src in sources]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        pool.shutdown()
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual([future.result()[0] for future in futures], [len(VALID_CONTENT)] * 8)
+
+    def test_invalid_compression_rejected(self):
+        with self.assertRaises(ValueError):
+            ClinicalDataValidator(self.download_dir, self.archive_dir, self.error_dir, archive_compression="zip")
+
+    def test_process_archives_compressed_and_validates_transparently(self):
+        validator = ClinicalDataValidator(self.download_dir, self.archive_dir, self.error_dir,
+                                          archive_compression="gzip", compression_level=5)
+        name = "CLINICALDATA20240101120000.CSV"
+
+        validator.process_selected_files(mock_ftp({name: VALID_CONTENT}), [name], queue.Queue())
+
+        archived = list(self.archive_dir.glob("CLINICALDATA20240101120000_*.CSV.gz"))
+        self.assertEqual(len(archived), 1)
+        self.assertFalse((self.download_dir / name).exists())
+        self.assertIn(name, validator.processed_files)
+        ok, errors, count = validator._validate_csv_content(archived[0])
+        self.assertTrue(ok)
+        self.assertEqual(count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
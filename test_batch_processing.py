@@ -0,0 +1,477 @@
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+import ftplib
+import queue
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from Helix import ClinicalDataValidator, ClinicalDataGUI, ValidationResult
+    from helix_batch import BatchDashboard, BatchProgress, BatchWorkerPool, format_eta
+    from helix_cancel import CancellationToken, OperationCancelled
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HEADER = "PatientID,TrialCode,DrugCode,Dosage_mg,StartDate,EndDate,Outcome,SideEffects,Analyst\n"
+VALID = HEADER + "P001,TR-A,DRG-X,100,2024-01-05,2024-01-20,Improved,None,A1\n"
+INVALID = HEADER + "P001,TR-A,DRG-X,-5,2024-01-05,2024-01-20,Improved,None,A1\n"
+
+
+def make_files(count):
+    files = {}
+    for i in range(count):
+        files[f"CLINICALDATA2024010112{i:04d}.CSV"] = INVALID if i % 4 == 3 else VALID
+    return files
+
+
+class FakeSession:
+    """Stands in for a connected ClinicalDataProcessor"""
+
+    def __init__(self, files, fail_on=()):
+        self.ftp = Mock()
+        self.fail_on = set(fail_on)
+        self.files = files
+        self.ftp.retrbinary.side_effect = self.retrbinary
+        self.disconnect = Mock()
+
+    def retrbinary(self, cmd, callback):
+        name = cmd[len("RETR "):]
+        if name in self.fail_on:
+            self.fail_on.discard(name)
+            raise ftplib.error_temp("426 Connection closed; transfer aborted")
+        data = self.files[name].encode('utf-8')
+        callback(data[:20])
+        callback(data[20:])
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestBatchWorkerPool(unittest.TestCase):
+
+    def test_workers_keep_their_connection(self):
+        sessions = []
+        lock = threading.Lock()
+
+        def connect():
+            with lock:
+                sessions.append(FakeSession({}))
+                return sessions[-1]
+
+        pool = BatchWorkerPool(connect, max_workers=3)
+        seen = []
+        for i in range(30):
+            pool.submit(lambda ftp, i=i: seen.append(i))
+        self.assertTrue(pool.wait(5))
+        pool.shutdown(wait=True)
+
+        self.assertEqual(sorted(seen), list(range(30)))
+        self.assertLessEqual(len(sessions), 3)
+        for session in sessions:
+            session.disconnect.assert_called_once()
+
+    def test_transfer_error_reconnects(self):
+        sessions = []
+        pool = BatchWorkerPool(lambda: sessions.append(FakeSession({})) or sessions[-1], max_workers=1)
+        errors = []
+
+        def broken(ftp):
+            raise ftplib.error_temp("421 Timeout")
+
+        pool.submit(broken, on_error=errors.append)
+        pool.submit(lambda ftp: None)
+        self.assertTrue(pool.wait(5))
+        pool.shutdown(wait=True)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(sessions), 2)
+        sessions[0].disconnect.assert_called_once()
+
+    def test_connection_failure_reported_per_job(self):
+        def connect():
+            raise ConnectionError("Could not connect to localhost")
+
+        pool = BatchWorkerPool(connect, max_workers=2)
+        errors = []
+        for _ in range(4):
+            pool.submit(lambda ftp: None, on_error=errors.append)
+        self.assertTrue(pool.wait(5))
+        pool.shutdown(wait=True)
+
+        self.assertEqual(len(errors), 4)
+        with self.assertRaises(RuntimeError):
+            pool.submit(lambda ftp: None)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestBatchProcessing(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="batch_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+        self.status_queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pool_processes_batch_with_progress(self):
+        files = make_files(12)
+        first = sorted(files)[0]
+        progress = BatchProgress()
+        pool = BatchWorkerPool(lambda: FakeSession(files, fail_on={first}), max_workers=3)
+        for name in sorted(files):
+            progress.update(name, "queued")
+            pool.submit(lambda ftp, name=name: self.validator.process_and_archive(ftp, name, self.status_queue, progress),
+                        on_error=lambda e, name=name: progress.update(name, "failed", str(e)))
+        self.assertTrue(pool.wait(10))
+        pool.shutdown(wait=True)
+
+        counts = progress.counts()
+        self.assertEqual(counts, {"archived": 8, "rejected": 3, "failed": 1})
+        self.assertEqual(progress.state(first), "failed")
+        self.assertEqual(len(self.validator.processed_files), 8)
+        self.assertEqual(len(list((self.temp_dir / "archive").glob("*.CSV"))), 8)
+        self.assertFalse(self.validator._in_flight)
+        done, total, _, byte_rate = progress.throughput()
+        self.assertEqual((done, total), (12, 12))
+        self.assertGreater(byte_rate, 0)
+
+    def test_duplicate_submission_skipped(self):
+        files = make_files(1)
+        name = next(iter(files))
+        progress = BatchProgress()
+        session = FakeSession(files)
+
+        self.assertEqual(self.validator.process_and_archive(session.ftp, name, self.status_queue, progress), "archived")
+        self.assertEqual(self.validator.process_and_archive(session.ftp, name, self.status_queue, progress), "skipped")
+        self.assertEqual(progress.take_changes()[-1][:2], (name, "skipped"))
+
+    def test_validate_remote_file_states(self):
+        files = make_files(4)
+        progress = BatchProgress()
+        session = FakeSession(files)
+
+        outcomes = [self.validator.validate_remote_file(session.ftp, name, self.status_queue, progress)
+                    for name in sorted(files)]
+
+        self.assertEqual(outcomes, ["valid", "valid", "valid", "invalid"])
+        self.assertEqual(progress.counts(), {"valid": 3, "invalid": 1})
+        self.assertFalse(list((self.temp_dir / "download").glob("temp_validate_*")))
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestBatchProgressView(unittest.TestCase):
+
+    def headless_gui(self):
+        gui = ClinicalDataGUI.__new__(ClinicalDataGUI)
+        gui.root = Mock()
+        gui.progress_tree = Mock()
+        gui.progress_tree.insert.side_effect = lambda parent, index, values, tags: f"row-{values[0]}"
+        gui.throughput_label = Mock()
+        gui.log_message = Mock()
+        gui.batch_pool = Mock(pending=2)
+        gui.batch_progress = BatchProgress()
+        gui.batch_cancel = CancellationToken()
+        gui.batch_tokens = [gui.batch_cancel]
+        gui.pause_btn = Mock()
+        gui.cancel_btn = Mock()
+        gui._batch_rows = {}
+        gui._batch_refresh_job = None
+        return gui
+
+    def test_only_changed_rows_touched(self):
+        gui = self.headless_gui()
+        for name in ("a.csv", "b.csv"):
+            gui.batch_progress.update(name, "queued")
+        gui.refresh_batch_progress()
+        gui.batch_progress.update("a.csv", "downloading")
+        gui.batch_progress.add_bytes("a.csv", 2048)
+
+        gui.refresh_batch_progress()
+
+        self.assertEqual(gui.progress_tree.insert.call_count, 2)
+        gui.progress_tree.item.assert_called_once_with("row-a.csv", values=("a.csv", "downloading", "", "2.0 KB"),
+                                                       tags=("downloading",))
+        self.assertEqual(gui.root.after.call_count, 2)
+        gui.log_message.assert_not_called()
+
+    def test_summary_logged_when_pool_idle(self):
+        gui = self.headless_gui()
+        gui.batch_progress.update("a.csv", "queued")
+        gui.batch_progress.update("a.csv", "archived")
+        gui.batch_progress.update("b.csv", "queued")
+        gui.batch_progress.update("b.csv", "rejected")
+        gui.batch_pool.pending = 0
+
+        gui.refresh_batch_progress()
+
+        gui.root.after.assert_not_called()
+        gui.log_message.assert_called_once_with("📊 Batch complete: 1 archived, 1 rejected", "summary")
+        self.assertTrue(gui.throughput_label.config.call_args[1]["text"].startswith("2/2 files"))
+        gui.cancel_btn.config.assert_called_with(state="disabled")
+
+    def test_pause_toggle_and_cancel(self):
+        gui = self.headless_gui()
+        gui.toggle_pause()
+        self.assertTrue(gui.batch_cancel.paused)
+        gui.pause_btn.config.assert_called_with(text="▶ RESUME")
+
+        gui.cancel_batch()
+
+        self.assertTrue(gui.batch_cancel.cancelled)
+        self.assertFalse(gui.batch_cancel.paused)
+        gui.log_message.assert_called_with("⛔ Cancelling batch: stopping transfers and removing partial files...",
+                                           "warning")
+
+    def test_files_queued_after_cancel_get_a_fresh_token(self):
+        gui = self.headless_gui()
+        submitted = []
+        gui.batch_pool.submit.side_effect = lambda job, on_error=None, cancel=None: submitted.append(cancel)
+        gui.batch_pool.max_workers = 2
+        gui._batch_validator = Mock()
+        gui._get_batch_pool = Mock(return_value=gui.batch_pool)
+        gui.status_queue = Mock()
+        gui.progress_tree.get_children.return_value = ()
+        gui.batch_pool.pending = 0
+        gui._submit_batch(["a.csv"], "validate")
+        gui.batch_pool.pending = 1
+
+        gui.cancel_batch()
+        gui._submit_batch(["b.csv"], "validate")
+
+        first, second = submitted
+        self.assertTrue(first.cancelled)
+        self.assertFalse(second.cancelled)
+        # Pause and a second Cancel still reach every submission of the running batch
+        gui.toggle_pause()
+        self.assertTrue(second.paused)
+        gui.cancel_batch()
+        self.assertTrue(second.cancelled)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestCancellation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="cancel_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+        self.status_queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pause_blocks_until_resume(self):
+        token = CancellationToken()
+        token.pause()
+        passed = threading.Event()
+        worker = threading.Thread(target=lambda: (token.check(), passed.set()))
+        worker.start()
+        self.assertFalse(passed.wait(0.1))
+        token.resume()
+        self.assertTrue(passed.wait(5))
+        worker.join()
+
+    def test_cancel_wakes_paused_check(self):
+        token = CancellationToken()
+        token.pause()
+        errors = []
+
+        def run():
+            try:
+                token.check()
+            except OperationCancelled as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        token.cancel()
+        worker.join(5)
+        self.assertEqual(len(errors), 1)
+
+    def test_cancel_mid_download_cleans_up(self):
+        files = make_files(1)
+        name = next(iter(files))
+        token = CancellationToken()
+        session = FakeSession(files)
+        progress = BatchProgress()
+
+        def retrbinary(cmd, callback):
+            callback(files[name][:20].encode('utf-8'))
+            token.cancel()
+            callback(files[name][20:].encode('utf-8'))
+
+        session.ftp.retrbinary.side_effect = retrbinary
+        with self.assertRaises(OperationCancelled):
+            self.validator.process_and_archive(session.ftp, name, self.status_queue, progress, token)
+
+        self.assertEqual(progress.state(name), "cancelled")
+        self.assertFalse(self.validator._in_flight)
+        self.assertFalse(self.validator.processed_files)
+        self.assertFalse(list((self.temp_dir / "download").iterdir()))
+        self.assertFalse(list((self.temp_dir / "archive").glob("*.CSV")))
+
+    def test_cancel_between_rows_removes_report(self):
+        path = self.temp_dir / "big.csv"
+        path.write_text(HEADER + "P001,TR-A,DRG-X,-5,2024-01-05,2024-01-20,Improved,None,A1\n" * 10000)
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            self.validator.validate_file(path, report_name="big.csv", cancel=token)
+
+        self.assertFalse(list((self.temp_dir / "errors").glob("*")))
+
+    def test_cancelled_queue_drains_without_connecting(self):
+        token = CancellationToken()
+        token.cancel()
+        connect = Mock()
+        errors = []
+        pool = BatchWorkerPool(connect, max_workers=2)
+        for _ in range(5):
+            pool.submit(lambda ftp: None, on_error=errors.append, cancel=token)
+        self.assertTrue(pool.wait(5))
+        pool.shutdown(wait=True)
+
+        connect.assert_not_called()
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(e, OperationCancelled) for e in errors))
+
+    def test_sequential_processing_stops(self):
+        files = make_files(4)
+        token = CancellationToken()
+        session = FakeSession(files)
+        original = session.retrbinary
+
+        def retrbinary(cmd, callback):
+            original(cmd, callback)
+            token.cancel()
+
+        session.ftp.retrbinary.side_effect = retrbinary
+        self.validator.process_selected_files(session.ftp, sorted(files), self.status_queue, cancel=token)
+
+        self.assertEqual(session.ftp.retrbinary.call_count, 1)
+        codes = [event.code for event in list(self.status_queue.queue)]
+        self.assertIn("processing_cancelled", codes)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestBatchDashboard(unittest.TestCase):
+
+    def test_rates_between_samples(self):
+        progress = BatchProgress()
+        dashboard = BatchDashboard(progress)
+        for name in ("a.csv", "b.csv", "c.csv", "d.csv"):
+            progress.update(name, "queued")
+        progress.update("a.csv", "downloading")
+        progress.add_bytes("a.csv", 1024)
+        now = time.monotonic()
+        dashboard.sample(now)
+
+        progress.add_bytes("a.csv", 4 * 1024 * 1024)
+        progress.add_rows("b.csv", 5000)
+        progress.update("b.csv", "archived")
+        dashboard.sample(now + 2)
+
+        self.assertEqual(dashboard.transfer_rates, [("a.csv", 2 * 1024 * 1024)])
+        self.assertEqual(dashboard.rows_rate, 2500)
+        self.assertEqual(dashboard.queue_depths, {"queued": 2, "downloading": 1, "validating": 0, "archiving": 0})
+        self.assertEqual(dashboard.remaining, 3)
+        self.assertIsNotNone(dashboard.eta)
+
+    def test_reset_starts_fresh(self):
+        progress = BatchProgress()
+        dashboard = BatchDashboard(progress)
+        progress.update("a.csv", "queued")
+        progress.add_rows("a.csv", 100000)
+        dashboard.sample()
+        progress.reset()
+        progress.update("b.csv", "queued")
+
+        dashboard.sample()
+
+        self.assertEqual(dashboard.rows_rate, 0.0)
+        self.assertIsNone(dashboard.eta)
+
+    def test_error_categories_aggregated(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="dash_test_"))
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        validator = ClinicalDataValidator(temp_dir / "download", temp_dir / "archive", temp_dir / "errors")
+        validator._generate_guid = Mock(return_value="test-guid")
+        files = make_files(8)
+        session = FakeSession(files)
+        progress = BatchProgress()
+        for name in sorted(files):
+            validator.process_and_archive(session.ftp, name, queue.Queue(), progress)
+
+        dashboard = BatchDashboard(progress).sample()
+
+        self.assertEqual(dashboard.error_counts, [("dosage", 2)])
+        self.assertEqual(progress.rows_done, 8)
+        self.assertEqual(dashboard.remaining, 0)
+
+    def test_file_reporting_twice_counted_once(self):
+        progress = BatchProgress()
+        first, second, other = ValidationResult(), ValidationResult(), ValidationResult()
+        first.error_counts.update(dosage=2, outcome=1)
+        second.error_counts.update(dosage=3)
+        other.error_counts.update(dosage=1)
+        progress.update("b.csv", "invalid", result=other)
+
+        progress.update("a.csv", "invalid", result=first)
+        progress.update("a.csv", "invalid", result=first)
+        self.assertEqual(BatchDashboard(progress).sample().error_counts, [("dosage", 3), ("outcome", 1)])
+        progress.update("a.csv", "rejected", result=second)
+
+        self.assertEqual(BatchDashboard(progress).sample().error_counts, [("dosage", 4)])
+        self.assertEqual(progress.entry("a.csv")["error_counts"], {"dosage": 3})
+
+    def test_live_row_progress(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="dash_test_"))
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        path = temp_dir / "rows.csv"
+        path.write_text(HEADER + "".join(f"P{i},TR-A,DRG-X,100,2024-01-05,2024-01-20,Improved,None,A1\n"
+                                         for i in range(10000)))
+        validator = ClinicalDataValidator(temp_dir / "download", temp_dir / "archive", temp_dir / "errors")
+        reports = []
+
+        validator.validate_file(path, progress_callback=reports.append)
+
+        self.assertGreater(len(reports), 1)
+        self.assertEqual(sum(reports), 10000)
+
+    def test_format_eta(self):
+        self.assertEqual(format_eta(None), "--:--")
+        self.assertEqual(format_eta(75), "01:15")
+        self.assertEqual(format_eta(3725), "1:02:05")
+
+    def test_gui_panel_redraws_changed_labels(self):
+        gui = ClinicalDataGUI.__new__(ClinicalDataGUI)
+        gui.root = Mock()
+        progress = BatchProgress()
+        gui.batch_dashboard = BatchDashboard(progress)
+        gui.dashboard_labels = {key: Mock(**{"cget.return_value": "-"})
+                                for key in ("transfers", "rows", "queues", "remaining", "errors")}
+        progress.update("a.csv", "queued")
+        result = ValidationResult()
+        result.error_counts.update(dosage=3)
+        progress.update("a.csv", "rejected", result=result)
+
+        gui.refresh_dashboard()
+
+        gui.dashboard_labels["errors"].config.assert_called_once_with(text="dosage 3")
+        gui.dashboard_labels["transfers"].config.assert_called_once_with(text="idle")
+        gui.root.after.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import tempfile
+import shutil
+import ftplib
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_checkpoint import BOUNDARY_BYTES, Checkpoint, CheckpointStore
+    from helix_validation import ClinicalDataValidator
+    from test_batch_processing import HEADER
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+NAME = "CLINICALDATA20240101120000.CSV"
+
+
+def rows(start, count, dosage="100"):
+    return "".join(f"P{i:05d},TR-A,DRG-X,{dosage},2024-01-05,2024-01-20,Improved,None,A1\n"
+                   for i in range(start, start + count))
+
+
+class FakeFTP:
+    """Serves files from a dict, with SIZE, MDTM and REST support"""
+
+    def __init__(self, files, rest=True):
+        self.files = files
+        self.rest = rest
+        self.mtime = "20240101120000"
+        self.transfers = []
+
+    def voidcmd(self, cmd):
+        return "200 OK"
+
+    def sendcmd(self, cmd):
+        if cmd.startswith("MDTM ") and self.mtime:
+            return f"213 {self.mtime}"
+        raise ftplib.error_perm("502 Command not implemented")
+
+    def size(self, name):
+        return len(self.files[name])
+
+    def retrbinary(self, cmd, callback, blocksize=8192, rest=None):
+        if rest is not None and not self.rest:
+            raise ftplib.error_perm("502 REST not implemented")
+        data = self.files[cmd[len("RETR "):]][rest or 0:]
+        self.transfers.append((rest, len(data)))
+        for i in range(0, len(data), blocksize):
+            callback(data[i:i + blocksize])
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestCheckpointedRevalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="checkpoint_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+        self.ftp = FakeFTP({NAME: (HEADER + rows(0, 500)).encode('utf-8')})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def validate(self):
+        status = Mock(spec=["put"])
+        outcome = self.validator.validate_remote_file(self.ftp, NAME, status)
+        return outcome, [event.code for (event,), _ in status.put.call_args_list], status
+
+    def append(self, text):
+        self.ftp.files[NAME] += text.encode('utf-8')
+
+    def test_appended_rows_only_downloaded_and_checked(self):
+        self.assertEqual(self.validate()[0], "valid")
+        checkpoint = self.validator.checkpoints.load(NAME)
+        self.assertEqual((checkpoint.offset, checkpoint.rows, len(checkpoint.keys)),
+                         (len(self.ftp.files[NAME]), 500, 500))
+
+        offset = checkpoint.offset
+        self.append(rows(500, 20))
+        outcome, codes, status = self.validate()
+
+        self.assertEqual(outcome, "valid")
+        self.assertIn("checkpoint_resume", codes)
+        self.assertNotIn("header_check", codes)
+        self.assertEqual(self.ftp.transfers[-1], (offset - BOUNDARY_BYTES, BOUNDARY_BYTES + len(rows(500, 20))))
+        valid = [event for (event,), _ in status.put.call_args_list if event.code == "file_valid"]
+        self.assertEqual(valid[0].fields["records"], 520)
+        self.assertEqual(self.validator.checkpoints.load(NAME).rows, 520)
+
+    def test_duplicate_of_checkpointed_row_found(self):
+        self.validate()
+        offset = self.validator.checkpoints.load(NAME).offset
+        self.append(rows(500, 2) + rows(3, 1))
+
+        self.assertEqual(self.validate()[0], "invalid")
+
+        with open(self.validator.error_dir / f"{NAME}.errors.jsonl", encoding='utf-8') as f:
+            self.assertIn('"row": 504', f.read())
+        # The clean prefix stays checkpointed
+        self.assertEqual(self.validator.checkpoints.load(NAME).offset, offset)
+
+    def test_changed_prefix_downloads_whole_file(self):
+        self.validate()
+        self.ftp.files[NAME] = (HEADER + rows(0, 499) + rows(499, 1, dosage="200") + rows(500, 5)).encode('utf-8')
+
+        outcome, codes, _ = self.validate()
+
+        self.assertEqual(outcome, "valid")
+        self.assertIn("checkpoint_stale", codes)
+        self.assertEqual(self.ftp.transfers[-1], (None, len(self.ftp.files[NAME])))
+        self.assertEqual(self.validator.checkpoints.load(NAME).rows, 505)
+
+    def test_shrunk_file_and_missing_rest_fall_back(self):
+        self.validate()
+        self.ftp.files[NAME] = (HEADER + rows(0, 10)).encode('utf-8')
+        self.assertIn("checkpoint_stale", self.validate()[1])
+        self.assertEqual(self.ftp.transfers[-1][0], None)
+
+        self.ftp.rest = False
+        self.append(rows(10, 5))
+        self.assertEqual(self.validate()[0], "valid")
+        self.assertEqual(self.ftp.transfers[-1], (None, len(self.ftp.files[NAME])))
+        self.assertEqual(self.validator.checkpoints.load(NAME).rows, 15)
+
+    def test_unterminated_last_row_not_checkpointed(self):
+        self.ftp.files[NAME] = self.ftp.files[NAME][:-1]
+        self.assertEqual(self.validate()[0], "valid")
+        self.assertIsNone(self.validator.checkpoints.load(NAME))
+
+    def test_processed_file_checkpoint_removed(self):
+        self.validate()
+        self.validator._save_processed_file(NAME)
+        self.assertIsNone(self.validator.checkpoints.load(NAME))
+
+    def test_store_round_trip(self):
+        store = CheckpointStore(self.temp_dir / "store")
+        store.save(Checkpoint(NAME, 120, 3, "ab", {("P1", "TR-A", "DRG-X")}))
+        loaded = store.load(NAME)
+        self.assertEqual((loaded.offset, loaded.rows, loaded.keys), (120, 3, {("P1", "TR-A", "DRG-X")}))
+        store.path_for(NAME).write_text("{broken")
+        self.assertIsNone(store.load(NAME))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import argparse
+import tempfile
+import shutil
+import gzip
+import json
+import io
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import helix_cli
+    from helix_cli import add_commands, run_command, ResultWriter
+    from test_batch_processing import FakeSession, make_files, VALID, INVALID
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestHeadlessCli(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="cli_test_"))
+        self.data_dir = self.temp_dir / "incoming"
+        self.data_dir.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def parse(self, *argv):
+        parser = argparse.ArgumentParser()
+        add_commands(parser.add_subparsers(dest='command'), self.temp_dir)
+        return parser.parse_args(list(argv))
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        with patch.object(sys, "stdout", out):
+            status = run_command(self.parse(*argv))
+        return status, out.getvalue()
+
+    def write_samples(self):
+        (self.data_dir / "good.csv").write_text(VALID)
+        (self.data_dir / "bad.csv").write_text(INVALID)
+        with gzip.open(self.data_dir / "old_20240101.CSV.gz", 'wt') as f:
+            f.write(VALID)
+        (self.data_dir / "notes.txt").write_text("not a csv")
+
+    def test_validate_directory_jsonl(self):
+        self.write_samples()
+        status, output = self.run_cli("validate", str(self.data_dir), "--workers", "1")
+
+        lines = [json.loads(line) for line in output.splitlines()]
+        records, summary = lines[:-1], lines[-1]["summary"]
+        self.assertEqual([Path(r["file"]).name for r in records], ["bad.csv", "good.csv", "old_20240101.CSV.gz"])
+        self.assertEqual([r["status"] for r in records], ["invalid", "valid", "valid"])
+        self.assertEqual(records[0]["error_counts"], {"dosage": 1})
+        self.assertTrue(Path(records[0]["report"]).exists())
+        self.assertEqual(summary["counts"], {"invalid": 1, "valid": 2})
+        self.assertEqual(summary["rows"], 3)
+        self.assertEqual(status, 1)
+
+    def test_compression_level_checked_when_parsed(self):
+        self.assertEqual(self.parse("process", "--compression", "gzip", "--level", "9").level, 9)
+        for level in ("12", "-1"):
+            with patch.object(sys, "stderr", io.StringIO()) as err, self.assertRaises(SystemExit):
+                self.parse("process", "--level", level)
+            self.assertIn("--level", err.getvalue())
+
+    def test_process_pool_matches_serial(self):
+        for i in range(6):
+            (self.data_dir / f"file{i}.csv").write_text(VALID)
+        serial = self.run_cli("validate", str(self.data_dir), "--workers", "1", "--format", "json")
+        parallel = self.run_cli("validate", str(self.data_dir), "--workers", "3", "--format", "json")
+
+        self.assertEqual(serial[0], 0)
+        strip = lambda doc: [(r["file"], r["status"], r["rows"]) for r in json.loads(doc)["files"]]
+        self.assertEqual(strip(serial[1]), strip(parallel[1]))
+        self.assertEqual(json.loads(parallel[1])["summary"]["workers"], 3)
+
+    def test_default_revalidates_archive(self):
+        archive = self.temp_dir / "ClinicalData" / "Archive"
+        archive.mkdir(parents=True)
+        (archive / "CLINICALDATA20240101120000_20240102.CSV").write_text(VALID)
+        output = self.temp_dir / "report.json"
+
+        status, _ = self.run_cli("validate", "--format", "json", "--output", str(output))
+
+        document = json.loads(output.read_text())
+        self.assertEqual(status, 0)
+        self.assertEqual(document["summary"]["files"], 1)
+
+    def test_remote_process_and_list(self):
+        files = make_files(4)
+        entries = [(name, len(body)) for name, body in sorted(files.items())]
+        with patch.object(helix_cli, "connect_processor", side_effect=lambda args, status=None: FakeSession(files)), \
+             patch.object(helix_cli, "remote_entries", return_value=entries):
+            status, output = self.run_cli("process", "--workers", "2")
+            _, listing = self.run_cli("list", "--new")
+
+        records = [json.loads(line) for line in output.splitlines()[:-1]]
+        self.assertEqual(status, 1)
+        self.assertEqual(sorted(r["status"] for r in records), ["archived", "archived", "archived", "rejected"])
+        rejected = next(r for r in records if r["status"] == "rejected")
+        self.assertEqual((rejected["rows"], rejected["errors"], rejected["error_counts"]), (1, 1, {"dosage": 1}))
+        self.assertTrue(all(r["bytes"] > 0 for r in records))
+        remaining = [json.loads(line) for line in listing.splitlines()[:-1]]
+        self.assertEqual([r["file"] for r in remaining], [rejected["file"]])
+
+    def test_connection_failure_exit_status(self):
+        with patch.object(helix_cli, "remote_entries", side_effect=ConnectionError("Could not connect to nowhere")), \
+             patch.object(sys, "stderr", io.StringIO()):
+            status, output = self.run_cli("list")
+        self.assertEqual((status, output), (2, ""))
+
+    def test_unknown_format_rejected(self):
+        with self.assertRaises(ValueError):
+            ResultWriter(io.StringIO(), "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import tempfile
+import shutil
+import queue
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ftp import mock_ftp
+
+try:
+    from Helix import ClinicalDataValidator
+    import helix_columnar
+    import helix_query
+    from helix_columnar import ColumnarReader, columnar_path_for, days_to_date
+    from helix_query import ArchiveQuery, ArchiveQueryEngine
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+ROWS = [
+    ["P001", "TR-A", "DRG-1", "100", "2024-01-05", "2024-01-20", "Improved", "None", "Dr. Lee"],
+    ["P002", "TR-A", "DRG-2", "150", "2024-02-01", "2024-03-01", "Worsened", "Mild Headache", "Dr. Khan"],
+    ["P003", "TR-B", "DRG-1", "75", "2024-02-10", "2024-02-11", "Improved", "None", "Dr. Lee"],
+]
+HEADER = "PatientID,TrialCode,DrugCode,Dosage_mg,StartDate,EndDate,Outcome,SideEffects,Analyst\n"
+CONTENT = (HEADER + "".join(",".join(r) + "\n" for r in ROWS)).encode('utf-8')
+# Valid, but not spelled the way int64 and day numbers print back
+UNPADDED_ROWS = [
+    ["P004", "TR-A", "DRG-1", "007", "2024-1-5", "2024-01-20", "Improved", "None", "Dr. Lee"],
+    ["P005", "TR-B", "DRG-2", "40", "2024-02-01", "2024-3-1", "Worsened", "None", "Dr. Khan"],
+    ["P006", "TR-B", "DRG-2", "0100", "2024-1-5", "2024-3-1", "Worsened", "None", "Dr. Khan"],
+]
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestColumnarExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="columnar_test_"))
+        self.archive_dir = self.temp_dir / "archive"
+        self.download_dir = self.temp_dir / "download"
+        self.validator = ClinicalDataValidator(self.download_dir, self.archive_dir,
+                                               self.temp_dir / "errors", columnar_export=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def process(self, name, content):
+        status = queue.Queue()
+        self.validator.process_selected_files(mock_ftp({name: content}), [name], status)
+        return [event.code for event in status.queue if hasattr(event, "code")]
+
+    def exported_reader(self):
+        archive = next(self.archive_dir.glob("CLINICALDATA*_*.CSV"))
+        return ColumnarReader(columnar_path_for(archive))
+
+    def test_export_written_alongside_archive(self):
+        self.process("CLINICALDATA20240101120000.CSV", CONTENT)
+
+        with self.exported_reader() as reader:
+            self.assertEqual(reader.rows, 3)
+            self.assertEqual(list(reader.iter_rows()), ROWS)
+            self.assertEqual(sum(int(v) for v in reader.column("Dosage_mg")), 325)
+            self.assertEqual(reader.decode("Outcome"), ["Improved", "Worsened", "Improved"])
+            self.assertEqual(reader.dictionary("DrugCode"), ["DRG-1", "DRG-2"])
+            self.assertEqual(days_to_date(reader.column("StartDate")[1]).isoformat(), "2024-02-01")
+
+    @unittest.skipIf(HAS_HELIX and not helix_columnar.HAS_NUMPY, "numpy not installed")
+    def test_numpy_memmap_columns(self):
+        self.process("CLINICALDATA20240101120000.CSV", CONTENT)
+
+        with self.exported_reader() as reader:
+            dosage = reader.column("Dosage_mg")
+            self.assertEqual(type(dosage).__name__, "memmap")
+            outcome = reader.column("Outcome")
+            worsened = reader.dictionary("Outcome").index("Worsened")
+            self.assertEqual(int(dosage[outcome == worsened].sum()), 150)
+
+    def test_mmap_fallback_without_numpy(self):
+        self.process("CLINICALDATA20240101120000.CSV", CONTENT)
+
+        with patch.object(helix_columnar, "HAS_NUMPY", False):
+            reader = self.exported_reader()
+            self.assertEqual(list(reader.column("Dosage_mg")), [100, 150, 75])
+            reader.close()
+
+    def test_original_text_round_trips(self):
+        rows = ROWS + UNPADDED_ROWS
+        self.process("CLINICALDATA20240101120000.CSV", (HEADER + "".join(",".join(r) + "\n" for r in rows)).encode())
+
+        with self.exported_reader() as reader:
+            self.assertEqual(list(reader.iter_rows()), rows)
+            self.assertEqual(list(reader.column("Dosage_mg")), [100, 150, 75, 7, 40, 100])
+        with patch.object(helix_columnar, "HAS_NUMPY", False):
+            reader = self.exported_reader()
+            self.assertEqual(list(reader.iter_rows([3, 5])), [rows[3], rows[5]])
+            reader.close()
+
+    def test_queries_return_the_csv_rows(self):
+        self.process("CLINICALDATA20240101120000.CSV",
+                     CONTENT + "".join(",".join(r) + "\n" for r in UNPADDED_ROWS).encode())
+        queries = [ArchiveQuery(), ArchiveQuery(min_dosage=7, max_dosage=100), ArchiveQuery(outcome="Worsened"),
+                   ArchiveQuery(date_from="2024-01-05", date_to="2024-01-31"), ArchiveQuery(drug_code="DRG-2")]
+        engine = ArchiveQueryEngine(self.archive_dir)
+        columnar = [list(engine.run(query)) for query in queries]
+        self.assertEqual(engine.stats.files_columnar, 1)
+        with patch.object(helix_columnar, "HAS_NUMPY", False), patch.object(helix_query, "HAS_NUMPY", False):
+            self.assertEqual([list(engine.run(query)) for query in queries], columnar)
+
+        shutil.rmtree(next(self.archive_dir.glob("*.cols")))
+        self.assertEqual([list(engine.run(query)) for query in queries], columnar)
+        self.assertEqual(engine.stats.files_csv, 1)
+        self.assertEqual(len(columnar[0]), 6)
+
+    def test_dosage_beyond_int64_skips_export(self):
+        huge = CONTENT + b"P004,TR-A,DRG-1,99999999999999999999,2024-01-01,2024-01-02,Improved,None,A\n"
+
+        codes = self.process("CLINICALDATA20240101120001.CSV", huge)
+
+        self.assertIn("columnar_skipped", codes)
+        self.assertIn("archived", codes)
+        self.assertEqual(len(list(self.archive_dir.glob("CLINICALDATA*_*.CSV"))), 1)
+        self.assertEqual(list(self.archive_dir.glob("*.cols")), [])
+        self.assertEqual(list(self.download_dir.glob(".*.part")), [])
+
+    def test_invalid_file_leaves_no_export(self):
+        bad = CONTENT + b"P004,TR-A,DRG-1,-5,2024-01-01,2024-01-02,Improved,None,A\n"
+
+        self.process("CLINICALDATA20240101120001.CSV", bad)
+
+        self.assertEqual(list(self.archive_dir.glob("*.cols")), [])
+        self.assertEqual(list(self.download_dir.glob("*.part")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
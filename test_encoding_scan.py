@@ -0,0 +1,122 @@
+import unittest
+import tempfile
+import shutil
+import hashlib
+import gzip
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import helix_validation
+    from helix_encoding import ContentScan, scan_file
+    from Helix import ClinicalDataValidator
+    from test_batch_processing import VALID
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+def scan_chunks(data, size):
+    scan = ContentScan()
+    for i in range(0, len(data), size):
+        scan.feed(data[i:i + size])
+    return scan.finish()
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestContentScan(unittest.TestCase):
+
+    def test_ascii_fast_path(self):
+        data = VALID.encode('utf-8')
+        scan = scan_chunks(data, 7)
+        self.assertTrue(scan.valid and scan.ascii)
+        self.assertEqual((scan.byte_size, scan.sha256.hexdigest()), (len(data), hashlib.sha256(data).hexdigest()))
+        self.assertEqual((scan.line_ending, scan.encoding), ("\n", "utf-8"))
+
+    def test_sequences_split_across_chunks(self):
+        data = "﻿P,é,€\r\nQ,ü\r\n".encode('utf-8')
+        for size in (1, 2, 3, 5):
+            scan = scan_chunks(data, size)
+            self.assertTrue(scan.valid, size)
+            self.assertFalse(scan.ascii)
+            self.assertTrue(scan.bom)
+            self.assertEqual((scan.line_ending, scan.line_endings["\r\n"], scan.encoding), ("\r\n", 2, "utf-8-sig"))
+
+    def test_invalid_bytes_located(self):
+        for data, offset in ((b"abc\xffdef", 3), (b"ab\xc3(", 2), (b"abc\xe2\x82", 3)):
+            for size in (1, 2, 64):
+                scan = scan_chunks(data, size)
+                self.assertFalse(scan.valid)
+                self.assertEqual(scan.error_offset, offset, (data, size))
+
+    def test_mixed_line_endings(self):
+        self.assertEqual(scan_chunks(b"a\r\nb\nc\r", 2).line_ending, "mixed")
+        self.assertIsNone(scan_chunks(b"", 4).line_ending)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestPrescanValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="encoding_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_bom_stripped_before_header_check(self):
+        path = self.temp_dir / "bom.csv"
+        path.write_bytes(b"\xef\xbb\xbf" + VALID.replace("\n", "\r\n").encode('utf-8'))
+
+        result = self.validator.validate_file(path)
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual((result.encoding, result.line_ending), ("utf-8-sig", "\r\n"))
+        self.assertEqual(result.sha256, hashlib.sha256(path.read_bytes()).hexdigest())
+
+    def test_misencoded_file_never_parsed(self):
+        path = self.temp_dir / "latin1.csv"
+        content = (VALID + "P002,TR-A,DRG-X,100,2024-01-05,2024-01-20,Improved,Müde,A1\n").encode('latin-1')
+        path.write_bytes(content)
+
+        with patch.object(ClinicalDataValidator, "_validate_rows") as parse:
+            result = self.validator.validate_file(path, report_name=path.name)
+
+        parse.assert_not_called()
+        self.assertFalse(result.is_valid)
+        offset = content.index("ü".encode('latin-1'))
+        self.assertEqual(result.errors, [f"File is not valid UTF-8 encoded CSV (invalid byte at offset {offset})"])
+        self.assertEqual(result.error_counts["dosage"], 0)
+        self.assertIsNotNone(result.report_path)
+
+    def test_download_scan_reused(self):
+        name = "CLINICALDATA20240101120000.CSV"
+        data = VALID.encode('utf-8')
+        ftp = Mock()
+        ftp.retrbinary.side_effect = lambda cmd, callback: [callback(data[i:i + 16]) for i in range(0, len(data), 16)]
+
+        with patch.object(helix_validation, "scan_file") as rescan:
+            outcome, _ = self.validator.process_file(ftp, name, None)
+
+        rescan.assert_not_called()
+        self.assertEqual(outcome, "archived")
+        entry = self.validator.catalog.get_file(self.validator.catalog.find_files()[0])
+        self.assertEqual(entry["sha256"], hashlib.sha256(data).hexdigest())
+
+    def test_compressed_file_scanned_decompressed(self):
+        path = self.temp_dir / "old.CSV.gz"
+        with gzip.open(path, 'wb') as f:
+            f.write(VALID.encode('utf-8'))
+        scan = scan_file(path)
+        self.assertEqual(scan.sha256.hexdigest(), hashlib.sha256(VALID.encode('utf-8')).hexdigest())
+        self.assertTrue(self.validator.validate_file(path).is_valid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import tempfile
+import shutil
+import json
+import csv
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from Helix import ClinicalDataValidator, ERROR_SAMPLE_LIMIT
+    from helix_reports import ErrorReportReader, ErrorReportWriter, report_path_for
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HEADER = ["PatientID", "TrialCode", "DrugCode", "Dosage_mg",
+          "StartDate", "EndDate", "Outcome", "SideEffects", "Analyst"]
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestErrorReports(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="report_test_"))
+        self.download_dir = self.temp_dir / "download"
+        self.archive_dir = self.temp_dir / "archive"
+        self.error_dir = self.temp_dir / "errors"
+        self.validator = ClinicalDataValidator(self.download_dir, self.archive_dir, self.error_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_csv(self, name, rows):
+        path = self.download_dir / name
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def read_report(self, name):
+        with open(report_path_for(self.error_dir, name), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_report_has_row_level_detail(self):
+        name = "CLINICALDATA20240101120000.CSV"
+        path = self.write_csv(name, [
+            HEADER,
+            ["P001", "T001", "D001", "abc", "2024-01-01", "2024-01-02", "Improved", "None", "A1"],
+            ["P002", "T001", "D001", "100", "2024-01-05", "2024-01-02", "Good", "", "A1"],
+        ])
+
+        result = self.validator.validate_file(path, report_name=name)
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.report_path, report_path_for(self.error_dir, name))
+        entries = self.read_report(name)
+        self.assertEqual(entries[0], {"row": 2, "field": "Dosage_mg", "code": "dosage_non_numeric",
+                                      "value": "abc", "message": "Non-numeric dosage: 'abc'"})
+        codes = {(e["row"], e["code"]) for e in entries}
+        self.assertIn((3, "missing_field"), codes)
+        self.assertIn((3, "date_range"), codes)
+        self.assertIn((3, "outcome"), codes)
+
+    def test_error_messages_capped_but_all_reported(self):
+        name = "CLINICALDATA20240101120001.CSV"
+        rows = [HEADER]
+        for i in range(ERROR_SAMPLE_LIMIT + 50):
+            rows.append([f"P{i}", "T001", "D001", "-1", "2024-01-01", "2024-01-02", "Improved", "None", "A1"])
+        path = self.write_csv(name, rows)
+
+        result = self.validator.validate_file(path, report_name=name)
+
+        self.assertEqual(len(result.errors), ERROR_SAMPLE_LIMIT)
+        self.assertEqual(result.error_total, ERROR_SAMPLE_LIMIT + 50)
+        self.assertEqual(len(self.read_report(name)), ERROR_SAMPLE_LIMIT + 50)
+
+    def test_valid_file_removes_stale_report(self):
+        name = "CLINICALDATA20240101120002.CSV"
+        stale = report_path_for(self.error_dir, name)
+        stale.write_text('{"row": 2}\n', encoding='utf-8')
+        path = self.write_csv(name, [
+            HEADER,
+            ["P001", "T001", "D001", "100", "2024-01-01", "2024-01-02", "Improved", "None", "A1"],
+        ])
+
+        result = self.validator.validate_file(path, report_name=name)
+
+        self.assertTrue(result.is_valid)
+        self.assertIsNone(result.report_path)
+        self.assertFalse(stale.exists())
+
+    def test_reader_pages_lazily(self):
+        path = self.error_dir / "paged.errors.jsonl"
+        with ErrorReportWriter(path) as writer:
+            for i in range(25):
+                writer.write(i + 2, "Dosage_mg", "dosage_non_numeric", str(i), "Non-numeric dosage")
+
+        reader = ErrorReportReader(path, page_size=10)
+
+        self.assertEqual([e["row"] for e in reader.read_page(2)], list(range(22, 27)))
+        self.assertFalse(reader.has_next(2))
+        self.assertEqual(reader.read_page(0)[0]["row"], 2)
+        self.assertTrue(reader.has_next(0))
+        self.assertEqual(reader.read_page(3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import random
+import os
+import sys
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_filelist import FileSearchIndex, FileListModel, filename_timestamp
+    from Helix import VirtualFileList
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+def make_listing(count, seed=7):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        stamp = f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}{rng.randint(0, 235959):06d}"
+        prefix = rng.choice(["CLINICALDATA", "ClinicalData_", "trial_", "SENSOR"])
+        names.append(f"{prefix}{stamp}.{rng.choice(['CSV', 'csv'])}")
+    return sorted(names)
+
+
+def headless_list(model, rows=10):
+    """VirtualFileList with the Tk widgets replaced by mocks (no display needed)"""
+    view = VirtualFileList.__new__(VirtualFileList)
+    view.model = model
+    view.on_select = Mock()
+    view.selectmode = "single"
+    view.rows = rows
+    view.top = 0
+    view.listbox = Mock()
+    view.listbox.curselection.return_value = ()
+    view.scrollbar = Mock()
+    return view
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestFileSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.names = make_listing(5000)
+        self.index = FileSearchIndex(self.names)
+
+    def naive(self, term):
+        return [i for i, name in enumerate(self.names) if term.lower() in name.lower()]
+
+    def test_matches_linear_scan(self):
+        for term in ["", "c", "cl", "clinical", "2025031", "_2025", ".csv", "SENSOR2025", "zzz", "data2025"]:
+            self.assertEqual(self.index.search(term), self.naive(term), term)
+
+    def test_typing_narrows_and_backspace_widens(self):
+        typed = ["2", "20", "202", "2025", "20250", "202507", "20250", "2025"]
+        for term in typed:
+            self.assertEqual(self.index.search(term), self.naive(term), term)
+
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestFileListModel(unittest.TestCase):
+
+    def setUp(self):
+        self.names = make_listing(2000)
+        self.sizes = [(i * 7919) % 10007 for i in range(len(self.names))]
+        self.model = FileListModel(self.names, self.sizes)
+
+    def view_names(self):
+        return [self.model.name_at(i) for i in range(len(self.model))]
+
+    def test_sort_keys(self):
+        self.model.set_sort("size")
+        sizes = [self.sizes[self.names.index(name)] for name in self.view_names()]
+        self.assertEqual(sizes, sorted(sizes))
+
+        self.model.set_sort("timestamp", reverse=True)
+        stamps = [filename_timestamp(name) for name in self.view_names()]
+        self.assertEqual(stamps, sorted(stamps, reverse=True))
+
+        self.model.set_sort("name")
+        self.assertEqual(self.view_names(), sorted(self.names))
+
+    def test_filter_keeps_sort_order(self):
+        self.model.set_sort("size", reverse=True)
+        self.assertTrue(self.model.set_filter("SENSOR"))
+        self.assertFalse(self.model.set_filter("sensor"))
+
+        expected = sorted((n for n in self.names if "sensor" in n.lower()),
+                          key=lambda n: (self.sizes[self.names.index(n)], n), reverse=True)
+        self.assertEqual(self.view_names(), expected)
+
+    def test_labels_only_for_requested_window(self):
+        labels = self.model.labels(1995, 2010)
+
+        self.assertEqual(len(labels), 5)
+        self.assertTrue(labels[0].startswith(self.model.name_at(1995)))
+
+    def test_selected_names_limited_to_view(self):
+        self.model.selected = {self.names[0], self.names[-1]}
+        self.model.set_filter(self.names[0])
+
+        self.assertEqual(self.model.selected_names(), [self.names[0]])
+
+    def test_missing_sizes_sort_first(self):
+        model = FileListModel(["b.csv", "a.csv", "c.csv"], [5, None, 1])
+        model.set_sort("size")
+
+        self.assertEqual([model.name_at(i) for i in range(3)], ["a.csv", "c.csv", "b.csv"])
+        self.assertEqual(model.label_at(0), "a.csv")
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestVirtualFileList(unittest.TestCase):
+
+    def setUp(self):
+        self.model = FileListModel(make_listing(50000))
+        self.view = headless_list(self.model)
+
+    def test_only_visible_rows_rendered(self):
+        self.view.yview("moveto", "0.5")
+
+        self.assertEqual(self.view.top, 25000)
+        args = self.view.listbox.insert.call_args[0]
+        self.assertEqual(len(args) - 1, 10)
+        self.assertEqual(args[1], self.model.label_at(25000))
+        self.view.scrollbar.set.assert_called_with(0.5, 25010 / 50000)
+
+    def test_scroll_clamped_to_listing(self):
+        self.view.scroll(3, "pages")
+        self.assertEqual(self.view.top, 30)
+        self.view.scroll_to(10 ** 9)
+        self.assertEqual(self.view.top, 50000 - 10)
+        self.view.scroll(-1, "units")
+        self.assertEqual(self.view.top, 50000 - 11)
+
+    def test_selection_survives_scrolling(self):
+        self.view.scroll_to(500)
+        self.view.listbox.curselection.return_value = (3,)
+        self.view._on_listbox_select()
+        chosen = self.model.name_at(503)
+
+        self.view.scroll_to(0)
+        self.view.listbox.selection_set.assert_not_called()
+        self.view.scroll_to(495)
+
+        self.view.listbox.selection_set.assert_called_once_with(8)
+        self.assertEqual(self.view.selected_names(), [chosen])
+        self.view.on_select.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -101,6 +101,39 @@ class TestFTPConnection(unittest.TestCase):
         self.assertIn("CLINICALDATA20240101120000.CSV", files)
         self.assertIn("CLINICALDATA20240101120001.CSV", files)
     
+    @unittest.skipIf(not HAS_HELIX, "Helix module not available")
+    def test_get_file_entries_uses_mlsd_sizes(self):
+        mock_ftp_instance = Mock()
+        mock_ftp_instance.mlsd.return_value = iter([
+            ("CLINICALDATA20240101120001.CSV", {"type": "file", "size": "2048"}),
+            ("CLINICALDATA20240101120000.CSV", {"type": "file", "size": "512"}),
+            ("archive.csv", {"type": "dir"}),
+            ("README.txt", {"type": "file", "size": "10"}),
+        ])
+        processor = ClinicalDataProcessor(self.test_host, self.test_user, self.test_pass)
+        processor.ftp = mock_ftp_instance
+        processor.connected = True
+
+        entries = processor.get_file_entries(self.mock_queue)
+
+        self.assertEqual(entries, [("CLINICALDATA20240101120000.CSV", 512),
+                                   ("CLINICALDATA20240101120001.CSV", 2048)])
+        mock_ftp_instance.nlst.assert_not_called()
+
+    @unittest.skipIf(not HAS_HELIX, "Helix module not available")
+    def test_get_file_entries_falls_back_to_nlst(self):
+        import ftplib
+        mock_ftp_instance = Mock()
+        mock_ftp_instance.mlsd.side_effect = ftplib.error_perm("500 Unknown command")
+        mock_ftp_instance.nlst.return_value = ["CLINICALDATA20240101120000.CSV", "README.txt"]
+        processor = ClinicalDataProcessor(self.test_host, self.test_user, self.test_pass)
+        processor.ftp = mock_ftp_instance
+        processor.connected = True
+
+        entries = processor.get_file_entries(self.mock_queue)
+
+        self.assertEqual(entries, [("CLINICALDATA20240101120000.CSV", None)])
+
     @unittest.skipIf(not HAS_HELIX, "Helix module not available")
     def test_connection_status_without_ftp(self):
         processor = ClinicalDataProcessor(
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from Helix import (ClinicalDataGUI, NotifyingQueue, LOG_MAX_LINES, QUEUE_TICK_MAX_MESSAGES,
+                       QUEUE_POLL_MS, QUEUE_IDLE_POLL_MS)
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+def headless_gui():
+    """ClinicalDataGUI with Tk widgets replaced by mocks (no display needed)"""
+    gui = ClinicalDataGUI.__new__(ClinicalDataGUI)
+    gui.root = Mock()
+    gui.log_text = Mock()
+    gui.log_text.index.return_value = "1.0"
+    gui.status_queue = NotifyingQueue(notify=gui._notify_status)
+    gui.update_status_label = Mock()
+    gui.is_processing = True
+    gui._poll_ms = QUEUE_POLL_MS
+    gui._poll_job = None
+    return gui
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestStatusLogRendering(unittest.TestCase):
+
+    def test_batch_coalesced_into_one_insert(self):
+        gui = headless_gui()
+        for message, tag in [("a", "info"), ("b", "info"), ("c", "error"), ("d", "info")]:
+            gui.status_queue.put((message, tag))
+
+        gui.check_queue()
+
+        gui.log_text.insert.assert_called_once()
+        args = gui.log_text.insert.call_args[0]
+        self.assertEqual(args[2::2], ("info", "error", "info"))
+        self.assertIn("] a\n", args[1])
+        self.assertIn("] b\n", args[1])
+        gui.update_status_label.assert_called_once()
+        self.assertFalse(gui.is_processing)
+
+    def test_large_backlog_drained_over_several_ticks(self):
+        gui = headless_gui()
+        for i in range(QUEUE_TICK_MAX_MESSAGES + 10):
+            gui.status_queue.put((f"line {i}", "info"))
+
+        gui.check_queue()
+
+        self.assertEqual(gui.status_queue.qsize(), 10)
+        self.assertEqual(gui.root.after.call_args[0][0], 1)
+
+    def test_put_wakes_gui_once_per_burst(self):
+        gui = headless_gui()
+
+        gui.status_queue.put(("a", "info"))
+        gui.status_queue.put(("b", "info"))
+        gui.root.event_generate.assert_called_once_with('<<StatusQueued>>', when='tail')
+
+        gui.check_queue()
+        gui.status_queue.put(("c", "info"))
+        self.assertEqual(gui.root.event_generate.call_count, 2)
+
+    def test_idle_poll_backs_off(self):
+        gui = headless_gui()
+        delays = []
+        for _ in range(8):
+            gui.check_queue()
+            delays.append(gui.root.after.call_args[0][0])
+
+        self.assertEqual(delays[0], QUEUE_POLL_MS * 2)
+        self.assertEqual(delays[-1], QUEUE_IDLE_POLL_MS)
+
+    def test_failed_wakeup_falls_back_to_poll(self):
+        gui = headless_gui()
+        gui.root.event_generate.side_effect = RuntimeError("main thread is not in main loop")
+
+        gui.status_queue.put(("a", "info"))
+        gui.status_queue.put(("b", "info"))
+
+        self.assertEqual(gui.status_queue.qsize(), 2)
+        self.assertEqual(gui.root.event_generate.call_count, 2)
+
+    def test_log_trimmed_to_cap(self):
+        gui = headless_gui()
+        gui.log_text.index.return_value = f"{LOG_MAX_LINES + 51}.0"
+
+        gui.log_message("overflow")
+
+        gui.log_text.delete.assert_called_once_with('1.0', '51.0')
+
+
+if __name__ == "__main__":
+    unittest.main()
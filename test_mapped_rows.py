@@ -0,0 +1,132 @@
+import unittest
+import tempfile
+import shutil
+import csv
+import io
+import os
+import random
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import helix_validation
+    from helix_encoding import scan_file
+    from helix_rows import MappedFile, can_map, split_rows
+    from helix_validation import ClinicalDataValidator
+    from test_batch_processing import HEADER
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+ROOT = Path(os.path.dirname(os.path.abspath(__file__)))
+
+
+def text_lines(path, encoding):
+    with open(path, 'rb') as raw, io.TextIOWrapper(raw, encoding=encoding, newline='') as f:
+        return list(f)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestMappedFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="mapped_test_"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assertSameLines(self, content, block_bytes=16):
+        path = self.temp_dir / "data.csv"
+        path.write_bytes(content)
+        encoding = scan_file(path).encoding
+        with MappedFile(path, encoding, block_bytes=block_bytes) as mapped:
+            self.assertEqual(list(mapped.lines()), text_lines(path, encoding))
+
+    def test_lines_match_text_stream(self):
+        for content in (b"", b"\xef\xbb\xbf" + HEADER.encode('utf-8'), b"a,b\r\nc,d\r\n\r\n",
+                        b"a\rb\nc\r\nd", "Ärzte,\"line\nbreak\",é\n".encode('utf-8') * 5,
+                        b"x" * 100 + b"\n" + b"y" * 3):
+            self.assertSameLines(content)
+
+    def test_blocks_end_after_newline(self):
+        path = self.temp_dir / "data.csv"
+        path.write_bytes(b"ab\r\ncd\r\nef")
+        with MappedFile(path, block_bytes=3) as mapped:
+            self.assertEqual(list(mapped.blocks()), ["ab\r\n", "cd\r\n", "ef"])
+
+    def test_only_plain_files_with_newlines_mapped(self):
+        for name, content, expected in (("a.csv", b"a\nb\n", True), ("a.CSV.gz", b"", False),
+                                        ("b.csv", b"a\rb\r", False), ("c.csv", b"\xff\n", False)):
+            path = self.temp_dir / name
+            path.write_bytes(content)
+            self.assertEqual(can_map(path, scan_file(path)), expected, name)
+
+    def test_fixtures_validate_as_with_text_stream(self):
+        validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                          self.temp_dir / "errors")
+        paths = sorted((ROOT / "clinical_trials").glob("*.csv")) + sorted((ROOT / "test_samples").glob("*.csv"))
+        self.assertTrue(paths)
+        for path in paths:
+            mapped = validator.validate_file(path)
+            with patch.object(helix_validation, "can_map", return_value=False):
+                streamed = validator.validate_file(path)
+            self.assertEqual((mapped.is_valid, mapped.errors, mapped.error_total, mapped.valid_count,
+                              mapped.rows_scanned, mapped.error_counts),
+                             (streamed.is_valid, streamed.errors, streamed.error_total, streamed.valid_count,
+                              streamed.rows_scanned, streamed.error_counts), path.name)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestSplitRows(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="split_rows_test_"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def rows(self, content, block_bytes=64):
+        path = self.temp_dir / "data.csv"
+        path.write_bytes(content)
+        encoding = scan_file(path).encoding
+        with MappedFile(path, encoding, block_bytes=block_bytes) as mapped:
+            return list(mapped.rows()), list(csv.reader(text_lines(path, encoding)))
+
+    def test_random_content_matches_csv_reader(self):
+        rng = random.Random(11)
+        pieces = ["a", "bc", ",", ",", "", "\n", "\r\n", "\r", '"', '"x,y"', '"multi\nline"', '""', " ", "é"]
+        for _ in range(300):
+            content = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 80)))
+            split, expected = self.rows(content.encode('utf-8'), block_bytes=rng.randint(1, 20))
+            self.assertEqual(split, expected, repr(content))
+
+    def test_quoted_field_spanning_blocks(self):
+        content = (HEADER + 'P1,"TR\nA",D\n' + "x,y\n" * 40 + '"long\n' + "z\n" * 40 + '",end\n' + "q,r\n" * 5)
+        split, expected = self.rows(content.encode('utf-8'), block_bytes=32)
+        self.assertEqual(split, expected)
+
+    def test_unquoted_rows_split_without_csv_reader(self):
+        with patch("helix_rows.csv.reader") as reader:
+            self.assertEqual(list(split_rows(["a,b\r\n\r\n", "c,,d\r\ne"])), [["a", "b"], [], ["c", "", "d"], ["e"]])
+        reader.return_value.__iter__.assert_not_called()
+
+    def test_field_size_limit_still_enforced(self):
+        limit = csv.field_size_limit(10)
+        try:
+            with self.assertRaises(csv.Error):
+                list(split_rows(["short\n", "x" * 20 + "\n"]))
+        finally:
+            csv.field_size_limit(limit)
+
+    def test_fixture_rows_identical(self):
+        paths = sorted((ROOT / "clinical_trials").glob("*.csv")) + sorted((ROOT / "test_samples").glob("*.csv"))
+        for path in paths:
+            split, expected = self.rows(path.read_bytes(), block_bytes=256)
+            self.assertEqual(split, expected, path.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_batch import BatchProgress
+    from helix_cache import DownloadCache, ValidationCache
+    from helix_validation import ClinicalDataValidator, ValidationResult
+    from test_batch_processing import VALID, INVALID
+    from test_checkpoints import FakeFTP
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+NAME = "CLINICALDATA20240101120000.CSV"
+OTHER = "CLINICALDATA20240102120000.CSV"
+
+
+def cached_result(sha256, size=10, report_path=None):
+    result = ValidationResult()
+    result.is_valid = report_path is None
+    result.sha256, result.byte_size, result.report_path = sha256, size, report_path
+    return result
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestValidationReuse(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="result_cache_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+        # No trailing newline: nothing is checkpointed, so every validation downloads the whole file
+        self.ftp = FakeFTP({NAME: VALID.rstrip("\n").encode('utf-8'), OTHER: VALID.rstrip("\n").encode('utf-8')})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_process_after_validate_reuses_download_and_result(self):
+        self.assertEqual(self.validator.validate_remote_file(self.ftp, NAME, None), "valid")
+
+        with patch.object(ClinicalDataValidator, "validate_file") as parse:
+            outcome, _ = self.validator.process_file(self.ftp, NAME, None)
+
+        parse.assert_not_called()
+        self.assertEqual(outcome, "archived")
+        self.assertEqual(len(self.ftp.transfers), 1)
+        entry = self.validator.catalog.get_file(self.validator.catalog.find_files()[0])
+        self.assertEqual(entry["record_count"], 1)
+
+    def test_reused_result_counts_its_rows(self):
+        rows = [VALID.splitlines()[1].replace("P001", f"P00{i}") for i in range(1, 4)]
+        content = "\n".join(VALID.splitlines()[:1] + rows).encode('utf-8')
+        self.ftp.files[NAME] = self.ftp.files[OTHER] = content
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        validated, processed = BatchProgress(), BatchProgress()
+
+        with patch.object(ClinicalDataValidator, "validate_file") as parse:
+            self.validator.validate_remote_file(self.ftp, OTHER, None, validated)
+            self.validator.process_file(self.ftp, NAME, None, processed)
+
+        parse.assert_not_called()
+        for progress, name in ((validated, OTHER), (processed, NAME)):
+            self.assertEqual((progress.entry(name)["rows"], progress.rows_done), (3, 3))
+
+    def test_changed_remote_file_downloaded_again(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        self.ftp.mtime = "20240101130000"
+
+        outcome, _ = self.validator.process_file(self.ftp, NAME, None)
+
+        self.assertEqual(outcome, "archived")
+        self.assertEqual(len(self.ftp.transfers), 2)
+
+    def test_cache_shared_between_validators(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        other = ClinicalDataValidator(self.validator.download_dir, self.temp_dir / "archive2", self.temp_dir / "errors")
+
+        self.assertEqual(other.validate_remote_file(self.ftp, NAME, None), "valid")
+
+        self.assertEqual(len(self.ftp.transfers), 1)
+        self.assertEqual(list(self.validator.download_dir.glob("temp_validate_*")), [])
+
+    def test_identical_content_not_parsed_again(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        with patch.object(ClinicalDataValidator, "validate_file") as parse:
+            self.assertEqual(self.validator.validate_remote_file(self.ftp, OTHER, None), "valid")
+        parse.assert_not_called()
+
+    def test_error_report_kept_to_its_file(self):
+        self.ftp.files[NAME] = self.ftp.files[OTHER] = INVALID.encode('utf-8')
+        self.assertEqual(self.validator.validate_remote_file(self.ftp, NAME, None), "invalid")
+        self.assertEqual(self.validator.validate_remote_file(self.ftp, OTHER, None), "invalid")
+        self.assertTrue((self.validator.error_dir / f"{OTHER}.errors.jsonl").exists())
+
+    def test_without_mdtm_nothing_cached(self):
+        self.ftp.mtime = None
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        self.assertEqual(len(self.ftp.transfers), 2)
+        self.assertEqual(self.validator.download_cache.size(), 0)
+
+    def test_result_lru_eviction(self):
+        cache = ValidationCache(version=1, max_results=2)
+        for sha256 in ("a", "b"):
+            cache.put(cached_result(sha256))
+        cache.get("a")
+        cache.put(cached_result("c"))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertFalse(cache.put(cached_result(None)))
+
+    def test_download_cache_budget_and_dedup(self):
+        cache = DownloadCache(self.temp_dir / "cache", max_bytes=25)
+        for i, content in enumerate((b"A" * 10, b"B" * 10, b"A" * 10, b"C" * 10)):
+            path = self.temp_dir / f"file{i}"
+            path.write_bytes(content)
+            self.assertTrue(cache.store(f"name{i}", (10, "t"), path))
+            self.assertTrue(path.exists())
+
+        # name0 and name2 share one object, which was used last but one; B was evicted
+        self.assertEqual(cache.size(), 20)
+        self.assertIsNone(cache.fetch("name1", (10, "t"), self.temp_dir / "out"))
+        self.assertIsNotNone(cache.fetch("name0", (10, "t"), self.temp_dir / "out"))
+        self.assertEqual((self.temp_dir / "out").read_bytes(), b"A" * 10)
+        self.assertIsNone(cache.fetch("name0", (10, "t2"), self.temp_dir / "out"))
+        self.assertFalse(cache.store("big", (30, "t"), self.temp_dir / "file0"))
+        self.assertFalse(cache.store("short", (11, "t"), self.temp_dir / "file0"))
+        self.assertEqual(len(list((self.temp_dir / "cache" / "objects").iterdir())), 2)
+
+    def test_download_never_writes_through_cached_link(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        remote = (len(self.ftp.files[NAME]), self.ftp.mtime)
+        local = self.validator.download_dir / NAME
+        self.validator.download_cache.fetch(NAME, remote, local)
+
+        self.ftp.files[NAME] = b"replaced"
+        self.validator._download(self.ftp, NAME, local)
+
+        copy = self.temp_dir / "copy"
+        self.assertIsNotNone(self.validator.download_cache.fetch(NAME, remote, copy))
+        self.assertEqual(copy.read_bytes(), VALID.rstrip("\n").encode('utf-8'))
+
+    def test_damaged_object_downloaded_again(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+        (stored,) = self.validator.download_cache.objects_dir.iterdir()
+        content = stored.read_bytes()
+        stored.write_bytes(content.replace(b"P001", b"P999"))
+
+        outcome, _ = self.validator.process_file(self.ftp, NAME, None)
+
+        self.assertEqual(outcome, "archived")
+        self.assertEqual(len(self.ftp.transfers), 2)
+        (archived,) = self.validator.archive_dir.glob("CLINICALDATA*_*.CSV")
+        self.assertEqual(archived.read_bytes(), content)
+        self.assertEqual(stored.read_bytes(), content)
+
+    def test_archived_file_not_linked_to_cache_object(self):
+        self.validator.validate_remote_file(self.ftp, NAME, None)
+
+        self.assertEqual(self.validator.process_file(self.ftp, NAME, None)[0], "archived")
+
+        (stored,) = self.validator.download_cache.objects_dir.iterdir()
+        (archived,) = self.validator.archive_dir.glob("CLINICALDATA*_*.CSV")
+        self.assertFalse(os.path.samefile(stored, archived))
+        self.assertEqual(archived.stat().st_nlink, 1)
+        self.assertEqual(archived.read_bytes(), stored.read_bytes())
+        self.assertEqual(list(self.validator.archive_dir.glob(".*.part")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_schema import (CLINICAL_SCHEMA, SENSOR_BATCH_SCHEMA, Column, DateRange, Schema,
+                              compile_row_checker, parse_iso_date)
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+GOOD_CLINICAL = ["P001", "TR-A", "DRG-X", "100", "2024-01-05", "2024-01-20", "Improved", "None", "A1"]
+
+
+def sensor_row(batch_id, *readings):
+    readings = list(readings) + ["1.0"] * (10 - len(readings))
+    return [batch_id, "2024-01-01T00:00:00"] + readings
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestCompiledCheckers(unittest.TestCase):
+
+    def check(self, schema, *rows):
+        checker = compile_row_checker(schema)
+        seen, counts, results = set(), {}, []
+        for row_num, row in enumerate(rows, start=2):
+            results.append(checker(row_num, row, seen, counts))
+        return results, counts
+
+    def test_clinical_valid_row_parsed(self):
+        [(errors, values)], counts = self.check(CLINICAL_SCHEMA, GOOD_CLINICAL)
+        self.assertEqual(errors, [])
+        self.assertEqual(counts, {})
+        self.assertEqual(values[3], 100)
+        self.assertEqual(values[4], parse_iso_date("2024-01-05"))
+
+    def test_clinical_report_vocabulary(self):
+        row = ["P001", "TR-A", "DRG-X", "-5", "2024-01-20", "2024-01-05", "Good", "", "A1"]
+        [(errors, _)], counts = self.check(CLINICAL_SCHEMA, row)
+        self.assertEqual([(e[1], e[2]) for e in errors], [
+            ("SideEffects", "missing_field"), ("Dosage_mg", "dosage_non_positive"),
+            ("EndDate", "date_range"), ("Outcome", "outcome")])
+        self.assertEqual(errors[1][4], "Dosage must be positive integer, got '-5'")
+        self.assertEqual(errors[2][4], "EndDate (2024-01-05) before StartDate (2024-01-20)")
+        self.assertEqual(counts, {"missing_fields": 1, "dosage": 1, "date_range": 1, "outcome": 1})
+
+    def test_clinical_dates_reported_together(self):
+        row = GOOD_CLINICAL[:4] + ["2024-13-01", "2024-01-20"] + GOOD_CLINICAL[6:]
+        [(errors, values)], _ = self.check(CLINICAL_SCHEMA, row)
+        self.assertEqual(errors[0][1:4], ("StartDate/EndDate", "date_format", "2024-13-01/2024-01-20"))
+        self.assertIsNone(values[4])
+
+    def test_duplicates_and_field_count(self):
+        results, counts = self.check(CLINICAL_SCHEMA, GOOD_CLINICAL, GOOD_CLINICAL, GOOD_CLINICAL[:8])
+        self.assertEqual(results[1][0][0][2:4], ("duplicate", "P001_TR-A_DRG-X"))
+        self.assertEqual(results[2][0][0][2:5], ("field_count", 8, "Expected 9 fields, got 8"))
+        self.assertEqual(counts, {"duplicate": 1, "field_count": 1})
+
+    def test_sensor_batch_rules(self):
+        results, counts = self.check(
+            SENSOR_BATCH_SCHEMA,
+            sensor_row("B1", "9.9", "0.125"),
+            sensor_row("B2", "10.5"),
+            sensor_row("B3", "1.2345"),
+            sensor_row("B4", "abc"),
+            sensor_row("B1"),
+        )
+        self.assertEqual(results[0][0], [])
+        self.assertEqual([errors[0][2] for errors, _ in results[1:]],
+                         ["reading_above_max", "reading_decimals", "reading_non_numeric", "duplicate"])
+        self.assertEqual(counts, {"reading": 3, "duplicate": 1})
+
+    def test_compiled_once_per_declaration(self):
+        def partner():
+            return Schema("partner", [Column("id"), Column("score", "int", min=0, max=10),
+                                      Column("taken", "date"), Column("until", "date", required=False)],
+                          rules=[DateRange("taken", "until")], unique=("id",))
+        first, second = compile_row_checker(partner()), compile_row_checker(partner())
+        self.assertIs(first, second)
+        self.assertNotIn("for ", first.source)
+        results, counts = self.check(partner(), ["x", "11", "2024-02-30", ""], ["y", "3", "2024-03-02", "2024-3-1"])
+        self.assertEqual([e[2] for e in results[0][0]], ["score_above_max", "taken_date_format"])
+        self.assertEqual([e[2] for e in results[1][0]], ["date_range"])
+        self.assertIsNone(results[0][1][3])
+
+    def test_unknown_column_rejected(self):
+        with self.assertRaises(ValueError):
+            Schema("broken", [Column("a")], unique=("b",))
+        with self.assertRaises(ValueError):
+            Column("a", "float")
+
+
+if __name__ == "__main__":
+    unittest.main()
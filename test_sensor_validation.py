@@ -0,0 +1,124 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import helix_sensor
+    from helix_sensor import KeyIndex, SensorBatchValidator, plain_decimals
+    from helix_schema import SENSOR_BATCH_SCHEMA
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HEADER = "batch_id,timestamp," + ",".join(f"reading{i}" for i in range(1, 11))
+
+
+def sensor_csv(rows):
+    lines = [HEADER]
+    for batch_id, readings in rows:
+        readings = list(readings) + ["1.5"] * (10 - len(readings))
+        lines.append(",".join([batch_id, "2024-01-01T00:00:00"] + readings))
+    return "\n".join(lines) + "\n"
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestSensorBatchValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="sensor_test_"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def dirty(self):
+        rows = [(f"B{i}", []) for i in range(40)]
+        rows[5] = ("B5", ["10.5"])
+        rows[12] = ("B12", ["1.2345", "abc"])
+        rows[30] = ("B3", [])
+        return sensor_csv(rows)
+
+    def test_valid_file_streamed_in_blocks(self):
+        path = self.temp_dir / "batch.csv"
+        path.write_text(sensor_csv([(f"B{i}", ["9.9", "0", "0.125"]) for i in range(100)]))
+
+        result = SensorBatchValidator(block_rows=7).validate(path)
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual((result.rows_scanned, result.message), (100, "Valid"))
+
+    def test_stops_at_first_invalid_row(self):
+        result = SensorBatchValidator(block_rows=4).validate_text(self.dirty())
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.errors, [(7, "reading1", "reading_above_max", "10.5", "Reading exceeds 9.9, got '10.5'")])
+        self.assertEqual(result.message, "Row 7 reading1: Reading exceeds 9.9, got '10.5'")
+        self.assertEqual(result.rows_scanned, 8)
+
+    def test_report_all_violations(self):
+        result = SensorBatchValidator(report_all=True, block_rows=4).validate_text(self.dirty())
+
+        self.assertEqual([(e[0], e[1], e[2]) for e in result.errors], [
+            (7, "reading1", "reading_above_max"),
+            (14, "reading1", "reading_decimals"),
+            (14, "reading2", "reading_non_numeric"),
+            (32, "batch_id", "duplicate"),
+        ])
+        self.assertEqual(result.error_counts, {"reading": 3, "duplicate": 1})
+        self.assertEqual((result.error_total, result.rows_scanned), (4, 40))
+
+    def test_field_count_and_header(self):
+        short = sensor_csv([("B1", [])]).replace(",1.5\n", "\n", 1)
+        result = SensorBatchValidator().validate_text(short)
+        self.assertEqual(result.errors[0][2:], ("field_count", 11, "Expected 12 fields, got 11"))
+
+        result = SensorBatchValidator().validate_text("batch_id,timestamp\n")
+        self.assertEqual(result.message, "Incorrect or missing headers: ['batch_id', 'timestamp']")
+
+    def test_empty_batch_id_accepted(self):
+        # As the original FileValidator: an empty batch_id is allowed, but only once
+        text = sensor_csv([("", []), ("B1", [])])
+        for numpy in (True, False):
+            with patch.object(helix_sensor, "HAS_NUMPY", numpy):
+                self.assertTrue(SensorBatchValidator().validate_text(text).is_valid)
+                result = SensorBatchValidator().validate_text(text + sensor_csv([("", [])]).split("\n", 1)[1])
+                self.assertEqual([e[:4] for e in result.errors], [(4, "batch_id", "duplicate", "")])
+
+    def test_hash_collisions_are_not_duplicates(self):
+        text = sensor_csv([(f"B{i}", []) for i in range(50)] + [("B7", [])])
+        with patch.object(helix_sensor, "hash", lambda key: 42, create=True):
+            for report_all in (False, True):
+                result = SensorBatchValidator(report_all=report_all, block_rows=8).validate_text(text)
+                self.assertEqual([e[:4] for e in result.errors], [(52, "batch_id", "duplicate", "B7")])
+
+    def test_without_numpy_matches(self):
+        text = self.dirty()
+        expected = SensorBatchValidator(report_all=True, block_rows=16).validate_text(text).errors
+        with patch.object(helix_sensor, "HAS_NUMPY", False):
+            result = SensorBatchValidator(report_all=True, block_rows=16).validate_text(text)
+        self.assertEqual(result.errors, expected)
+
+    def test_plain_decimals(self):
+        self.assertTrue(plain_decimals("0,9.9,12.345,007", 4, 3))
+        for text in ("1.2345", ".5", "5.", "1..2", "-1", "1e3", " 1", "1,,2", "", "١"):
+            for numpy in (True, False):
+                with patch.object(helix_sensor, "HAS_NUMPY", numpy):
+                    self.assertFalse(plain_decimals(text, text.count(",") + 1, 3), (text, numpy))
+        self.assertFalse(plain_decimals("1,2", 3, 3))
+
+    def test_key_index_across_runs(self):
+        index = KeyIndex()
+        for start in range(0, 1000, 100):
+            self.assertEqual(index.add([f"K{i}" for i in range(start, start + 100)]), [])
+        self.assertEqual(index.add(["K5", "new", "K999", "new"]), [0, 2, 3])
+        self.assertEqual(len(index), 1001)
+        self.assertEqual(SENSOR_BATCH_SCHEMA.unique, ("batch_id",))
+
+
+if __name__ == "__main__":
+    unittest.main()
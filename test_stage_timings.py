@@ -0,0 +1,159 @@
+import unittest
+import argparse
+import tempfile
+import shutil
+import json
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_batch import BatchProgress
+    from helix_cli import add_commands, run_command
+    from helix_ftp import ClinicalDataProcessor
+    from helix_timing import STAGES, StageTimer, stage_table
+    from helix_validation import ClinicalDataValidator
+    from test_batch_processing import VALID, INVALID
+    from test_checkpoints import FakeFTP
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+NAME = "CLINICALDATA20240101120000.CSV"
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestStageTimer(unittest.TestCase):
+
+    def test_nested_stage_excluded_from_outer(self):
+        timer = StageTimer()
+        with timer.stage("download"):
+            time.sleep(0.02)
+            with timer.stage("dedup"):
+                time.sleep(0.05)
+
+        self.assertGreaterEqual(timer.seconds["dedup"], 0.05)
+        self.assertLess(timer.seconds["download"], 0.05)
+        self.assertEqual(list(timer.to_dict()), ["download", "dedup"])
+
+    def test_merge_and_unknown_stage(self):
+        timer = StageTimer({"decode": 1.0})
+        timer.merge(StageTimer({"decode": 0.5, "list": 2.0}))
+        self.assertEqual(timer.to_dict(), {"list": 2.0, "decode": 1.5})
+        self.assertIn("decode", stage_table(timer))
+        with self.assertRaises(ValueError):
+            timer.add("parsing", 1.0)
+
+    def test_connect_timed(self):
+        processor = ClinicalDataProcessor("localhost", "user", "pass")
+        with patch("ftplib.FTP"):
+            self.assertTrue(processor.connect())
+        self.assertIn("connect", processor.timings.seconds)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestFileStageTimings(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="timings_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+        self.ftp = FakeFTP({NAME: VALID.encode('utf-8')})
+        self.progress = BatchProgress()
+        self.progress.update(NAME, "queued")
+
+    def tearDown(self):
+        self.validator.archive_pool.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def stage_events(self, status):
+        return [event for (event,), _ in status.put.call_args_list if event.code == "stage_times"]
+
+    def test_validate_file_stages(self):
+        path = self.temp_dir / "bad.csv"
+        path.write_text(INVALID)
+
+        started = time.perf_counter()
+        result = self.validator.validate_file(path, report_name=path.name)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(set(result.timings.seconds),
+                         {"decode", "header_check", "row_validation", "dedup", "error_logging"})
+        self.assertLessEqual(result.timings.total, elapsed)
+
+    def test_remote_validation_reports_stages(self):
+        status = Mock(spec=["put"])
+        self.validator.validate_remote_file(self.ftp, NAME, status, self.progress)
+
+        (event,) = self.stage_events(status)
+        self.assertEqual(event.file, NAME)
+        self.assertTrue({"download", "decode", "row_validation"} <= set(event.fields["stages"]))
+        self.assertIn("download", event.format())
+        self.assertEqual(set(self.progress.entry(NAME)["stages"]), set(event.fields["stages"]))
+
+    def test_compressed_archive_reported_after_job(self):
+        self.validator.archive_compression = "gzip"
+        status = Mock(spec=["put"])
+
+        self.assertEqual(self.validator.process_and_archive(self.ftp, NAME, status, self.progress), "archived")
+
+        (event,) = self.stage_events(status)
+        codes = [logged.code for (logged,), _ in status.put.call_args_list]
+        self.assertGreater(codes.index("stage_times"), codes.index("archived_compressed"))
+        self.assertIn("archive_move", event.fields["stages"])
+        self.assertTrue(set(event.fields["stages"]) <= set(STAGES))
+
+    def test_rejected_file_times_error_logging(self):
+        self.ftp.files[NAME] = INVALID.encode('utf-8')
+        self.validator.process_file(self.ftp, NAME, None, self.progress)
+        self.assertIn("error_logging", self.progress.entry(NAME)["stages"])
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestProfileOption(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="profile_test_"))
+        self.data_dir = self.temp_dir / "incoming"
+        self.data_dir.mkdir()
+        (self.data_dir / "good.csv").write_text(VALID)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_validate(self, *extra):
+        parser = argparse.ArgumentParser()
+        add_commands(parser.add_subparsers(dest='command'), self.temp_dir)
+        args = parser.parse_args(["validate", str(self.data_dir), *extra])
+        out, err = io.StringIO(), io.StringIO()
+        with patch.object(sys, "stdout", out), patch.object(sys, "stderr", err):
+            status = run_command(args)
+        return status, [json.loads(line) for line in out.getvalue().splitlines()], err.getvalue()
+
+    def test_records_and_summary_carry_stages(self):
+        status, (record, summary), err = self.run_validate()
+        self.assertEqual(status, 0)
+        self.assertIn("row_validation", record["stages"])
+        self.assertEqual(summary["summary"]["stages"].keys(), record["stages"].keys())
+        self.assertEqual(err, "")
+
+    def test_profile_prints_table_and_saves_stats(self):
+        stats_path = self.temp_dir / "run.prof"
+        status, (_, summary), err = self.run_validate("--profile", "--profile-output", str(stats_path))
+
+        self.assertEqual(status, 0)
+        self.assertEqual(summary["summary"]["workers"], 1)
+        self.assertIn("Time per stage", err)
+        self.assertIn("row_validation", err)
+        self.assertIn("validate_file", err)
+        self.assertGreater(stats_path.stat().st_size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import subprocess
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import Helix
+    import helix_columnar
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def loaded_modules(code, modules=("tkinter", "requests", "numpy", "unittest", "argparse")):
+    """Run code in a fresh interpreter and report which of modules it imported"""
+    probe = (f"import sys; {code}; import json; "
+             f"print(json.dumps([m for m in {list(modules)!r} if m in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=HERE, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestHeadlessImports(unittest.TestCase):
+
+    def test_validator_import_is_headless(self):
+        self.assertEqual(loaded_modules("from Helix import ClinicalDataValidator, ClinicalDataProcessor"), [])
+        self.assertEqual(loaded_modules("import helix_validation"), [])
+
+    def test_helix_import_loads_no_ftp_or_database(self):
+        self.assertEqual(loaded_modules("import Helix", modules=("ftplib", "sqlite3", "helix_validation")), [])
+        self.assertEqual(loaded_modules("from Helix import ClinicalDataValidator", modules=("ftplib",)), [])
+        self.assertIs(Helix.ClinicalDataProcessor, sys.modules["helix_ftp"].ClinicalDataProcessor)
+        self.assertIs(Helix.ValidationResult, sys.modules["helix_validation"].ValidationResult)
+
+    def test_gui_names_resolved_on_demand(self):
+        self.assertIn("tkinter", loaded_modules("from Helix import NotifyingQueue"))
+        self.assertIs(Helix.ClinicalDataGUI, sys.modules["helix_gui"].ClinicalDataGUI)
+
+    def test_unknown_name_still_import_error(self):
+        with self.assertRaises(ImportError):
+            from Helix import generate_uuid_from_api  # noqa: F401
+
+    def test_numpy_loaded_only_when_columns_are_read(self):
+        self.assertEqual(loaded_modules("import helix_query"), [])
+
+    @unittest.skipIf(HAS_HELIX and not helix_columnar.HAS_NUMPY, "numpy not installed")
+    def test_first_numpy_use_from_many_threads(self):
+        # Workers may all reach numpy's first import together; every one must get the real module
+        code = ("import threading, helix_sensor; barrier = threading.Barrier(8); failures = []\n"
+                "def check():\n"
+                "    barrier.wait()\n"
+                "    try:\n"
+                "        helix_sensor.KeyIndex().add(['a', 'b', 'a'])\n"
+                "        helix_sensor.plain_decimals('1.5,2', 2, 3)\n"
+                "    except Exception as e:\n"
+                "        failures.append(repr(e))\n"
+                "threads = [threading.Thread(target=check) for _ in range(8)]\n"
+                "[t.start() for t in threads]; [t.join() for t in threads]\n"
+                "assert not failures, failures")
+        self.assertEqual(loaded_modules(code, modules=("numpy",)), ["numpy"])
+
+    def test_sensor_validator_stays_off_the_clinical_stack(self):
+        self.assertEqual(loaded_modules("import helix_sensor", modules=("helix_validation", "helix_ftp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import tempfile
+import shutil
+import queue
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import helix_events
+    from helix_events import DETAIL, EVENTS, FILE, SILENT, SUMMARY, StatusEvent, emit, format_status
+    from Helix import ClinicalDataValidator
+    from test_batch_processing import FakeSession, make_files, VALID
+    from test_gui_status_log import headless_gui
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+class QuietQueue(queue.Queue):
+    def __init__(self, verbosity):
+        super().__init__()
+        self.verbosity = verbosity
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestStatusEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="events_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def drain(self, status_queue):
+        return list(status_queue.queue)
+
+    def test_events_formatted_only_on_display(self):
+        path = self.temp_dir / "sample.csv"
+        path.write_text(VALID)
+        status_queue = queue.Queue()
+
+        self.validator.validate_file(path, status_queue=status_queue, report_name="sample.csv")
+
+        events = self.drain(status_queue)
+        self.assertTrue(all(isinstance(event, StatusEvent) for event in events))
+        header = next(event for event in events if event.code == "header_ok")
+        self.assertEqual(header.fields, {"fields": 9})
+        self.assertEqual(format_status(header), ("  ✓ Header valid (9 fields)", "success"))
+
+    def test_verbosity_filters_before_building_events(self):
+        files = make_files(4)
+        session = FakeSession(files)
+        status_queue = QuietQueue(SUMMARY)
+        with patch.object(helix_events, "StatusEvent", wraps=StatusEvent) as built:
+            self.validator.process_selected_files(session.ftp, sorted(files), status_queue)
+
+        codes = [event.code for event in self.drain(status_queue)]
+        self.assertEqual(codes, ["processing_complete", "processing_summary"])
+        self.assertEqual(built.call_count, 2)
+        self.assertEqual(format_status(self.drain(status_queue)[-1])[0], "📊 Summary: 3 archived, 1 rejected")
+
+    def test_silent_queue_receives_nothing(self):
+        files = make_files(2)
+        status_queue = QuietQueue(SILENT)
+        self.validator.validate_selected_files(FakeSession(files).ftp, sorted(files), status_queue)
+        self.assertTrue(status_queue.empty())
+
+    def test_file_level_events(self):
+        files = make_files(4)
+        status_queue = QuietQueue(FILE)
+        self.validator.validate_selected_files(FakeSession(files).ftp, sorted(files), status_queue)
+
+        levels = {event.level for event in self.drain(status_queue)}
+        self.assertEqual(levels, {SUMMARY, FILE})
+
+    def test_every_emitted_event_formats(self):
+        files = make_files(4)
+        status_queue = queue.Queue()
+        self.validator.archive_compression = "gzip"
+        self.validator.process_selected_files(FakeSession(files).ftp, sorted(files), status_queue)
+        self.validator.validate_selected_files(FakeSession(files).ftp, sorted(files), status_queue)
+
+        for event in self.drain(status_queue):
+            message, tag = format_status(event)
+            self.assertIsInstance(message, str)
+            self.assertEqual(tag, EVENTS[event.code][1])
+
+    def test_emit_without_queue_is_noop(self):
+        emit(None, "header_check")
+        self.assertEqual(format_status(("plain", "info")), ("plain", "info"))
+
+    def test_gui_renders_events(self):
+        gui = headless_gui()
+        emit(gui.status_queue, "file_invalid", "a.csv", errors=3)
+        gui.status_queue.verbosity = SUMMARY
+        emit(gui.status_queue, "file_valid", "b.csv", records=5)
+
+        gui.check_queue()
+
+        text, tag = gui.log_text.insert.call_args[0][1:3]
+        self.assertIn("❌ INVALID: a.csv (3 errors)", text)
+        self.assertNotIn("b.csv", text)
+        self.assertEqual(tag, "error")
+        self.assertEqual(gui.status_queue.qsize(), 0)
+        self.assertEqual(DETAIL, max(level for level, _, _ in EVENTS.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
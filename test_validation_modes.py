@@ -0,0 +1,143 @@
+import unittest
+import argparse
+import tempfile
+import shutil
+import gzip
+import json
+import io
+import os
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from helix_cli import add_commands, run_command
+    from helix_reports import report_path_for
+    from helix_validation import ClinicalDataValidator, ValidationMode
+    from test_batch_processing import HEADER
+    HAS_HELIX = True
+except ImportError:
+    HAS_HELIX = False
+
+
+def clinical_csv(count, bad=()):
+    lines = [HEADER]
+    for i in range(count):
+        dosage = "-5" if i in bad else "100"
+        lines.append(f"P{i:05d},TR-A,DRG-X,{dosage},2024-01-05,2024-01-20,Improved,None,A1\n")
+    return "".join(lines)
+
+
+@unittest.skipIf(not HAS_HELIX, "Helix module not available")
+class TestValidationModes(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="modes_test_"))
+        self.validator = ClinicalDataValidator(self.temp_dir / "download", self.temp_dir / "archive",
+                                               self.temp_dir / "errors")
+        self.validator._generate_guid = Mock(return_value="test-guid")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_report(self, name):
+        with open(report_path_for(self.validator.error_dir, name), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_fail_fast_stops_after_max_errors(self):
+        path = self.temp_dir / "broken.csv"
+        path.write_text(clinical_csv(500, bad=range(10, 500)))
+
+        result = self.validator.validate_file(path, report_name=path.name,
+                                              mode=ValidationMode("fail_fast", max_errors=3))
+
+        self.assertFalse(result.is_valid)
+        self.assertFalse(result.complete)
+        self.assertEqual((result.error_total, result.rows_scanned, result.mode), (3, 13, "fail_fast(3)"))
+        self.assertIsNone(result.sha256)
+        last = self.read_report(path.name)[-1]
+        self.assertEqual((last["code"], last["value"]), ("stopped", 13))
+
+    def test_fail_fast_clean_file_is_complete(self):
+        path = self.temp_dir / "clean.csv"
+        path.write_bytes(b"\xef\xbb\xbf" + clinical_csv(50).encode('utf-8'))
+
+        result = self.validator.validate_file(path, mode=ValidationMode("fail_fast"))
+
+        self.assertTrue(result.is_valid and result.complete)
+        self.assertEqual((result.rows_scanned, result.encoding), (50, "utf-8-sig"))
+        self.assertEqual(result.byte_size, path.stat().st_size)
+
+    def test_sample_estimates_error_rate(self):
+        content = clinical_csv(4000, bad=range(0, 4000, 2))
+        plain = self.temp_dir / "half.csv"
+        plain.write_text(content)
+        packed = self.temp_dir / "half.CSV.gz"
+        with gzip.open(packed, 'wt') as f:
+            f.write(content)
+        mode = ValidationMode("sample", fraction=0.25, seed=7, block_rows=100)
+
+        for path in (plain, packed):
+            result = self.validator.validate_file(path, report_name=path.name, mode=mode)
+            self.assertFalse(result.is_valid)
+            self.assertFalse(result.complete)
+            self.assertEqual(result.mode, "sample(0.25, seed=7)")
+            self.assertLess(result.rows_scanned, 4000)
+            self.assertAlmostEqual(result.estimated_rows, 4000, delta=40)
+            self.assertAlmostEqual(result.estimated_error_rate, 0.5, delta=0.01)
+            self.assertEqual(self.read_report(path.name)[-1]["code"], "sampled")
+
+    def test_sample_repeatable_with_seed(self):
+        path = self.temp_dir / "sparse.csv"
+        path.write_text(clinical_csv(3000, bad=range(0, 3000, 7)))
+        mode = ValidationMode("sample", fraction=0.1, seed=3, block_rows=50)
+
+        first = self.validator.validate_file(path, mode=mode)
+        second = self.validator.validate_file(path, mode=mode)
+
+        self.assertEqual(first.errors, second.errors)
+        self.assertTrue(any(error.startswith("Row at byte ") for error in first.errors))
+
+    def test_clean_sample_fully_validated_before_archiving(self):
+        name = "CLINICALDATA20240101120000.CSV"
+        data = clinical_csv(300, bad=[250]).encode('utf-8')
+        ftp = Mock()
+        ftp.retrbinary.side_effect = lambda cmd, callback: callback(data)
+        self.validator.validation_mode = ValidationMode("sample", fraction=0.01, block_rows=100)
+
+        outcome, _ = self.validator.process_file(ftp, name, None)
+
+        # Row 252 lies outside the sampled first block: only the full pass finds it
+        self.assertEqual(outcome, "rejected")
+        self.assertEqual([entry["row"] for entry in self.read_report(name)], [252])
+        self.assertEqual(list(self.validator.archive_dir.glob("*.CSV*")), [])
+
+    def test_invalid_modes_rejected(self):
+        for kwargs in ({"kind": "quick"}, {"kind": "fail_fast", "max_errors": 0},
+                       {"kind": "sample", "fraction": 1.5}):
+            with self.assertRaises(ValueError):
+                ValidationMode(**kwargs)
+
+    def test_cli_mode_option(self):
+        data_dir = self.temp_dir / "incoming"
+        data_dir.mkdir()
+        (data_dir / "broken.csv").write_text(clinical_csv(100, bad=range(100)))
+        parser = argparse.ArgumentParser()
+        add_commands(parser.add_subparsers(dest='command'), self.temp_dir)
+        args = parser.parse_args(["validate", str(data_dir), "--workers", "1", "--mode", "fail-fast",
+                                  "--max-errors", "2"])
+
+        out = io.StringIO()
+        with patch.object(sys, "stdout", out):
+            status = run_command(args)
+
+        record, summary = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(status, 1)
+        self.assertEqual((record["errors"], record["mode"], record["complete"]), (2, "fail_fast(2)", False))
+        self.assertEqual(summary["summary"]["mode"], "fail_fast(2)")
+
+
+if __name__ == "__main__":
+    unittest.main()